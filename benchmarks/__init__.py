@@ -0,0 +1 @@
+# spotify_voice_control/benchmarks/__init__.py
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+Compara el camino antiguo (WAV temporal + sr.AudioFile + recognizer.record) con el
+camino en memoria (sr.AudioData construido directamente desde el array) para una frase.
+La codificación FLAC que hace recognize_google después es común a ambos y no se mide.
+
+Uso: python -m benchmarks.bench_audio_path [--segundos 3] [--repeticiones 200]
+
+Las operaciones de archivo se cuentan con un audit hook de Python (eventos open,
+os.remove, os.unlink), por lo que no hace falta strace.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import soundfile as sf
+import speech_recognition as sr
+
+from utils.audio_utils import a_pcm16
+
+EVENTOS_ARCHIVO = ("open", "os.remove", "os.unlink", "os.rename", "os.replace")
+contador_eventos = {"activo": False, "total": 0}
+
+
+def _auditar(evento, argumentos):
+    if contador_eventos["activo"] and evento in EVENTOS_ARCHIVO:
+        contador_eventos["total"] += 1
+
+
+def camino_temporal(recognizer, audio, sample_rate):
+    temp_filename = None
+    try:
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmpfile:
+            temp_filename = tmpfile.name
+        sf.write(temp_filename, audio, sample_rate)
+        with sr.AudioFile(temp_filename) as source_file:
+            return recognizer.record(source_file)
+    finally:
+        if temp_filename:
+            os.remove(temp_filename)
+
+
+def camino_memoria(recognizer, audio, sample_rate):
+    return sr.AudioData(a_pcm16(audio), sample_rate, 2)
+
+
+def medir(nombre, funcion, recognizer, audio, sample_rate, repeticiones):
+    tiempos = []
+    contador_eventos["total"] = 0
+    for _ in range(repeticiones):
+        contador_eventos["activo"] = True
+        inicio = time.perf_counter()
+        resultado = funcion(recognizer, audio, sample_rate)
+        tiempos.append(time.perf_counter() - inicio)
+        contador_eventos["activo"] = False
+    tiempos = np.array(tiempos) * 1000
+    print(f"{nombre:>10}: p50 {np.percentile(tiempos, 50):7.2f} ms  p95 {np.percentile(tiempos, 95):7.2f} ms  "
+          f"operaciones de archivo por comando: {contador_eventos['total'] / repeticiones:.1f}")
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segundos", type=float, default=3.0)
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    sys.addaudithook(_auditar)
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(int(args.segundos * args.sample_rate)) * 3000).astype(np.int16)
+    recognizer = sr.Recognizer()
+
+    print(f"Frase de {args.segundos} s a {args.sample_rate} Hz, {args.repeticiones} repeticiones")
+    temporal = medir("temporal", camino_temporal, recognizer, audio, args.sample_rate, args.repeticiones)
+    memoria = medir("memoria", camino_memoria, recognizer, audio, args.sample_rate, args.repeticiones)
+    iguales = temporal.get_raw_data() == memoria.get_raw_data()
+    print(f"PCM idéntico en ambos caminos: {iguales}")
+
+
+if __name__ == "__main__":
+    main()
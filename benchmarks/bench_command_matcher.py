@@ -0,0 +1,119 @@
+"""
+Latencia de encontrar_comando_similar a medida que crece la tabla de sinónimos.
+
+Compara, con la tabla del registro de intenciones más N alias sintéticos (como los que podría
+definir un usuario):
+  - lineal:   el recorrido anterior, normalizando y puntuando todos los sinónimos en cada llamada
+  - indice:   IndiceSinonimos (normalizado una vez, filtro de longitud y de bigramas sin pérdidas)
+Las consultas son sinónimos con errores de una o dos letras, órdenes con argumento y frases
+que no son comandos. "puntuados" es la media de sinónimos que el índice llega a puntuar por consulta
+y "coincidencia" el porcentaje de consultas en que ambos devuelven lo mismo.
+
+Uso: python -m benchmarks.bench_command_matcher [--alias 0 1000 5000] [--consultas 300]
+"""
+import argparse
+import random
+import re
+import time
+import numpy as np
+import Levenshtein as lv
+
+from core.command_handler import REGISTRO
+from core.synonym_index import IndiceSinonimos, normalizar_sinonimo
+
+VERBOS = ["pon", "reproduce", "toca", "abre", "lanza", "quiero escuchar", "ponme", "escuchar", "busca", "activa"]
+OBJETOS = ["rock", "jazz", "salsa", "reguetón", "cumbia", "bachata", "lofi", "clásica", "metal", "pop", "tango",
+           "boleros", "merengue", "indie", "blues", "trap", "house", "techno", "baladas", "rancheras", "flamenco",
+           "country", "reggae", "funk", "soul", "punk", "gospel", "ópera", "bossa nova", "vallenato"]
+CONTEXTOS = ["para correr", "para dormir", "de los noventa", "de mi infancia", "para la cena", "en la cocina",
+             "del sábado", "tranquila", "para estudiar", "en el coche", "de fiesta", "acústica", "en vivo",
+             "favorita", "nueva", "de la semana", "del verano", "de invierno", "para bailar", "relajante"]
+RUIDO = ["hola qué tal", "no sé qué decirte", "mañana vamos al cine", "ayer llovió mucho", "qué hora es",
+         "dónde dejé las llaves", "la cena está lista", "me voy a dormir", "pásame la sal", "buenos días"]
+
+
+def lineal(tabla, comando_pronunciado):
+    """El encontrar_comando_similar original."""
+    comando_pronunciado = re.sub(r'\W+', '', comando_pronunciado.lower().strip())
+    mejor_coincidencia = None
+    mejor_puntuacion = 0
+    for comando, sinonimos in tabla.items():
+        for sinonimo in sinonimos:
+            sinonimo = re.sub(r'\W+', '', sinonimo.lower().strip())
+            puntuacion = lv.ratio(comando_pronunciado, sinonimo)
+            if puntuacion > mejor_puntuacion:
+                mejor_puntuacion = puntuacion
+                mejor_coincidencia = comando
+    return mejor_coincidencia if mejor_puntuacion > 0.8 else None
+
+
+def tabla_con_alias(cantidad, rng):
+    tabla = {comando: list(sinonimos) for comando, sinonimos in REGISTRO.tabla_sinonimos().items()}
+    combinaciones = [f"{v} {o} {c}" for v in VERBOS for o in OBJETOS for c in CONTEXTOS]
+    rng.shuffle(combinaciones)
+    for i, alias in enumerate(combinaciones[:cantidad]):
+        tabla.setdefault(f"alias {i % 200}", []).append(alias)
+    return tabla
+
+
+def con_errores(texto, rng):
+    letras = list(texto)
+    for _ in range(rng.randint(1, 2)):
+        posicion = rng.randrange(len(letras))
+        operacion = rng.choice(("cambiar", "quitar", "poner"))
+        if operacion == "cambiar":
+            letras[posicion] = rng.choice("abcdeilmnoprstu")
+        elif operacion == "quitar" and len(letras) > 3:
+            del letras[posicion]
+        else:
+            letras.insert(posicion, rng.choice("aeios"))
+    return "".join(letras)
+
+
+def consultas(tabla, cantidad, rng):
+    sinonimos = [s for lista in tabla.values() for s in lista]
+    resultado = []
+    for i in range(cantidad):
+        tipo = i % 3
+        if tipo == 0:
+            resultado.append(con_errores(rng.choice(sinonimos), rng))
+        elif tipo == 1:
+            resultado.append(f"{rng.choice(VERBOS)} {rng.choice(OBJETOS)} de {rng.choice(['shakira', 'queen', 'bad bunny'])}")
+        else:
+            resultado.append(rng.choice(RUIDO))
+    return resultado
+
+
+def medir(funcion, frases):
+    tiempos = []
+    respuestas = []
+    for frase in frases:
+        inicio = time.perf_counter()
+        respuestas.append(funcion(frase))
+        tiempos.append((time.perf_counter() - inicio) * 1e6)
+    return np.percentile(tiempos, [50, 99]), respuestas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alias", type=int, nargs="+", default=[0, 500, 1000, 2000, 5000])
+    parser.add_argument("--consultas", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'sinonimos':>10} {'lineal p50':>11} {'p99':>9} {'indice p50':>11} {'p99':>9} {'construir':>10} {'puntuados':>10} {'coincidencia':>13}  (µs)")
+    for cantidad in args.alias:
+        rng = random.Random(cantidad)
+        tabla = tabla_con_alias(cantidad, rng)
+        frases = consultas(tabla, args.consultas, rng)
+        inicio = time.perf_counter()
+        indice = IndiceSinonimos(tabla)
+        construir = (time.perf_counter() - inicio) * 1e6
+        (l50, l99), esperadas = medir(lambda frase: lineal(tabla, frase), frases)
+        (i50, i99), obtenidas = medir(lambda frase: indice.buscar(frase)[0], frases)
+        coincidencia = np.mean([a == b for a, b in zip(esperadas, obtenidas)]) * 100
+        puntuados = np.mean([len(indice.candidatos(normalizar_sinonimo(frase))) for frase in frases])
+        print(f"{len(indice):10d} {l50:11.1f} {l99:9.1f} {i50:11.1f} {i99:9.1f} {construir:10.0f} {puntuados:10.1f} {coincidencia:12.1f}%")
+
+
+if __name__ == "__main__":
+    main()
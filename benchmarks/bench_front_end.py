@@ -0,0 +1,109 @@
+"""
+Compara el coste y el tamaño de lo que se sube al remuestrear una vez en el front end del
+micrófono frente a procesar la voz a la frecuencia nativa del dispositivo. Con bloques de 30 ms
+el VAD y la reducción de ruido cuestan sobre todo por llamada, no por muestra, así que en CPU
+el remuestreo queda más o menos a la par; lo que baja claramente es la codificación FLAC y lo
+que se sube.
+
+Para cada frecuencia nativa compara, sobre la misma frase sintética troceada en bloques de
+30 ms como los del callback:
+  - nativo:   VAD + reducción de ruido a la frecuencia del dispositivo
+  - 16 kHz:   remuestreo polifásico + VAD + reducción de ruido a 16 kHz
+además de la codificación FLAC que hace recognize_google antes de subir la frase, y el tamaño
+de lo que se envía: la frase para el reconocimiento y el WAV que se sube a Gemini (antes
+float32 a 44.1 kHz, ahora int16 a 24 kHz).
+
+Uso: python -m benchmarks.bench_front_end [--segundos 3] [--repeticiones 20]
+"""
+import argparse
+import time
+import numpy as np
+import speech_recognition as sr
+
+from modules.audio.resampler import Remuestreador
+from modules.audio.streaming_denoiser import ReductorRuidoStreaming
+from modules.audio.vad import DetectorActividadVoz
+from utils.audio_utils import a_int16
+
+
+def frase_sintetica(segundos, sample_rate, rng):
+    t = np.arange(int(segundos * sample_rate)) / sample_rate
+    voz = 3000 * np.sin(2 * np.pi * 180 * t) * (1 + 0.5 * np.sin(2 * np.pi * 4 * t))
+    ruido = rng.standard_normal(len(t)) * 200
+    return (voz + ruido).astype(np.int16)
+
+
+def procesar(audio, sample_rate, sample_rate_voz=None):
+    """
+    Recorre la frase bloque a bloque como el callback + segmentador.
+    Devuelve (segundos por etapa, frase resultante en int16).
+    """
+    bloque = int(sample_rate * 0.03)
+    destino = sample_rate_voz or sample_rate
+    remuestreador = Remuestreador(sample_rate, destino) if sample_rate_voz else None
+    vad = DetectorActividadVoz(destino)
+    reductor = ReductorRuidoStreaming(destino)
+    # Perfil de ruido aprendido antes de medir, como en uso normal
+    reductor.aprender_ruido(np.random.default_rng(1).standard_normal(destino) * 200)
+    tiempos = {"remuestreo": 0.0, "vad": 0.0, "reduccion": 0.0}
+    salida = []
+    for i in range(0, len(audio) - bloque + 1, bloque):
+        trozo = audio[i:i + bloque]
+        t0 = time.perf_counter()
+        if remuestreador:
+            trozo = a_int16(remuestreador.procesar(trozo))
+        t1 = time.perf_counter()
+        vad.procesar(trozo, 500)
+        t2 = time.perf_counter()
+        salida.append(reductor.procesar(trozo))
+        t3 = time.perf_counter()
+        tiempos["remuestreo"] += t1 - t0
+        tiempos["vad"] += t2 - t1
+        tiempos["reduccion"] += t3 - t2
+    salida.append(reductor.finalizar())
+    return tiempos, a_int16(np.concatenate(salida))
+
+
+def codificar_flac(frase, sample_rate):
+    """Lo que hace recognize_google con la frase antes de enviarla. Devuelve (segundos, bytes)."""
+    inicio = time.perf_counter()
+    datos = sr.AudioData(frase.tobytes(), sample_rate, 2).get_flac_data()
+    return time.perf_counter() - inicio, len(datos)
+
+
+def medir(audio, nativo, sample_rate_voz, repeticiones):
+    destino = sample_rate_voz or nativo
+    etapas = {"remuestreo": [], "vad": [], "reduccion": [], "flac": []}
+    tamano = 0
+    for _ in range(repeticiones):
+        tiempos, frase = procesar(audio, nativo, sample_rate_voz)
+        tiempos["flac"], tamano = codificar_flac(frase, destino)
+        for etapa, valor in tiempos.items():
+            etapas[etapa].append(valor)
+    medianas = {etapa: np.median(valores) * 1000 for etapa, valores in etapas.items()}
+    return medianas, tamano
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segundos", type=float, default=3.0)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    print(f"Frase de {args.segundos} s en bloques de 30 ms, {args.repeticiones} repeticiones (mediana, ms)")
+    print(f"{'camino':>22} {'remuestreo':>11} {'vad':>8} {'reduccion':>10} {'flac':>8} {'total':>8} {'subida':>10}")
+    for nativo in (44100, 48000):
+        audio = frase_sintetica(args.segundos, nativo, rng)
+        for etiqueta, sample_rate_voz in ((f"{nativo} Hz nativo", None), (f"{nativo} -> 16000 Hz", 16000)):
+            medianas, tamano = medir(audio, nativo, sample_rate_voz, args.repeticiones)
+            total = sum(medianas.values())
+            print(f"{etiqueta:>22} {medianas['remuestreo']:11.2f} {medianas['vad']:8.2f} {medianas['reduccion']:10.2f} "
+                  f"{medianas['flac']:8.2f} {total:8.2f} {tamano / 1024:7.1f} KiB")
+
+    print("\nAudio que se sube a Gemini (5 s WAV): "
+          f"44.1 kHz float32 {44100 * 4 * 5 / 1024:.1f} KiB -> 24 kHz int16 {24000 * 2 * 5 / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Calibra el detector acústico del nombre (modules/wake_word/keyword_spotter.py).
+
+Para cada umbral muestra qué parte de las frases no llega al reconocimiento (llamadas a STT
+ahorradas), el porcentaje de frases con el nombre que se descartan (falsos rechazos) y el de
+frases sin el nombre que pasan (falsas aceptaciones). Con --carpeta usa grabaciones reales:
+  carpeta/plantillas/*.wav   el nombre dicho solo, como con "registrar nombre"
+  carpeta/con_nombre/*.wav   frases que contienen el nombre
+  carpeta/sin_nombre/*.wav   frases que no
+Sin --carpeta genera un corpus sintético (vocales con formantes y consonantes de ruido, un
+mismo hablante con distinto tono, ritmo, volumen y ruido de fondo). Sirve para comprobar el
+método y el orden de magnitud del umbral; el de una voz y un micrófono reales se fija con
+grabaciones.
+
+Uso: python -m benchmarks.bench_keyword_spotter [--carpeta ruta] [--frases 100] [--umbrales 0.2 0.25 0.3]
+"""
+import argparse
+import glob
+import os
+import random
+import tempfile
+import time
+import numpy as np
+import soundfile as sf
+
+from modules.wake_word.keyword_spotter import DetectorAcustico
+
+SAMPLE_RATE = 16000
+# Tres primeros formantes (Hz) de los sonidos sonoros y banda (Hz) de los de ruido
+FORMANTES = {
+    "a": (800, 1200, 2500), "e": (450, 1900, 2600), "i": (300, 2300, 3000), "o": (500, 850, 2400),
+    "u": (330, 750, 2300), "l": (360, 1300, 2700), "r": (420, 1400, 2500), "n": (280, 1700, 2600),
+    "m": (280, 1000, 2300),
+}
+RUIDOS = {"s": (4000, 7500), "k": (1500, 4000), "t": (3000, 6000), "p": (500, 2000), "f": (2000, 7000)}
+NOMBRE = "alkaris"
+VOCABULARIO = ["pon", "la", "musika", "supe", "el", "volumen", "ke", "ora", "es", "manana", "kiero", "eskuchar",
+               "rok", "kasa", "limon", "perro", "tamal", "siete", "noche", "lunes", "poema", "kamino", "sol",
+               "marina", "karamelo", "pastel", "luna", "tomate", "mesa", "alto", "kalor", "sala"]
+
+
+def fonema(letra, f0, duracion, rng):
+    n = int(duracion * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+    if letra in FORMANTES:
+        armonicos = np.arange(1, int(7500 / f0) + 1)
+        pesos = sum(np.exp(-0.5 * ((armonicos * f0 - formante) / 90) ** 2) / (j + 1)
+                    for j, formante in enumerate(FORMANTES[letra]))
+        # Un poco de vibrato para que no sea un tono perfecto
+        fase = 2 * np.pi * f0 * (t + 0.002 * np.sin(2 * np.pi * 5 * t))
+        senal = (pesos[:, None] * np.sin(armonicos[:, None] * fase[None, :] + rng.uniform(0, 2 * np.pi, (len(armonicos), 1)))).sum(axis=0)
+    else:
+        bajo, alto = RUIDOS.get(letra, (1000, 5000))
+        espectro = np.fft.rfft(rng.standard_normal(n))
+        frecuencias = np.fft.rfftfreq(n, 1 / SAMPLE_RATE)
+        espectro[(frecuencias < bajo) | (frecuencias > alto)] = 0
+        senal = np.fft.irfft(espectro, n) * 0.6
+    rampa = min(n // 4, int(0.01 * SAMPLE_RATE))
+    envolvente = np.ones(n)
+    envolvente[:rampa] = np.linspace(0, 1, rampa)
+    envolvente[n - rampa:] = np.linspace(1, 0, rampa)
+    return senal * envolvente / (np.max(np.abs(senal)) + 1e-9)
+
+
+def decir(palabras, rng, f0=130.0, ritmo=1.0, volumen=0.3, snr_db=25.0, silencio=0.3):
+    """Sintetiza una frase de `palabras` (con las letras de FORMANTES y RUIDOS) como int16."""
+    partes = [np.zeros(int(silencio * SAMPLE_RATE))]
+    for palabra in palabras:
+        for letra in palabra:
+            duracion = (0.09 if letra in FORMANTES else 0.06) * ritmo * rng.uniform(0.85, 1.15)
+            partes.append(fonema(letra, f0 * rng.uniform(0.97, 1.03), duracion, rng))
+        partes.append(np.zeros(int(0.08 * ritmo * SAMPLE_RATE)))
+    partes.append(np.zeros(int(silencio * SAMPLE_RATE)))
+    senal = np.concatenate(partes)
+    senal = senal / (np.max(np.abs(senal)) + 1e-9) * volumen
+    potencia = np.mean(senal ** 2)
+    senal = senal + rng.standard_normal(len(senal)) * np.sqrt(potencia / 10 ** (snr_db / 10))
+    return (np.clip(senal, -1, 1) * 32767).astype(np.int16)
+
+
+def hablante(rng):
+    return {"f0": rng.uniform(115, 150), "ritmo": rng.uniform(0.85, 1.15), "volumen": rng.uniform(0.1, 0.6),
+            "snr_db": rng.uniform(12, 30)}
+
+
+def corpus_sintetico(frases, semilla=0):
+    """(plantillas, con_nombre, sin_nombre): tres tomas del nombre y `frases` frases de cada tipo."""
+    rng = np.random.default_rng(semilla)
+    aleatorio = random.Random(semilla)
+    plantillas = [decir([NOMBRE], rng, f0=rng.uniform(125, 140), ritmo=rng.uniform(0.95, 1.05), snr_db=35)
+                  for _ in range(3)]
+    con_nombre = []
+    sin_nombre = []
+    for _ in range(frases):
+        antes = aleatorio.sample(VOCABULARIO, aleatorio.randint(0, 2))
+        despues = aleatorio.sample(VOCABULARIO, aleatorio.randint(1, 3))
+        con_nombre.append(decir(antes + [NOMBRE] + despues, rng, **hablante(rng)))
+        sin_nombre.append(decir(aleatorio.sample(VOCABULARIO, aleatorio.randint(2, 5)), rng, **hablante(rng)))
+    return plantillas, con_nombre, sin_nombre
+
+
+def cargar_carpeta(carpeta):
+    def leer(subcarpeta):
+        audios = []
+        for ruta in sorted(glob.glob(os.path.join(carpeta, subcarpeta, "*.wav"))):
+            muestras, sample_rate = sf.read(ruta, dtype='int16')
+            if sample_rate != SAMPLE_RATE:
+                raise ValueError(f"{ruta} está a {sample_rate} Hz; se esperaban {SAMPLE_RATE} Hz")
+            audios.append(muestras if muestras.ndim == 1 else muestras[:, 0])
+        return audios
+    return leer("plantillas"), leer("con_nombre"), leer("sin_nombre")
+
+
+def preparar_detector(plantillas, carpeta):
+    detector = DetectorAcustico(carpeta=carpeta, sample_rate=SAMPLE_RATE)
+    detector.establecer_nombre(NOMBRE)
+    for muestras in plantillas:
+        detector.registrar_plantilla(muestras)
+    return detector
+
+
+def tasas(costes_con, costes_sin, umbral):
+    """(llamadas a STT ahorradas, falsos rechazos, falsas aceptaciones) con `umbral`, en tanto por uno."""
+    rechazos_con = np.mean(np.asarray(costes_con) > umbral)
+    rechazos_sin = np.mean(np.asarray(costes_sin) > umbral)
+    ahorradas = (rechazos_con * len(costes_con) + rechazos_sin * len(costes_sin)) / (len(costes_con) + len(costes_sin))
+    return ahorradas, rechazos_con, 1 - rechazos_sin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--carpeta")
+    parser.add_argument("--frases", type=int, default=100)
+    parser.add_argument("--umbrales", type=float, nargs="+", default=[0.15, 0.2, 0.25, 0.3, 0.35, 0.4])
+    args = parser.parse_args()
+
+    if args.carpeta:
+        plantillas, con_nombre, sin_nombre = cargar_carpeta(args.carpeta)
+    else:
+        plantillas, con_nombre, sin_nombre = corpus_sintetico(args.frases)
+    with tempfile.TemporaryDirectory() as temporal:
+        detector = preparar_detector(plantillas, temporal)
+        inicio = time.perf_counter()
+        costes_con = [detector.puntuar(muestras) for muestras in con_nombre]
+        costes_sin = [detector.puntuar(muestras) for muestras in sin_nombre]
+        ms = (time.perf_counter() - inicio) / (len(con_nombre) + len(sin_nombre)) * 1000
+
+    print(f"{len(detector.plantillas)} plantillas, {len(con_nombre)} frases con el nombre, "
+          f"{len(sin_nombre)} sin él; {ms:.1f} ms por frase")
+    print(f"coste con nombre: p50 {np.median(costes_con):.3f}  p95 {np.percentile(costes_con, 95):.3f}  max {max(costes_con):.3f}")
+    print(f"coste sin nombre: min {min(costes_sin):.3f}  p5 {np.percentile(costes_sin, 5):.3f}  p50 {np.median(costes_sin):.3f}")
+    print(f"{'umbral':>7} {'STT ahorradas':>14} {'falsos rechazos':>16} {'falsas aceptaciones':>20}")
+    for umbral in args.umbrales:
+        ahorradas, falsos_rechazos, falsas_aceptaciones = tasas(costes_con, costes_sin, umbral)
+        print(f"{umbral:7.2f} {ahorradas:13.1%} {falsos_rechazos:15.1%} {falsas_aceptaciones:19.1%}")
+
+
+if __name__ == "__main__":
+    main()
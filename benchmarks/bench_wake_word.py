@@ -0,0 +1,107 @@
+"""
+Compara la detección del nombre del asistente sobre un corpus de transcripciones etiquetadas
+(benchmarks/corpus_nombre.tsv):
+  - generador:  la lista de generar_variaciones_nombre recorrida frase a frase (como antes)
+  - trie:       la misma lista compilada en una sola expresión regular
+  - fonetico:   clave fonética del nombre + distancia de edición acotada sobre ventanas de palabras
+  - en frio:    el fonético sin la caché de claves por palabra
+Para cada uno muestra precisión, exhaustividad, los fallos y la latencia por frase.
+
+Uso: python -m benchmarks.bench_wake_word [--nombre alkaris] [--corpus ruta] [--repeticiones 200]
+"""
+import argparse
+import os
+import time
+import numpy as np
+
+from modules.wake_word.wake_word_matcher import DetectorNombre, clave_palabra, generar_variaciones_nombre
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus_nombre.tsv")
+
+
+def cargar_corpus(ruta):
+    ejemplos = []
+    with open(ruta, encoding="utf-8") as archivo:
+        for linea in archivo:
+            linea = linea.rstrip("\n")
+            if not linea or linea.startswith("#"):
+                continue
+            etiqueta, texto = linea.split("\t", 1)
+            ejemplos.append((etiqueta == "1", texto))
+    return ejemplos
+
+
+def detector_generador(nombre):
+    """El recorrido original: regenera la lista y prueba cada variación con `in`."""
+    def buscar(texto):
+        for variacion in generar_variaciones_nombre(nombre):
+            if variacion in texto:
+                return variacion
+        return None
+    return buscar
+
+
+def sin_cache(buscar):
+    """Vacía la caché de claves por palabra antes de cada búsqueda (peor caso: vocabulario nuevo)."""
+    def buscar_en_frio(texto):
+        clave_palabra.cache_clear()
+        return buscar(texto)
+    return buscar_en_frio
+
+
+def medir(buscar, ejemplos, repeticiones):
+    aciertos = falsos_positivos = falsos_negativos = 0
+    fallos = []
+    latencias = []
+    for esperado, texto in ejemplos:
+        detectado = buscar(texto) is not None
+        if detectado and esperado:
+            aciertos += 1
+        elif detectado:
+            falsos_positivos += 1
+            fallos.append(f"FP '{texto}'")
+        elif esperado:
+            falsos_negativos += 1
+            fallos.append(f"FN '{texto}'")
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            buscar(texto)
+        latencias.append((time.perf_counter() - inicio) / repeticiones * 1e6)
+    precision = aciertos / (aciertos + falsos_positivos) if aciertos + falsos_positivos else 0.0
+    exhaustividad = aciertos / (aciertos + falsos_negativos) if aciertos + falsos_negativos else 0.0
+    return precision, exhaustividad, np.percentile(latencias, [50, 99]), fallos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nombre", default="alkaris")
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--detalle", action="store_true", help="Mostrar las frases mal clasificadas")
+    args = parser.parse_args()
+
+    ejemplos = cargar_corpus(args.corpus)
+    positivos = sum(1 for esperado, _ in ejemplos if esperado)
+    print(f"Corpus: {len(ejemplos)} frases ({positivos} con el nombre), nombre '{args.nombre}'")
+    print(f"Variaciones generadas: {len(generar_variaciones_nombre(args.nombre))}")
+
+    trie = DetectorNombre(args.nombre, modo="variaciones")
+    fonetico = DetectorNombre(args.nombre, modo="fonetico")
+    # Preparación (lista compilada / clave fonética) fuera de la medida por frase
+    trie.buscar("")
+    fonetico.buscar("")
+
+    print(f"\n{'detector':>10} {'precision':>10} {'exhaust.':>9} {'p50 µs':>9} {'p99 µs':>9}")
+    for etiqueta, buscar in (("generador", detector_generador(args.nombre)),
+                             ("trie", trie.buscar),
+                             ("fonetico", fonetico.buscar),
+                             ("en frio", sin_cache(fonetico.buscar))):
+        precision, exhaustividad, (p50, p99), fallos = medir(buscar, ejemplos, args.repeticiones)
+        print(f"{etiqueta:>10} {precision:10.3f} {exhaustividad:9.3f} {p50:9.1f} {p99:9.1f}")
+        if args.detalle:
+            for fallo in fallos:
+                print(f"{'':>12}{fallo}")
+
+
+if __name__ == "__main__":
+    main()
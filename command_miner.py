@@ -0,0 +1,241 @@
+"""
+Minería offline de comandos.txt: propone sinónimos nuevos a partir de las frases que el
+asistente no reconoció como comando y acabaron en la consulta lenta a Gemini.
+
+1. Cuenta las frases del archivo (solo se procesan las distintas, con su frecuencia) y se
+   queda con las que el registro de intenciones resuelve hoy como consulta.
+2. Las vectoriza con TF-IDF de trigramas de caracteres (matrices dispersas de SciPy).
+3. Las agrupa por similitud coseno: recorriendo de la más a la menos frecuente, cada frase se
+   une al grupo de la frase ("líder") más parecida si supera el umbral o abre uno nuevo. La
+   similitud con los líderes se calcula por lotes con un producto de matrices.
+4. Compara el centroide de cada grupo con los sinónimos de todas las intenciones, también por
+   lotes, y propone el líder de cada grupo cercano a una intención como sinónimo nuevo.
+
+Uso:
+    python command_miner.py [comandos.txt] [--umbral-grupo 0.6] [--umbral-intencion 0.5]
+                            [--minimo 5] [--aplicar]
+
+Con --aplicar las sugerencias se guardan como `alias_comandos` en la configuración, que
+SpotifyVoiceControl añade al índice de sinónimos al arrancar.
+"""
+import argparse
+import time
+from collections import Counter
+import numpy as np
+import scipy.sparse as sp
+import unidecode
+
+from config.config_manager import ConfigManager
+from core.command_handler import REGISTRO
+
+
+def normalizar_frase(texto):
+    """Como guarda las frases interpretar: sin acentos, en minúsculas y con espacios simples."""
+    return ' '.join(unidecode.unidecode(texto.lower()).split())
+
+
+def cargar_frases(ruta):
+    """{frase normalizada: veces que aparece} del archivo de comandos."""
+    with open(ruta, encoding="utf-8", errors="replace") as archivo:
+        lineas = Counter(archivo.read().splitlines())
+    frases = Counter()
+    for linea, veces in lineas.items():
+        frase = normalizar_frase(linea)
+        if frase:
+            frases[frase] += veces
+    return frases
+
+
+def filtrar_consultas(frases, registro=REGISTRO):
+    """Se queda con las frases que hoy no resuelve ninguna intención (van a la consulta por defecto)."""
+    return Counter({frase: veces for frase, veces in frases.items()
+                    if registro.resolver(frase)[0] is registro.por_defecto})
+
+
+class VectorizadorTrigramas:
+    """TF-IDF de trigramas de caracteres (con un espacio de marca al principio y al final)."""
+
+    def __init__(self):
+        self.vocabulario = {}
+        self.idf = None
+
+    @staticmethod
+    def _trigramas(texto):
+        marcado = f" {texto} "
+        return [marcado[i:i + 3] for i in range(len(marcado) - 2)]
+
+    def _contar(self, textos):
+        filas = []
+        columnas = []
+        vocabulario = self.vocabulario
+        for fila, texto in enumerate(textos):
+            for trigrama in self._trigramas(texto):
+                columna = vocabulario.get(trigrama)
+                if columna is None:
+                    columna = vocabulario[trigrama] = len(vocabulario)
+                filas.append(fila)
+                columnas.append(columna)
+        datos = np.ones(len(filas), dtype=np.float32)
+        matriz = sp.csr_matrix((datos, (filas, columnas)), shape=(len(textos), len(vocabulario)))
+        matriz.sum_duplicates()
+        return matriz
+
+    def ajustar_transformar(self, textos):
+        conteos = self._contar(textos)
+        apariciones = np.bincount(conteos.indices, minlength=conteos.shape[1])
+        self.idf = (np.log((1 + len(textos)) / (1 + apariciones)) + 1).astype(np.float32)
+        return self._ponderar(conteos)
+
+    def _ponderar(self, conteos):
+        matriz = conteos @ sp.diags(self.idf)
+        return normalizar_filas(matriz.tocsr())
+
+
+def normalizar_filas(matriz):
+    normas = np.sqrt(np.asarray(matriz.multiply(matriz).sum(axis=1)).ravel())
+    normas[normas == 0] = 1
+    return (sp.diags(1 / normas) @ matriz).tocsr().astype(np.float32)
+
+
+def agrupar(vectores, frecuencias, umbral=0.6, lote=1024):
+    """
+    Agrupamiento por líderes en orden de frecuencia. Devuelve (etiquetas, líderes): el grupo de
+    cada frase y, por grupo, la fila de su frase líder.
+    """
+    etiquetas = np.full(vectores.shape[0], -1, dtype=np.int64)
+    lideres = []
+    lideres_t = None
+    orden = np.argsort(-np.asarray(frecuencias), kind="stable")
+    for inicio in range(0, len(orden), lote):
+        filas = orden[inicio:inicio + lote]
+        pendientes = filas
+        if lideres:
+            # Los trigramas comunes ("la ", " de") unen casi todas las frases: el bloque es casi denso
+            similitud = (vectores[filas] @ lideres_t).toarray()
+            mejor = similitud.argmax(axis=1)
+            asignadas = similitud[np.arange(len(filas)), mejor] >= umbral
+            etiquetas[filas[asignadas]] = mejor[asignadas]
+            pendientes = filas[~asignadas]
+        if not len(pendientes):
+            continue
+        # Las que quedan sueltas pueden parecerse entre sí: dentro del lote, cada una que aún no
+        # tiene grupo abre uno y se lleva a las siguientes que se le parecen
+        similitud = (vectores[pendientes] @ vectores[pendientes].T).toarray() >= umbral
+        sin_grupo = np.ones(len(pendientes), dtype=bool)
+        for k in range(len(pendientes)):
+            if not sin_grupo[k]:
+                continue
+            miembros = sin_grupo & similitud[k]
+            miembros[k] = True
+            etiquetas[pendientes[miembros]] = len(lideres)
+            sin_grupo &= ~miembros
+            lideres.append(int(pendientes[k]))
+        lideres_t = vectores[lideres].T.tocsr()
+    return etiquetas, lideres
+
+
+def puntuar_grupos(vectores, frecuencias, etiquetas, n_grupos, sinonimos, lote=4096):
+    """
+    Similitud coseno del centroide de cada grupo (ponderado por frecuencia) con el sinónimo más
+    parecido. Devuelve (índice del sinónimo, similitud) por grupo.
+    """
+    pertenencia = sp.csr_matrix((np.asarray(frecuencias, dtype=np.float32), (etiquetas, np.arange(len(etiquetas)))),
+                                shape=(n_grupos, len(etiquetas)))
+    centroides = normalizar_filas(pertenencia @ vectores)
+    mejores = np.zeros(n_grupos, dtype=np.int64)
+    puntuaciones = np.zeros(n_grupos, dtype=np.float32)
+    for inicio in range(0, n_grupos, lote):
+        similitud = (centroides[inicio:inicio + lote] @ sinonimos.T).toarray()
+        mejores[inicio:inicio + lote] = similitud.argmax(axis=1)
+        puntuaciones[inicio:inicio + lote] = similitud.max(axis=1)
+    return mejores, puntuaciones
+
+
+def minar(frases, tabla_sinonimos, umbral_grupo=0.6, umbral_intencion=0.5, minimo=5):
+    """
+    Devuelve (sugerencias, sin_intencion). Cada sugerencia es (frase, intención, similitud,
+    frecuencia del grupo, otras frases del grupo); sin_intencion son los grupos frecuentes que no
+    se parecen a ninguna intención, candidatos a una intención nueva.
+    """
+    textos = list(frases)
+    if not textos:
+        return [], []
+    frecuencias = np.array([frases[texto] for texto in textos], dtype=np.int64)
+    ids_sinonimos = []
+    textos_sinonimos = []
+    for comando, sinonimos in tabla_sinonimos.items():
+        for sinonimo in sinonimos:
+            ids_sinonimos.append(comando)
+            textos_sinonimos.append(normalizar_frase(sinonimo))
+    existentes = set(textos_sinonimos)
+
+    # Frases y sinónimos comparten vocabulario: un trigrama que solo tiene el sinónimo también cuenta en su norma
+    todos = VectorizadorTrigramas().ajustar_transformar(textos + textos_sinonimos)
+    vectores = todos[:len(textos)]
+    etiquetas, lideres = agrupar(vectores, frecuencias, umbral_grupo)
+    mejores, puntuaciones = puntuar_grupos(vectores, frecuencias, etiquetas, len(lideres), todos[len(textos):])
+
+    total_grupo = np.bincount(etiquetas, weights=frecuencias, minlength=len(lideres)).astype(np.int64)
+    miembros = [[] for _ in lideres]
+    for fila in np.argsort(-frecuencias, kind="stable"):
+        miembros[etiquetas[fila]].append(textos[fila])
+
+    sugerencias = []
+    sin_intencion = []
+    for grupo, lider in enumerate(lideres):
+        if total_grupo[grupo] < minimo:
+            continue
+        frase = textos[lider]
+        otras = miembros[grupo][1:]
+        if puntuaciones[grupo] >= umbral_intencion:
+            if frase not in existentes:
+                sugerencias.append((frase, ids_sinonimos[mejores[grupo]], float(puntuaciones[grupo]), int(total_grupo[grupo]), otras))
+        else:
+            sin_intencion.append((frase, int(total_grupo[grupo]), otras))
+    sugerencias.sort(key=lambda sugerencia: -sugerencia[3])
+    sin_intencion.sort(key=lambda grupo: -grupo[1])
+    return sugerencias, sin_intencion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Propone sinónimos nuevos a partir de comandos.txt.")
+    parser.add_argument("archivo", nargs="?", default="comandos.txt")
+    parser.add_argument("--umbral-grupo", type=float, default=0.6, help="Similitud mínima con el líder para entrar en un grupo")
+    parser.add_argument("--umbral-intencion", type=float, default=0.5, help="Similitud mínima del grupo con un sinónimo")
+    parser.add_argument("--minimo", type=int, default=5, help="Frecuencia mínima de un grupo para proponerlo")
+    parser.add_argument("--aplicar", action="store_true", help="Guardar las sugerencias como alias_comandos en la configuración")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    frases = cargar_frases(args.archivo)
+    lineas = sum(frases.values())
+    consultas = filtrar_consultas(frases)
+    config_manager = ConfigManager("spotify_voice_control_config.json")
+    config = config_manager.load_config()
+    tabla = {comando: list(sinonimos) for comando, sinonimos in REGISTRO.tabla_sinonimos().items()}
+    for frase, comando in config.get("alias_comandos", {}).items():
+        tabla.setdefault(comando, []).append(frase)
+    sugerencias, sin_intencion = minar(consultas, tabla, args.umbral_grupo, args.umbral_intencion, args.minimo)
+    duracion = time.perf_counter() - inicio
+
+    print(f"{lineas} líneas, {len(frases)} frases distintas, {len(consultas)} sin intención "
+          f"({sum(consultas.values())} consultas a Gemini). {duracion:.2f} s")
+    print(f"\nSinónimos propuestos ({len(sugerencias)}):")
+    print(f"{'veces':>7} {'similitud':>9}  frase -> intención")
+    for frase, comando, puntuacion, veces, otras in sugerencias:
+        print(f"{veces:7d} {puntuacion:9.2f}  '{frase}' -> '{comando}'" + (f"  (y {len(otras)} variantes)" if otras else ""))
+    if sin_intencion:
+        print("\nGrupos frecuentes sin intención parecida:")
+        for frase, veces, otras in sin_intencion[:10]:
+            print(f"{veces:7d}  '{frase}'" + (f"  (y {len(otras)} variantes)" if otras else ""))
+
+    if args.aplicar and sugerencias:
+        alias = config.get("alias_comandos", {})
+        alias.update({frase: comando for frase, comando, _, _, _ in sugerencias})
+        config["alias_comandos"] = alias
+        config_manager.save_config(config)
+        print(f"\n{len(sugerencias)} alias guardados en la configuración.")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,17 +19,30 @@ from threading import Thread, Lock
 from itertools import groupby
 import unidecode
 import re
-import librosa
 import soundfile as sf
 import numpy as np
 from dotenv import load_dotenv
 from PIL import ImageGrab  # For screen capture
-import sounddevice as sd  # For audio capture
 from scipy.io.wavfile import write  # For saving audio
 import asyncio # Import asyncio for async operations with Gemini Live API
 import wave # Import wave for handling WAV audio files for Gemini Live API
 
-from modules.audio.audio_manager import AudioManager # Keep AudioManager for potential fallback or other audio management
+from modules.audio.audio_manager import AudioManager, iniciar_mixer_pygame # Keep AudioManager for potential fallback or other audio management
+from modules.audio.tts_cache import CacheVoz
+from modules.audio.phrase_catalog import catalogo_frases, PresintetizadorVoz
+from modules.audio.microphone_stream import MicrophoneStream
+from modules.audio.noise_floor_tracker import NoiseFloorTracker
+from modules.audio.voice_segmenter import SegmentadorVoz
+from modules.stt.stt_backends import crear_selector_stt
+from modules.wake_word.wake_word_matcher import DetectorNombre, generar_variaciones_nombre
+from modules.wake_word.keyword_spotter import DetectorAcustico
+from core.command_handler import REGISTRO
+from core.synonym_index import IndiceSinonimos
+from core.intent_cache import CacheIntenciones
+from core.task_executor import EjecutorTareas
+from core.event_loop import BucleEventos
+from core.voice_pipeline import PipelineVoz
+from core.early_dispatch import Enunciado, DespachoAnticipado
 from modules.spotify.spotify_controller import SpotifyController
 from modules.youtube.youtube_controller import YoutubeController
 from modules.gestures.gesture_control import ControlGestual
@@ -38,7 +51,7 @@ from modules.weather.weather_service import WeatherService
 from modules.jokes.joke_generator import JokeGenerator
 from modules.media_players.mpv_player import MPVPlayer
 from modules.media_players.vlc_player import VLCPlayer
-from utils.audio_utils import normalizar_audio
+from utils.audio_utils import normalizar_audio, a_pcm16
 from gui.main_gui import MainGUI  # Importamos MainGUI aquí
 from modules.avatar.avatar_integration import avatar_manager, start_3d_avatar, stop_3d_avatar, on_assistant_speaking, on_assistant_silent, on_assistant_listening, on_assistant_not_listening, update_speech_level, set_avatar_emotion, make_avatar_blink
 
@@ -48,6 +61,9 @@ from google.generativeai import types # Import types for Gemini API configuratio
 
 class SpotifyVoiceControl:
 
+    # Intenciones registradas en core/command_handler.py; los sinónimos se generan a partir de ellas
+    registro = REGISTRO
+    COMANDOS_CONOCIDOS = REGISTRO.tabla_sinonimos()
 
     def __init__(self):
         load_dotenv_result = load_dotenv()
@@ -69,16 +85,49 @@ class SpotifyVoiceControl:
         # Crear el modelo en lugar del cliente
         self.model = genai.GenerativeModel('gemini-pro')
 
-        pygame.mixer.init()
         self.audio_lock = Lock()
         self.config_manager = ConfigManager("spotify_voice_control_config.json")
         config = self.config_manager.load_config()
 
+        # Clave fonética del nombre calculada una vez; se recalcula solo al cambiar el nombre
+        self.detector_nombre = DetectorNombre(modo=config.get("deteccion_nombre", "fonetico"),
+                                              tolerancia=config.get("tolerancia_nombre", 0.2))
+        # Detector local del nombre sobre el audio: solo las frases que lo contienen llegan al reconocimiento
+        self.detector_acustico = None
+        if config.get("detector_acustico", True):
+            self.detector_acustico = DetectorAcustico(carpeta=config.get("carpeta_plantillas_nombre", "plantillas_nombre"),
+                                                      sample_rate=config.get("sample_rate_voz", 16000),
+                                                      umbral=config.get("umbral_detector_acustico", 0.2),
+                                                      detalle=config.get("detalle_detector_acustico", False))
+        self.plantillas_pendientes = 0
+        self.fin_aviso_plantillas = 0.0
+        # Sinónimos normalizados e indexados una vez, más los alias que defina el usuario
+        self.indice_comandos = IndiceSinonimos(self.COMANDOS_CONOCIDOS)
+        self.agregar_alias_comandos(config.get("alias_comandos", {}))
+        # Interpretación de las frases repetidas; se vacía sola si cambian intenciones, sinónimos o nombre
+        self.cache_intenciones = CacheIntenciones(config.get("capacidad_cache_intenciones", 256),
+                                                  generacion=self.generacion_interpretacion)
         self.asistente_nombre = config.get("asistente_nombre", "Alkaris")
         self.acento_asistente = config.get("acento_asistente", 'es')
         self.energy_threshold = config.get("energy_threshold", 5000)
 
-        self.audio_manager = AudioManager(self.acento_asistente, self.audio_lock) # Keep AudioManager, might be useful for fallback
+        # Audio de las respuestas ya dichas, en disco y con tamaño máximo
+        self.cache_voz = CacheVoz(config.get("directorio_cache_voz", "tts_cache"), config.get("capacidad_cache_voz_mb", 100))
+        self.audio_manager = AudioManager(self.acento_asistente, self.audio_lock, self.cache_voz) # Keep AudioManager, might be useful for fallback
+
+        # Micrófono persistente: se abre una vez y todas las frases se leen de su buffer circular
+        self.recognizer = sr.Recognizer()
+        self.rastreador_ruido = NoiseFloorTracker(control=self.energy_threshold)
+        # El micrófono entrega 16 kHz mono a la segmentación, la reducción de ruido y el reconocimiento
+        self.microfono = MicrophoneStream(device_index=config.get("microphone_device_index", 0),
+                                         sample_rate=config.get("sample_rate_voz", 16000),
+                                         segundos_buffer=config.get("segundos_buffer_microfono", 30))
+        self.segmentador = SegmentadorVoz(self.microfono, self.rastreador_ruido,
+                                          hangover=config.get("vad_hangover", 0.25),
+                                          pre_roll=config.get("pre_roll_ms", 500) / 1000,
+                                          reduccion_ruido=config.get("reduccion_ruido", True))
+        self.stt = crear_selector_stt(config, self.recognizer, hay_internet=lambda: self.is_internet_available,
+                                      al_fallar_nube=self.verificar_conexion_en_segundo_plano)
         self.spotify_controller = SpotifyController(self.SPOTIFY_CLIENT_ID, self.SPOTIFY_CLIENT_SECRET, self.audio_manager)
         self.mpv_player = MPVPlayer() # Instantiate MPVController
         self.vlc_player = VLCPlayer() # Instantiate VLCPlayer
@@ -91,12 +140,38 @@ class SpotifyVoiceControl:
         if selected_voice_id:
             self.engine.setProperty('voice', selected_voice_id) # Keep pyttsx3 voice setting, potentially for fallback
 
+        # Manejadores de comandos y acciones de gestos: hilos acotados con prioridades y plazos
+        self.ejecutor = EjecutorTareas(trabajadores=config.get("trabajadores_tareas", 3),
+                                       capacidad=config.get("capacidad_tareas", 32))
+        # Bucle asyncio de los manejadores que son corrutinas; sus llamadas bloqueantes van a hilos_io hilos
+        self.bucle = BucleEventos(config.get("hilos_io", 8))
+
         self.control_gestual = ControlGestual(self)
         self.iniciar_control_gestual()
 
         self.error_log_file = "error_log.txt"
         self.is_internet_available = True
-        self.energy_threshold = 5000
+        # El modo "auto" del reconocimiento vuelve a la nube cuando la red regresa
+        Thread(target=self.vigilar_conexion_internet, args=(config.get("intervalo_verificacion_internet", 60),),
+               daemon=True).start()
+        self.stt.iniciar()
+
+        # Captura, reconocimiento, interpretación y ejecución en etapas con colas acotadas
+        self.pipeline = PipelineVoz(self.escuchar, self.transcribir, self.interpretar, self.ejecutar_comando)
+        # Comandos de control que pueden ejecutarse con un resultado parcial estable
+        self.resultados_parciales = config.get("resultados_parciales", True)
+        self.despacho_anticipado = DespachoAnticipado(
+            self.interpretar_parcial,
+            lambda peticion: self.pipeline.inyectar("comandos", peticion),
+            self.registro.anticipables(),
+            es_ambiguo=self.es_comando_ambiguo,
+            compensaciones=self.registro.compensaciones(),
+            estabilidad=config.get("parcial_estable_ms", 200) / 1000
+        )
+        # Respuestas fijas sintetizadas de antemano para que la primera vez ya suenen sin esperar a gTTS
+        self.presintetizador = None
+        if config.get("presintesis_voz", True):
+            self.presintetizador = PresintetizadorVoz(self.audio_manager, self.catalogo_respuestas(), ocupado=self.ocupado_para_presintesis)
         # Referencias a GUI tkinter eliminadas - ahora integradas en el avatar
 
 
@@ -117,6 +192,32 @@ class SpotifyVoiceControl:
         else:
             print("Avatar 3D deshabilitado en configuración")
 
+    @property
+    def energy_threshold(self):
+        return self._energy_threshold
+
+    @energy_threshold.setter
+    def energy_threshold(self, valor):
+        """
+        Nivel de "suprimir ruido": cuántas veces por encima del ruido de fondo ha de estar la voz
+        (ver NoiseFloorTracker). Se aplica en el siguiente bloque, sin reabrir el micrófono.
+        """
+        self._energy_threshold = valor
+        if hasattr(self, 'rastreador_ruido'):
+            self.rastreador_ruido.establecer_control(valor)
+
+    @property
+    def asistente_nombre(self):
+        return self._asistente_nombre
+
+    @asistente_nombre.setter
+    def asistente_nombre(self, valor):
+        """Invalida el detector del nombre solo si el nombre cambia (cambiar_nombre_asistente, recarga de configuración)."""
+        self._asistente_nombre = valor
+        if hasattr(self, 'detector_nombre'):
+            self.detector_nombre.establecer_nombre(valor)
+        if getattr(self, 'detector_acustico', None) is not None:
+            self.detector_acustico.establecer_nombre(valor)
 
     def iniciar_en_hilo(self):
         """
@@ -139,6 +240,14 @@ class SpotifyVoiceControl:
         Acciones a realizar al cerrar la aplicación.
         """
         print("Cerrando aplicación...")
+        self.pipeline.detener()
+        if self.presintetizador is not None:
+            self.presintetizador.detener()
+        self.ejecutor.detener()
+        self.bucle.detener()
+        self.microfono.detener()
+        self.audio_manager.cerrar()
+        self.stt.cerrar()
         
         # Detener avatar 3D si está habilitado
         if hasattr(self, 'avatar_enabled') and self.avatar_enabled:
@@ -193,13 +302,6 @@ class SpotifyVoiceControl:
         # Este método se mantiene para compatibilidad pero ahora se maneja desde el avatar
         pass
     
-    def on_threshold_change(self, event=None):
-        """
-        Manejar cambio en el umbral de energía.
-        """
-        # El umbral ahora se actualiza directamente desde el avatar
-        pass
-    
     def reiniciar_configuracion(self):
         """
         Restablece la configuración del asistente a los valores predeterminados.
@@ -249,12 +351,17 @@ class SpotifyVoiceControl:
             print(f"Error capturing screen: {e}")
             return None
 
-    def capture_audio(self, duration=5, samplerate=44100):
-        """Captures audio from the microphone and saves it to a temporary file."""
+    def capture_audio(self, duration=5, samplerate=24000):
+        """
+        Captures audio from the persistent microphone and saves it to a temporary 16-bit WAV.
+        The front end resamples straight from the device rate to `samplerate` (24 kHz for Gemini).
+        """
         try:
             print("Recording audio...")
-            recording = sd.rec(int(duration * samplerate), samplerate=samplerate, channels=1)
-            sd.wait()
+            recording = self.microfono.grabar(duration, samplerate)
+            if recording is None:
+                print("Error capturing audio: the microphone stopped while recording")
+                return None
             temp_filename = tempfile.NamedTemporaryFile(suffix=".wav", delete=False).name
             write(temp_filename, samplerate, recording)
             print(f"Audio saved to {temp_filename}")
@@ -268,177 +375,174 @@ class SpotifyVoiceControl:
         Genera automáticamente variaciones fonéticas y de pronunciación para cualquier nombre del asistente.
         Esto permite un reconocimiento más flexible independientemente del nombre configurado.
         """
-        nombre_lower = nombre.lower()
-        variaciones = [nombre_lower]
-        
-        # Remover acentos para variaciones
-        nombre_sin_acentos = unidecode.unidecode(nombre_lower)
-        if nombre_sin_acentos != nombre_lower:
-            variaciones.append(nombre_sin_acentos)
-        
-        # Variaciones específicas para nombres comunes
-        if nombre_lower == "alkaris":
-            variaciones.extend([
-                "al karis", "al caris", "alcaris", "al kari", "al cari",
-                "alkari", "al karis", "al karis", "al caris"
-            ])
-        
-        # Separaciones comunes con espacios
-        if len(nombre_lower) > 3:
-            # Separar después de 2 caracteres
-            if len(nombre_lower) > 2:
-                variaciones.append(f"{nombre_lower[:2]} {nombre_lower[2:]}")
-            # Separar después de 3 caracteres
-            if len(nombre_lower) > 3:
-                variaciones.append(f"{nombre_lower[:3]} {nombre_lower[3:]}")
-            # Separación por mitad
-            mitad = len(nombre_lower) // 2
-            variaciones.append(f"{nombre_lower[:mitad]} {nombre_lower[mitad:]}")
-        
-        # Variaciones fonéticas comunes
-        variaciones_foneticas = {
-            'k': ['c', 'qu'],
-            'c': ['k', 'qu'],
-            'qu': ['k', 'c'],
-            'z': ['s'],
-            's': ['z'],
-            'b': ['v'],
-            'v': ['b'],
-            'y': ['i', 'll'],
-            'll': ['y', 'i'],
-            'j': ['g'],
-            'g': ['j'],
-            'r': ['rr'],
-            'rr': ['r']
-        }
-        
-        # Aplicar variaciones fonéticas
-        variaciones_base = variaciones.copy()
-        for variacion_base in variaciones_base:
-            for original, reemplazos in variaciones_foneticas.items():
-                if original in variacion_base:
-                    for reemplazo in reemplazos:
-                        nueva_variacion = variacion_base.replace(original, reemplazo)
-                        variaciones.append(nueva_variacion)
-        
-        # Variaciones con errores comunes de reconocimiento
-        variaciones_base = variaciones.copy()
-        for variacion_base in variaciones_base:
-            # Agregar/quitar vocales al final
-            if variacion_base.endswith(('a', 'e', 'i', 'o', 'u')):
-                variaciones.append(variacion_base[:-1])  # Sin vocal final
-            else:
-                for vocal in ['a', 'e', 'i', 'o', 'u']:
-                    variaciones.append(variacion_base + vocal)  # Con vocal agregada
-        
-        # Variaciones con 'al' al inicio (muy común en reconocimiento de voz)
-        variaciones_base = variaciones.copy()
-        for variacion_base in variaciones_base:
-            if not variacion_base.startswith('al'):
-                variaciones.append(f"al {variacion_base}")
-                variaciones.append(f"al{variacion_base}")
-        
-        # Eliminar duplicados, espacios extra y retornar
-        variaciones_limpias = []
-        for var in variaciones:
-            var_limpia = ' '.join(var.split())  # Eliminar espacios extra
-            if var_limpia and var_limpia not in variaciones_limpias:
-                variaciones_limpias.append(var_limpia)
-        
-        return variaciones_limpias
+        return generar_variaciones_nombre(nombre)
 
 
-    def reconocimiento_de_voz(self, timeout=50):
-        recognizer = sr.Recognizer()
+    def escuchar(self, timeout=50):
+        """
+        Espera la siguiente frase en el micrófono persistente.
+        Devuelve un `Enunciado` con el audio ya limpio de ruido, o None si no se oyó nada.
+        Mientras se habla, la frase se envía a un reconocimiento incremental (si el motor lo
+        permite) para poder adelantar los comandos de control con resultados parciales.
+        """
+        enunciado = Enunciado()
+
+        def al_bloque(muestras):
+            if len(muestras) == 0:
+                return
+            if not enunciado.flujo_intentado:
+                enunciado.flujo_intentado = True
+                if self.resultados_parciales:
+                    enunciado.flujo = self.stt.iniciar_flujo(
+                        self.microfono.sample_rate,
+                        lambda texto: self.despacho_anticipado.parcial(enunciado, texto)
+                    )
+            if enunciado.flujo is not None:
+                enunciado.flujo.aceptar(a_pcm16(muestras))
+
         try:
-            with sr.Microphone(device_index=0) as source:
-                current_threshold = self.energy_threshold
-                recognizer.energy_threshold = current_threshold
-                recognizer.adjust_for_ambient_noise(source, duration=0.8)
-                self.actualizar_estado_escucha(True)
-                
-                # Notificar al avatar que el asistente está escuchando
-                if hasattr(self, 'avatar_enabled') and self.avatar_enabled:
-                    try:
-                        on_assistant_listening()
-                    except Exception as e:
-                        print(f"Error al notificar avatar (escuchando): {e}")
-                
-                print("Escuchando...")
-                audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=5)
-                self.actualizar_estado_escucha(False)
-                
-                # Notificar al avatar que el asistente terminó de escuchar
-                if hasattr(self, 'avatar_enabled') and self.avatar_enabled:
-                    try:
-                        on_assistant_not_listening()
-                    except Exception as e:
-                        print(f"Error al notificar avatar (no escuchando): {e}")
-
-            processed_audio_data, processed_sample_rate = self.reducir_ruido(audio)
-            if processed_audio_data is None:
-                return False, ""
-
-            temp_filename = None
-            try:
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmpfile:
-                    temp_filename = tmpfile.name
-                sf.write(temp_filename, processed_audio_data, processed_sample_rate)
-
-                with sr.AudioFile(temp_filename) as source_file:
-                    processed_audio = recognizer.record(source_file)
-
-                comando_completo = recognizer.recognize_google(processed_audio, language="es-ES").lower()
-                print(f"Comando reconocido: {comando_completo}")
-                
-                # Agregar log del comando reconocido
-                if hasattr(self, 'avatar_enabled') and self.avatar_enabled:
-                    try:
-                        from modules.avatar.avatar_integration import avatar_manager
-                        if avatar_manager and avatar_manager.avatar:
-                            avatar_manager.avatar.add_log('command', f"Escuchado: {comando_completo}")
-                    except Exception as e:
-                        print(f"Error al agregar log de comando: {e}")
-
-                comando_completo = self.limpiar_comando(comando_completo)
-
-            finally:
-                if temp_filename:
-                    os.remove(temp_filename)
-
-            comando_completo = comando_completo.replace("de tener", "detener")
-            
-            # Generar variaciones automáticamente para el nombre actual
-            variaciones_nombre = self.generar_variaciones_nombre(self.asistente_nombre)
-            
-            print(f"Buscando variaciones de '{self.asistente_nombre}': {variaciones_nombre[:5]}...")  # Mostrar solo las primeras 5
-            
-            nombre_encontrado = None
-            for variacion in variaciones_nombre:
-                if variacion in comando_completo:
-                    nombre_encontrado = variacion
-                    print(f"Nombre encontrado: '{variacion}'")
-                    break
-            
-            if nombre_encontrado:
-                comando = comando_completo.replace(nombre_encontrado, "", 1).strip()
-                return True, comando
-            else:
-                print(f"El nombre del asistente no fue mencionado: {comando_completo}")
-                return False, ""
+            self.microfono.iniciar()
+            self.actualizar_estado_escucha(True)
+
+            # Notificar al avatar que el asistente está escuchando
+            if hasattr(self, 'avatar_enabled') and self.avatar_enabled:
+                try:
+                    on_assistant_listening()
+                except Exception as e:
+                    print(f"Error al notificar avatar (escuchando): {e}")
+
+            print("Escuchando...")
+            enunciado.audio = self.segmentador.escuchar_frase(timeout=timeout, al_bloque=al_bloque)
+            enunciado.fin = time.monotonic()
+            return enunciado
+        except sr.WaitTimeoutError:
+            if enunciado.flujo is not None:
+                enunciado.flujo.cancelar()
+            return None
+        except Exception as e:
+            print(f"Error al capturar el audio: {e}")
+            if enunciado.flujo is not None:
+                enunciado.flujo.cancelar()
+            return None
+        finally:
+            self.actualizar_estado_escucha(False)
+
+            # Notificar al avatar que el asistente terminó de escuchar
+            if hasattr(self, 'avatar_enabled') and self.avatar_enabled:
+                try:
+                    on_assistant_not_listening()
+                except Exception as e:
+                    print(f"Error al notificar avatar (no escuchando): {e}")
 
+    def audio_reciente(self, segundos=5):
+        """
+        Devuelve los últimos `segundos` de audio del micrófono como `sr.AudioData`,
+        o None si el micrófono no está abierto. No espera ni vuelve a grabar.
+        """
+        if not self.microfono.activo:
+            return None
+        if segundos > self.microfono.segundos_buffer:
+            print(f"Solo se guardan {self.microfono.segundos_buffer} s de audio; se devuelve ese máximo.")
+        muestras = self.microfono.ultimos_segundos(segundos)
+        return sr.AudioData(a_pcm16(muestras), self.microfono.sample_rate, 2)
+
+    def transcribir(self, enunciado):
+        """
+        Convierte una frase en texto con el motor de reconocimiento configurado.
+        Devuelve el mismo `Enunciado` con el texto, o None si no se entendió nada o ningún motor respondió.
+        Las frases en las que el detector acústico no oye el nombre no llegan a ningún motor.
+        """
+        if self.plantillas_pendientes > 0:
+            self.guardar_plantilla_nombre(enunciado)
+            return None
+        if self.detector_acustico is not None and enunciado.anticipado is None:
+            # Si un parcial ya contenía el nombre, la frase es para el asistente aunque el audio no lo parezca
+            if not self.detector_acustico.contiene_nombre(np.frombuffer(enunciado.audio.get_raw_data(), dtype=np.int16)):
+                if enunciado.flujo is not None:
+                    enunciado.flujo.cancelar()
+                return None
+        try:
+            t_segmentado = time.perf_counter()
+            comando_completo, motor = self.stt.reconocer(enunciado.audio, flujo=enunciado.flujo)
+            comando_completo = comando_completo.lower()
+            t_reconocido = time.perf_counter()
+            print(f"Comando reconocido: {comando_completo}")
+            print(f"Latencia de reconocimiento ({motor}): {(t_reconocido - t_segmentado) * 1000:.0f} ms")
         except sr.UnknownValueError as e:
             print("No se pudo entender el audio, posiblemente solo fue ruido:", e)
-            self.actualizar_estado_escucha(False)
-            return False, ""
+            return None
         except sr.RequestError as e:
-            print("No se pudo solicitar resultados desde el servicio de Google Speech Recognition:", e)
-            self.actualizar_estado_escucha(False)
+            print("No se pudo solicitar resultados a ningún motor de reconocimiento:", e)
+            return None
+
+        # Agregar log del comando reconocido
+        if hasattr(self, 'avatar_enabled') and self.avatar_enabled:
+            try:
+                from modules.avatar.avatar_integration import avatar_manager
+                if avatar_manager and avatar_manager.avatar:
+                    avatar_manager.avatar.add_log('command', f"Escuchado: {comando_completo}")
+            except Exception as e:
+                print(f"Error al agregar log de comando: {e}")
+
+        enunciado.texto = self.normalizar_transcripcion(comando_completo)
+        return enunciado
+
+    def registrar_voz_nombre(self, repeticiones=3):
+        """
+        Pide al usuario que diga el nombre del asistente `repeticiones` veces; las siguientes frases
+        capturadas se guardan como plantillas del detector acústico (sustituyendo las anteriores).
+        """
+        if self.detector_acustico is None:
+            self.responder_con_audio("El detector acústico del nombre está desactivado en la configuración.")
+            return
+        self.detector_acustico.borrar_plantillas()
+        self.responder_con_audio(f"Di mi nombre, {self.asistente_nombre}, {repeticiones} veces, con una pausa entre cada una.")
+        self.fin_aviso_plantillas = time.monotonic()
+        self.plantillas_pendientes = repeticiones
+
+    def guardar_plantilla_nombre(self, enunciado):
+        """Guarda una frase capturada durante el registro como plantilla del nombre."""
+        if enunciado.flujo is not None:
+            enunciado.flujo.cancelar()
+        # Lo que terminó antes de acabar el aviso (o justo después) es la propia voz del asistente
+        if enunciado.fin is not None and enunciado.fin < self.fin_aviso_plantillas + self.segmentador.hangover + 0.3:
+            return
+        if self.detector_acustico.registrar_plantilla(np.frombuffer(enunciado.audio.get_raw_data(), dtype=np.int16)):
+            self.plantillas_pendientes -= 1
+            if self.plantillas_pendientes == 0:
+                self.responder_con_audio("Listo, ya reconozco mi nombre con tu voz.")
+
+    def normalizar_transcripcion(self, comando_completo):
+        comando_completo = self.limpiar_comando(comando_completo.lower())
+        return comando_completo.replace("de tener", "detener")
+
+    def detectar_nombre(self, comando_completo, informar=True):
+        """
+        Busca el nombre del asistente en la transcripción.
+        Devuelve (True, comando sin el nombre) o (False, "") si no fue mencionado.
+        """
+        # Una sola pasada sobre las palabras con la clave fonética ya calculada para el nombre actual
+        encontrado = self.detector_nombre.buscar(comando_completo)
+
+        if encontrado:
+            inicio, fin, variacion = encontrado
+            if informar:
+                print(f"Nombre encontrado: '{variacion}'")
+            comando = ' '.join((comando_completo[:inicio] + " " + comando_completo[fin:]).split())
+            return True, comando
+        else:
+            if informar:
+                print(f"El nombre del asistente no fue mencionado: {comando_completo}")
             return False, ""
-        except Exception as e:
-            print(f"Error al procesar el audio: {e}")
-            self.actualizar_estado_escucha(False)
+
+    def reconocimiento_de_voz(self, timeout=50):
+        enunciado = self.escuchar(timeout)
+        if enunciado is None:
+            return False, ""
+        enunciado = self.transcribir(enunciado)
+        if enunciado is None:
             return False, ""
+        return self.detectar_nombre(enunciado.texto)
 
     def first_time_setup(self):
         """
@@ -464,13 +568,15 @@ class SpotifyVoiceControl:
         self.responder_con_audio(introduccion)
 
     def save_config(self):
-        config_data = {
+        # Se conservan las claves que la aplicación no gestiona (alias_comandos, motor de voz...)
+        config_data = self.config_manager.load_config()
+        config_data.update({
             "first_run": False,
             "selected_voice_index": self.engine.getProperty('voice'),
             "asistente_nombre": self.asistente_nombre,
             "acento_asistente": self.acento_asistente,
             "energy_threshold": self.energy_threshold
-        }
+        })
         self.config_manager.save_config(config_data)
 
 
@@ -556,19 +662,23 @@ class SpotifyVoiceControl:
                 self.is_internet_available = True
             else:
                 self.is_internet_available = False
-        except requests.ConnectionError:
-            self.is_internet_available = False
-        except requests.Timeout:
+        except requests.RequestException:
             self.is_internet_available = False
 
-    def procesar_comando_buscar(self, consulta):
+    def verificar_conexion_en_segundo_plano(self):
+        """Tras un fallo de Google: comprueba la red sin retrasar el reconocimiento local."""
+        Thread(target=self.verificar_conexion_internet, daemon=True).start()
+
+    def vigilar_conexion_internet(self, intervalo):
+        while True:
+            time.sleep(intervalo)
+            self.verificar_conexion_internet()
+
+    async def procesar_comando_buscar_async(self, consulta):
         try:
-            if not consulta.strip():
-                self.responder_con_audio("La consulta de búsqueda está vacía.")
-                return
-            self.spotify_controller.buscar_y_reproducir_cancion(consulta)
+            await self.spotify_controller.buscar_y_reproducir_cancion_async(consulta, self.responder_con_audio)
         except Exception as e:
-            self.responder_con_audio("Ocurrió un error al procesar el comando de búsqueda.")
+            await asyncio.to_thread(self.responder_con_audio, "Ocurrió un error al procesar el comando de búsqueda.")
             print(f"Error al procesar el comando de búsqueda: {e}")
 
     def procesar_comando_control(self, comando):
@@ -643,7 +753,13 @@ class SpotifyVoiceControl:
     def responder_con_audio(self, respuesta, idioma=None):
        # """Responde con audio utilizando la voz de Gemini Live API."""
        ## asyncio.run(self._responder_con_audio_gemini_async(respuesta, idioma))
-        
+
+        # Una respuesta de una tarea cancelada ("cállate") ya no se dice
+        token = self.ejecutor.token_actual() if getattr(self, 'ejecutor', None) else None
+        if token is not None and token.cancelado:
+            print(f"Respuesta descartada ({token.motivo or 'cancelada'}): {respuesta[:60]}")
+            return
+
         # Agregar log de la respuesta
         if hasattr(self, 'avatar_enabled') and self.avatar_enabled:
             try:
@@ -661,7 +777,8 @@ class SpotifyVoiceControl:
                 print(f"Error al notificar avatar (inicio): {e}")
         
         print("Falling back to pyttsx3 text-to-speech...")
-        self.audio_manager.responder_con_audio(respuesta, idioma)
+        self.audio_manager.responder_con_audio(respuesta, idioma,
+                                               cancelado=(lambda: token.cancelado) if token is not None else None)
         
         # Notificar al avatar que el asistente terminó de hablar
         if hasattr(self, 'avatar_enabled') and self.avatar_enabled:
@@ -708,10 +825,11 @@ class SpotifyVoiceControl:
                 wf.close()
 
                 if os.path.exists(temp_filename):
+                    iniciar_mixer_pygame()
                     pygame.mixer.music.load(temp_filename)
                     pygame.mixer.music.play()
                     while pygame.mixer.music.get_busy():
-                        pygame.time.Clock().tick(10) # Keep main thread alive while playing
+                        await asyncio.sleep(0.1) # Ceder el bucle mientras suena
 
         except Exception as e:
             print(f"Error using Gemini Text-to-Speech: {e}")
@@ -728,14 +846,17 @@ class SpotifyVoiceControl:
 
             # Fallback to pyttsx3 if Gemini voice fails (optional)
             print("Falling back to pyttsx3 text-to-speech...")
-            self.audio_manager.responder_con_audio(respuesta, idioma) # Use fallback if Gemini voice fails
+            await asyncio.to_thread(self.audio_manager.responder_con_audio, respuesta, idioma) # Use fallback if Gemini voice fails
         finally:
             if temp_filename and os.path.exists(temp_filename):
                 os.remove(temp_filename) # Clean up temporary audio file
 
 
     def detener_reproduccion_audio(self):
-        pygame.mixer.music.stop() # Stop pygame music directly, should stop Gemini voice immediately # Keep detener_reproduccion_audio, might be needed for fallback or other audio
+        # Corta la respuesta en curso y las que esperaban turno para hablar
+        self.audio_manager.detener_reproduccion_audio()
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop() # Stop pygame music directly, should stop Gemini voice immediately # Keep detener_reproduccion_audio, might be needed for fallback or other audio
 
     def esperar_por_asistente(self):
         while True:
@@ -752,33 +873,7 @@ class SpotifyVoiceControl:
 
     def listar_comandos_disponibles(self):
         self.ajustar_volumen_para_escuchar()
-        comandos = """
-        Aquí están los comandos de voz disponibles que puedes usar:
-        - 'Reproduce [nombre de la canción o artista]': Busca y reproduce la canción o artista especificado.
-        - 'Detener': Detiene la reproducción actual en Spotify.
-        - 'Siguiente': Salta a la siguiente canción en la lista de reproducción.
-        - 'Anterior': Regresa a la canción anterior en la lista de reproducción.
-        - 'Reproducir': Reanuda la reproducción si está pausada.
-        - 'Elegir dispositivo': Permite seleccionar un dispositivo específico para la reproducción.
-        - 'Validar cuenta': Reautentica tu cuenta de Spotify para verificar el acceso.
-        - 'Cambia el nombre del asistente': Permite cambiar el nombre por el cual se activa el asistente.
-        - 'Cambia el acento del asistente': Cambia el acento de voz del asistente.
-        - 'Cambia la voz del asistente': Permite seleccionar una nueva voz para el asistente.
-        - 'Cuéntame un chiste': El asistente narrará un chiste aleatorio.
-        - 'Busca en YouTube [consulta]': Busca un video en YouTube y lo reproduce.
-        - '¿Cómo se llama esta canción?': Identifica la canción que se está reproduciendo actualmente.
-        - 'Agrega a favoritos': Añade la canción actual a tu lista de canciones guardadas en Spotify.
-        - 'Reproducir favoritos': Reproduce las canciones que has marcado como favoritas en Spotify.
-        - 'Muestra mis playlists': Lista tus playlists actuales y permite seleccionar una para reproducir.
-        - 'Sube/Baja el volumen': Ajusta el volumen de reproducción en Spotify.
-        - 'Reiniciar configuración': Restablece la configuración del asistente a los valores predeterminados.
-        - 'Salir': Cierra la aplicación.
-        - 'Activar gestos': Activa el control por gestos.
-        - 'Desactivar gestos': Desactiva el control por gestos.
-        - '¿Qué ves en mi pantalla?': Describe lo que ve en la pantalla.
-        - 'Escucha audio': Analiza el audio capturado del micrófono.
-        - 'Escucha audio y dime qué canción es': Identifica la canción del audio capturado.
-        """
+        comandos = "Aquí están los comandos de voz disponibles que puedes usar:\n" + "\n".join(self.registro.ayuda())
         self.responder_con_audio(comandos)
         self.restaurar_volumen_original()
 
@@ -786,68 +881,42 @@ class SpotifyVoiceControl:
         self.spotify_controller.reautenticar_spotify(self.verificar_cuenta_premium, self.responder_con_audio)
 
     def encontrar_comando_similar(self, comando_pronunciado):
-        comandos_conocidos = {
-            "reproduce": ["reproduce", "pon", "tocar", "play", "iniciar"],
-            "detener": ["detener", "stop", "pausar", "pause", "parar"],
-            "siguiente": ["siguiente", "avanza", "next", "próxima", "adelante"],
-            "anterior": ["anterior", "previo", "before", "atrás", "regresar"],
-            "reproducir": ["reproducir", "continuar", "resume", "reanudar"],
-            "elegir dispositivo": ["elegir dispositivo", "seleccionar dispositivo", "choose device", "cambiar dispositivo"],
-            "validar cuenta": ["validar cuenta", "verificar cuenta", "validate account", "confirmar cuenta"],
-            "mostrar mis playlist": ["mostrar playlist", "ver playlist", "show playlist", "listar playlist"],
-            "salir": ["salir", "exit", "cerrar", "terminar"],
-            "cambiar acento del asistente": ["cambiar acento", "change accent", "modificar acento"],
-            "cambiar voz del asistente": ["cambiar voz", "change voice", "ajustar voz"],
-            "cambiar nombre del asistente": ["cambiar nombre", "change name", "nuevo nombre"],
-            "cuéntame un chiste": ["chiste", "un chiste", "cuéntame un chiste", "dime un chiste"],
-            "busca en youtube": ["busca en youtube", "search on youtube", "buscar video"],
-            # Comandos de video
-            "pausa video": ["pausa video", "pausar video", "pause video", "detener video"],
-            "play video": ["play video", "reproducir video", "iniciar video", "continuar video"],
-            "establece volumen": ["establece volumen", "volumen video", "cambiar volumen video"],
-            "segundo": ["segundo", "adelantar", "retroceder", "navegar video"],
-            "cómo se llama esta canción": ["qué canción es", "nombre de la canción", "what song is this", "identificar canción"],
-            "eliminar de favoritos": ["eliminar de favoritos", "quitar de favoritos", "remove favorite", "no me gusta"],
-            "agregar a favoritos": ["agregar a favoritos", "favorito", "like", "añadir a favoritos"],
-            "vlc": ["vlc música", "con vlc", "reproduce con vlc", "pon en vlc"],
-            "reiniciar configuración": ["reiniciar configuración", "restablecer configuración", "reset configuration", "reinicia configuración"],
-            "reproducir favoritos": ["reproducir favoritos", "play favorites", "canciones favoritas","mis canciones favoritas"],
-            "activar gestos": ["activar gestos", "iniciar control gestual","activa control gestual", "comenzar gestos"],
-            "desactivar gestos": ["desactiva control gestual", "detener control gestual", "parar gestos"],
-            "qué ves en mi pantalla": ["qué ves en mi pantalla", "describe mi pantalla", "ver pantalla", "pantalla"], # New command
-            "escucha audio": ["escucha audio", "analiza audio", "oir audio", "audio"], # New command
-            "escucha audio y dime qué canción es": ["escucha audio y dime qué canción es", "identifica canción audio", "canción audio"], # New command
-
-            # Modos de reproducción
-            "activar aleatorio": ["activar aleatorio", "modo aleatorio", "shuffle on", "activa shuffle"],
-            "desactivar aleatorio": ["desactivar aleatorio", "quitar aleatorio", "shuffle off", "desactiva shuffle"],
-            "cambiar aleatorio": ["cambiar aleatorio", "alternar aleatorio", "toggle shuffle", "invertir aleatorio"],
-            "repetir canción": ["repetir canción", "repetir track", "repeat song", "loop song"],
-            "repetir álbum": ["repetir álbum", "repetir lista", "repeat context", "loop album"],
-            "desactivar repetición": ["desactivar repetición", "sin repetición", "repeat off", "quitar repetición"],
-            "cambiar repetición": ["cambiar repetición", "alternar repetición", "toggle repeat", "ciclar repetición"],
-
-            # Reproducción de álbumes
-            "reproducir album": ["reproducir album", "pon album", "play album", "escuchar álbum"],
-
-            # Recomendaciones
-            "recomienda canciones": ["recomienda canciones", "sugerir canciones", "recommend tracks", "descubrir música"],
-            "recomienda artistas": ["recomienda artistas", "sugerir artistas", "recommend artists", "descubrir artistas"]
-        }
+        return self.indice_comandos.buscar(comando_pronunciado)[0]
 
-        comando_pronunciado = re.sub(r'\W+', '', comando_pronunciado.lower().strip())
-        mejor_coincidencia = None
-        mejor_puntuacion = 0
+    def catalogo_respuestas(self):
+        """Respuestas fijas del asistente: las frases literales del código y las de volumen de 0 a 100."""
+        raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return catalogo_frases(raiz, {"nuevo_volumen": range(101), "self.asistente_nombre": [self.asistente_nombre]})
 
-        for comando, sinonimos in comandos_conocidos.items():
-            for sinonimo in sinonimos:
-                sinonimo = re.sub(r'\W+', '', sinonimo.lower().strip())
-                puntuacion = lv.ratio(comando_pronunciado, sinonimo)
-                if puntuacion > mejor_puntuacion:
-                    mejor_puntuacion = puntuacion
-                    mejor_coincidencia = comando
+    def ocupado_para_presintesis(self):
+        # La presíntesis espera mientras haya comandos pendientes o en curso o el asistente esté hablando
+        return not self.ejecutor.inactivo() or self.audio_lock.locked()
 
-        return mejor_coincidencia if mejor_puntuacion > 0.8 else None
+    def generacion_interpretacion(self):
+        """Lo que, si cambia, invalida las interpretaciones guardadas en cache_intenciones."""
+        return self.registro.version, self.indice_comandos.version, getattr(self, '_asistente_nombre', None)
+
+    def interpretar_texto(self, texto, informar=True):
+        """
+        Detecta el nombre y busca el sinónimo más parecido para una transcripción ya normalizada.
+        Devuelve (comando_reconocido, comando_pronunciado, comando_normalizado, comando_similar),
+        guardado en caché por texto.
+        """
+        def calcular():
+            comando_reconocido, comando_pronunciado = self.detectar_nombre(texto, informar)
+            if not comando_reconocido or not comando_pronunciado:
+                return comando_reconocido, comando_pronunciado, "", None
+            comando_normalizado = unidecode.unidecode(comando_pronunciado.lower()).strip()
+            return comando_reconocido, comando_pronunciado, comando_normalizado, self.encontrar_comando_similar(comando_normalizado)
+        return self.cache_intenciones.obtener(("texto", texto), calcular)
+
+    def agregar_alias_comandos(self, alias):
+        """Añade al índice los alias de la configuración ({"frase": "intención"})."""
+        for frase, comando in alias.items():
+            if comando not in self.registro.intenciones:
+                print(f"Alias '{frase}' ignorado: no existe la intención '{comando}'.")
+                continue
+            self.indice_comandos.agregar(comando, frase)
 
     def contar_chiste(self):
         chiste_text = self.joke_generator.get_joke()
@@ -892,215 +961,73 @@ class SpotifyVoiceControl:
     def ejecutar(self):
         try:
             self.autenticar_spotify()
-            while True:
-
-                comando_reconocido, comando_pronunciado = self.reconocimiento_de_voz()
-                if comando_reconocido:
-
-                    comando_normalizado = unidecode.unidecode(comando_pronunciado.lower()).strip()
-                    print(f"Comando normalizado: '{comando_normalizado}'")
+            self.microfono.iniciar()
+            self.pipeline.iniciar()
+            if self.presintetizador is not None:
+                self.presintetizador.iniciar()
+            # Profundidad de colas y descartes cada minuto mientras el pipeline esté vivo
+            while not self.pipeline.esperar(timeout=60):
+                print(self.pipeline.resumen_metricas())
+                print(f"Comandos adelantados: {self.despacho_anticipado.metricas()}")
+                print(f"Caché de interpretación: {self.cache_intenciones.metricas()}")
+                print(f"Ejecutor de tareas: {self.ejecutor.metricas()}")
+                print(f"Caché de voz: {self.cache_voz.metricas()}")
+                if self.presintetizador is not None and not self.presintetizador.terminado.is_set():
+                    print(f"Presíntesis de voz: {self.presintetizador.metricas()}")
+                if self.detector_acustico is not None and self.detector_acustico.activo:
+                    print(f"Detector acústico del nombre: {self.detector_acustico.metricas()}")
+            print(self.pipeline.resumen_metricas())
+        except Exception as e:
+            print(f"Error inesperado: {e}")
+            self.responder_con_audio("Ocurrió un error inesperado. Por favor, intenta nuevamente más tarde.") # Now using Gemini voice
 
-                    comando_similar = self.encontrar_comando_similar(comando_normalizado)
-                    print(f"Comando similar encontrado: '{comando_similar}'")
+    def interpretar(self, enunciado):
+        """
+        Etapa de interpretación: comprueba el nombre del asistente y busca el comando conocido.
+        Devuelve (comando_pronunciado, comando, comando_similar) o None si la frase no era para el
+        asistente o su comando ya se ejecutó con un resultado parcial.
+        """
+        peticion = None
+        comando_reconocido, comando_pronunciado, comando_normalizado, comando_similar = self.interpretar_texto(enunciado.texto)
+        if not comando_reconocido:
+            print("Comando no reconocido o no destinado al asistente.")
+        else:
+            print(f"Comando normalizado: '{comando_normalizado}'")
+            print(f"Comando similar encontrado: '{comando_similar}'")
 
-                    if comando_similar:
-                        comando = comando_similar
-                    else:
-                        comando = comando_normalizado
-                        self.guardar_comando(comando_normalizado)
-                    if comando.startswith("reproduce"):
-                        consulta = comando_pronunciado.replace("reproduce", "", 1).strip() if comando_similar else " ".join(comando_pronunciado.split()[1:])
-                        if consulta:
-                            self.procesar_comando_buscar(consulta)
-
-                    elif "cuéntame un chiste" in comando:
-                        self.ajustar_volumen_para_escuchar()
-                        self.contar_chiste()
-                        self.restaurar_volumen_original()
-                    elif "play video" in comando :
-                        self.play_video()
-                    elif "reiniciar configuración"in comando:
-                        self.reiniciar_configuracion()
-                    elif "pausa video" in comando:
-                        self.pause_video()
-                    elif comando.startswith("establece volume"):
-                        volume = self.extraer_numero(comando)
-                        if volume is not None:
-                            self.set_video_volume(volume)
-                        else:
-                            print("No se especificó un volumen válido.")
-                    elif comando.startswith("segundo"):
-                        seconds = self.extraer_numero(comando)
-                        if seconds is not None:
-                            self.seek_video(seconds)
-                        else:
-                            print("No se especificaron segundos válidos para buscar.")
-                    elif comando.startswith("busca en youtube"):
-                        busqueda = comando_pronunciado.replace("busca en youtube", "", 1).strip() if comando_similar else " ".join(comando_pronunciado.split()[1:])
-                        if busqueda:
-                         self.buscar_youtube_y_reproducir(busqueda)
-                    elif comando.startswith("vlc"):
-                        video = comando_pronunciado.replace("vlc", "", 1).strip() if comando_similar else " ".join(comando_pronunciado.split()[1:])
-                        if video:
-                            self.buscar_youtube_y_reproducir_con_vlc(video)
-
-                    elif comando in ["pausa vlc", "continuar vlc", "vlc pausa", "vlc continuar"]:
-                        self.vlc_play_pause()
-                    elif comando.startswith("vlc volumen") or comando.startswith("volumen vlc"):
-                        palabras = comando.split()
-                        numero = None
-                        for palabra in palabras:
-                            if palabra.isdigit():
-                                numero = int(palabra)
-                                break
-                        if numero is not None:
-                            self.vlc_set_volume(numero)
-                        else:
-                            self.responder_con_audio("Por favor, indica un número después de 'volumen' para establecer el volumen.")
-
-                    elif "reproducir favoritos" in comando:
-                            self.ajustar_volumen_para_escuchar()
-                            self.reproducir_canciones_favoritas()
-                            self.restaurar_volumen_original()
-
-                    elif comando in ["cállate", "callate", "silencio", "detente"]:
-                        self.detener_reproduccion_audio()
-                        print("Reproducción de audio detenida.")
-                        continue
-
-
-                    elif comando == "activar gestos":
-                        self.activar_control_gestual()
-                    elif comando == "desactivar gestos":
-                        self.desactivar_control_gestual()
-                    elif comando in ["detener", "siguiente", "anterior", "reproducir"]:
-                        self.ajustar_volumen_para_escuchar()
-                        self.procesar_comando_control(comando)
-                        self.restaurar_volumen_original()
-                    elif "agregar a favoritos" in comando:
-                        self.agregar_cancion_a_favoritos()
-                    elif "eliminar de favoritos" in comando:
-                        self.spotify_controller.eliminar_de_favoritos()
-
-                    # Comandos de modos de reproducción
-                    elif comando == "activar aleatorio":
-                        self.spotify_controller.activar_desactivar_aleatorio(True)
-                    elif comando == "desactivar aleatorio":
-                        self.spotify_controller.activar_desactivar_aleatorio(False)
-                    elif comando == "cambiar aleatorio":
-                        self.spotify_controller.cambiar_aleatorio()
-                    elif comando == "repetir canción":
-                        self.spotify_controller.modo_repeticion('track')
-                    elif comando == "repetir álbum":
-                        self.spotify_controller.modo_repeticion('context')
-                    elif comando == "desactivar repetición":
-                        self.spotify_controller.modo_repeticion('off')
-                    elif comando == "cambiar repetición":
-                        self.spotify_controller.cambiar_repeticion()
-                    elif comando.startswith("reproducir album"):
-                        album_nombre = comando_pronunciado.replace("reproducir album", "", 1).replace("reproducir álbum", "", 1).strip()
-                        self.spotify_controller.reproducir_album(album_nombre)
-                     # Comandos de recomendaciones
-                    elif comando == "recomienda canciones":
-                        self.spotify_controller.obtener_recomendaciones('track')
-                    elif comando == "recomienda artistas":
-                        self.spotify_controller.obtener_recomendaciones('artist')
-                    elif "elegir dispositivo" in comando:
-                        self.elegir_y_forzar_dispositivo()
-                    elif "validar cuenta" in comando:
-                        self.reautenticar_spotify()
-                    elif "mostrar mis playlist" in comando:
-                        self.procesar_comando_mostrar_playlists()
-
-                    elif "cómo se llama esta canción" in comando:
-                        self.ajustar_volumen_para_escuchar()
-                        self.obtener_nombre_cancion_actual()
-                        self.restaurar_volumen_original()
-
-                    elif comando == "cambiar acento del asistente":
-                         self.cambiar_acento_asistente()
-                    elif comando == "cambiar voz del asistente":
-                         self.cambiar_voz_asistente()
-                    elif "clima" in comando_pronunciado:
-                        self.ajustar_volumen_para_escuchar()
-                        self.procesar_comando_clima(comando_pronunciado)
-                        self.restaurar_volumen_original()
-                    elif comando.startswith("dime"):
-                        partes_comando = comando.split()
-                        if "en" in partes_comando:
-                            aspecto = " ".join(partes_comando[1:partes_comando.index("en")])
-                            ciudad = " ".join(partes_comando[partes_comando.index("en") + 1:])
-                            mensaje_clima = self.obtener_clima_de(ciudad, aspecto.strip())
-                            self.responder_con_audio(mensaje_clima) # Now using Gemini voice
-                    elif "subir volumen" in comando or "bajar volumen" in comando:
-                        self.procesar_comando_volumen(comando)
-                    elif "volumen" in comando:
-
-                        comando_limpio = re.sub(r'[^0-9\s]','',comando)
-
-                        palabras = comando_limpio.split()
-                        numero = None
-                        for i, palabra in enumerate(palabras):
-                            if palabra.isdigit():
-                                numero = int(palabra)
-                                break
-                        if numero is not None:
-                            self.ajustar_volumen(numero)
-                        else:
-                            self.responder_con_audio("Por favor, indica un número después de 'volumen' para establecer el volumen.") # Now using Gemini voice
-                    elif "salir" in comando:
-                        self.responder_con_audio("Saliendo de la aplicación") # Now using Gemini voice
-                        # La aplicación se cierra desde el avatar principal
-                        break
-
-                    elif comando == "cambiar nombre del asistente":
-                        self.cambiar_nombre_asistente()
-
-                    elif comando == "qué ves en mi pantalla": # New command handling
-                        screen_file = self.capture_screen()
-                        if screen_file:
-                            # Execute Gemini processing in a separate thread
-                            thread = threading.Thread(target=self._procesar_comando_no_reconocido_thread, args=("Describe lo que ves en esta imagen", screen_file, None, False))
-                            thread.daemon = True
-                            thread.start()
-                        else:
-                            self.responder_con_audio("No pude capturar la pantalla.") # Now using Gemini voice
-
-                    elif comando == "escucha audio": # New command handling
-                        audio_file = self.capture_audio()
-                        if audio_file:
-                            # Execute Gemini processing in a separate thread
-                            thread = threading.Thread(target=self._procesar_comando_no_reconocido_thread, args=("Analiza este audio", None, audio_file, False))
-                            thread.daemon = True
-                            thread.start()
-                        else:
-                            self.responder_con_audio("No pude capturar el audio.") # Now using Gemini voice
-
-                    elif comando == "escucha audio y dime qué canción es": # New command handling
-                        audio_file = self.capture_audio()
-                        if audio_file:
-                            # Execute Gemini processing in a separate thread
-                            thread = threading.Thread(target=self._procesar_comando_no_reconocido_thread, args=("¿Qué canción es esta?", None, audio_file, True))
-                            thread.daemon = True
-                            thread.start()
-                        else:
-                            self.responder_con_audio("No pude capturar el audio.") # Now using Gemini voice
+            if comando_similar:
+                comando = comando_similar
+            else:
+                comando = comando_normalizado
+                self.guardar_comando(comando_normalizado)
+            peticion = (comando_pronunciado, comando, comando_similar)
+        return self.despacho_anticipado.confirmar(enunciado, peticion)
 
+    def interpretar_parcial(self, texto_parcial):
+        """
+        Interpreta una hipótesis parcial sin efectos secundarios.
+        Devuelve la petición solo si corresponde a un comando conocido.
+        """
+        _, comando_pronunciado, _, comando_similar = self.interpretar_texto(self.normalizar_transcripcion(texto_parcial), informar=False)
+        if not comando_similar:
+            return None
+        return comando_pronunciado, comando_similar, comando_similar
 
-                    else:
-                        if self.es_consulta_valida(comando):
-                            # Execute Gemini processing in a separate thread
-                            thread = threading.Thread(target=self._procesar_comando_no_reconocido_thread, args=(comando_pronunciado, None, None, False))
-                            thread.daemon = True
-                            thread.start()
-                        else:
-                            print("Comando no reconocido y no es una consulta válida.")
+    def es_comando_ambiguo(self, peticion):
+        """True si lo pronunciado es el principio de un sinónimo de otro comando (p. ej. "pausa" -> "pausa video")."""
+        return self.indice_comandos.es_prefijo_de_otro(peticion[0], peticion[1])
 
-                else:
-                 print("Comando no reconocido o no destinado al asistente.")
-        except Exception as e:
-            print(f"Error inesperado: {e}")
-            self.responder_con_audio("Ocurrió un error inesperado. Por favor, intenta nuevamente más tarde.") # Now using Gemini voice
+    def ejecutar_comando(self, peticion):
+        """
+        Etapa de ejecución: resuelve la intención de la petición en el registro y lanza su manejador.
+        Devuelve False cuando el usuario pide salir para detener el pipeline.
+        """
+        comando_pronunciado, comando, comando_similar = peticion
+        intencion, slots = self.cache_intenciones.obtener(
+            ("intencion", comando_pronunciado, comando_similar),
+            lambda: self.registro.resolver(comando_pronunciado, comando_similar))
+        # Copia: los manejadores reciben slots propios aunque la resolución venga de la caché
+        return self.registro.despachar(self, intencion, dict(slots))
 
     def _procesar_comando_no_reconocido_thread(self, texto, video_file=None, audio_file=None, is_music_query=False):
         """
@@ -1179,13 +1106,12 @@ class SpotifyVoiceControl:
     def obtener_nombre_cancion_actual(self):
         self.spotify_controller.obtener_nombre_cancion_actual(self.responder_con_audio) # Now using Gemini voice
 
-    def procesar_comando_clima(self, comando_pronunciado):
-        ciudad, aspecto = self.weather_service.extraer_ciudad_aspecto(comando_pronunciado)
+    def procesar_comando_clima(self, ciudad, aspecto="resumen"):
         if not ciudad:
             self.responder_con_audio("Por favor, especifica la ciudad para la que deseas conocer el clima.") # Now using Gemini voice
             return
 
-        mensaje_clima = self.obtener_clima_de(ciudad, aspecto)
+        mensaje_clima = self.obtener_clima_de(ciudad, aspecto or "resumen")
         self.responder_con_audio(mensaje_clima) # Now using Gemini voice
 
     def obtener_clima_de(self, ciudad, aspecto):
@@ -1221,22 +1147,6 @@ class SpotifyVoiceControl:
         except Exception as e:
             print(f"No se pudo guardar el error en el archivo: {e}")
 
-    def procesar_comando_volumen(self, comando):
-        try:
-            if "subir volumen" in comando:
-                self.subir_volumen()
-            elif "bajar volumen" in comando:
-                self.bajar_volumen()
-            else:
-                numero = self.extraer_numero(comando)
-                if numero is not None:
-                    self.ajustar_volumen(numero)
-                else:
-                    self.responder_con_audio("Comando de volumen no reconocido.") # Now using Gemini voice
-        except Exception as e:
-            print(f"Error al procesar comando de volumen: {e}")
-            self.responder_con_audio("Ocurrió un error al procesar el comando de volumen.") # Now using Gemini voice
-
     def subir_volumen(self):
         self.spotify_controller.subir_volumen(self.responder_con_audio) # Now using Gemini voice
 
@@ -1246,23 +1156,14 @@ class SpotifyVoiceControl:
     def ajustar_volumen(self, volumen):
         self.spotify_controller.ajustar_volumen(volumen, self.responder_con_audio) # Now using Gemini voice
 
-    def extraer_numero(self, texto):
-        try:
-            numero = None
-            palabras = texto.split()
-            for palabra in palabras:
-                if palabra.isdigit():
-                    numero = int(palabra)
-                    break
-            return numero
-        except Exception as e:
-            print(f"Error al extraer número del texto: {e}")
-            return None
-
-    def on_threshold_change(self, event):
+    def on_threshold_change(self, event=None):
         """Guarda la configuración cuando el valor del energy_threshold cambia."""
+        # El slider de la GUI solo avisa al soltarlo; el del avatar ya ha fijado el valor
+        if event is not None and getattr(self, 'energy_threshold_slider', None) is not None:
+            self.energy_threshold = self.energy_threshold_slider.get()
         self.save_config()
-        print(f"Nuevo umbral de energía guardado: {self.energy_threshold_slider.get()}")
+        print(f"Nuevo nivel de supresión de ruido guardado: {self.energy_threshold} "
+              f"(umbral = {self.rastreador_ruido.ratio:.2f} veces el ruido de fondo)")
 
     def cambiar_nombre_asistente(self):
         nuevo_nombre = input("Ingresa el nuevo nombre para el asistente: ").strip()
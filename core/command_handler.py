@@ -1,3 +1,593 @@
 # spotify_voice_control/core/command_handler.py
-# Este archivo puede contener lógica específica para el manejo de comandos en el futuro, si es necesario.
-# Por ahora, la lógica principal se mantiene en app_core.py
\ No newline at end of file
+# Registro de intenciones: cada comando de voz se declara una sola vez con sus sinónimos, los
+# prefijos que llevan argumento, los slots que extrae y cómo se ejecuta. A partir de este registro
+# se generan la tabla de sinónimos de encontrar_comando_similar, la lista de comandos disponibles
+# y la tabla de despacho de ejecutar_comando. Los manejadores pueden ser funciones o corrutinas;
+# las corrutinas se ejecutan en el bucle de eventos de la aplicación (core/event_loop.py).
+import asyncio
+import re
+from collections import defaultdict
+import unidecode
+
+from core.slot_grammar import GramaticaSlots
+from core.task_executor import TareaCancelada
+
+
+class Politica:
+    """
+    Cómo se ejecuta una intención:
+      - silenciar: baja la música mientras se ejecuta (ajustar/restaurar volumen)
+      - prioridad: clase en el ejecutor de tareas ("control" para los controles de reproducción,
+        "normal", "lenta" para Gemini, visión y análisis de audio)
+      - plazo: segundos que puede esperar en la cola antes de descartarse (por defecto, el de su prioridad)
+      - en_linea: se ejecuta en la propia etapa de ejecución, sin pasar por el ejecutor
+      - anticipable: puede ejecutarse con un resultado parcial estable (despacho anticipado)
+      - compensacion: intención que deshace esta si el despacho anticipado se cancela
+    """
+
+    def __init__(self, silenciar=False, prioridad="normal", plazo=None, en_linea=False, anticipable=False, compensacion=None):
+        self.silenciar = silenciar
+        self.prioridad = prioridad
+        self.plazo = plazo
+        self.en_linea = en_linea
+        self.anticipable = anticipable
+        self.compensacion = compensacion
+
+
+class Intencion:
+    """
+    Un comando registrado. `slots` describe los argumentos que se extraen de lo pronunciado:
+    {nombre: "texto"} toma lo que sigue al prefijo, "entero" el primer número (en cifras o en
+    palabras), "duracion" una duración en segundos y "ciudad"/"aspecto" el lugar y el dato del
+    clima. Los tipos no textuales los lee la GramaticaSlots que se compila al registrarla.
+    """
+
+    def __init__(self, id, manejador, sinonimos=(), prefijos=(), palabras_clave=(), slots=None,
+                 politica=None, ejemplo=None, descripcion=None):
+        self.id = id
+        self.manejador = manejador
+        self.sinonimos = list(sinonimos)
+        self.prefijos = list(prefijos)
+        self.palabras_clave = list(palabras_clave)
+        self.slots = slots or {}
+        self.gramatica = GramaticaSlots(self.slots)
+        self.politica = politica or Politica()
+        self.ejemplo = ejemplo
+        self.descripcion = descripcion
+
+
+def normalizar_palabra(palabra):
+    return re.sub(r'\W+', '', unidecode.unidecode(palabra.lower()))
+
+
+class RegistroIntenciones:
+    """
+    Tabla de intenciones con despacho por diccionario.
+
+    `resolver` busca, en este orden: la intención del sinónimo reconocido para la frase completa
+    (encontrar_comando_similar) o cuyo nombre es la frase completa, el prefijo con argumento más
+    largo ("reproduce ...", "vlc volumen ..."), una palabra clave ("clima", "volumen") y, si nada
+    coincide, la intención por defecto.
+    Los prefijos se indexan por su primera palabra, así que la búsqueda no depende del número de
+    comandos ni del orden en que se registraron.
+    """
+
+    def __init__(self):
+        self.intenciones = {}
+        self._prefijos = defaultdict(list)
+        self._palabras_clave = []
+        self._nombres = {}
+        self.por_defecto = None
+        # Cambia con cada intención registrada; invalida las resoluciones guardadas en caché
+        self.version = 0
+
+    def intencion(self, id, sinonimos=(), prefijos=(), palabras_clave=(), slots=None, politica=None,
+                  ejemplo=None, descripcion=None, por_defecto=False):
+        """Decorador que registra `manejador(app, slots)` como la intención `id`."""
+        def registrar(manejador):
+            if id in self.intenciones:
+                raise ValueError(f"La intención '{id}' ya está registrada")
+            intencion = Intencion(id, manejador, sinonimos, prefijos, palabras_clave, slots, politica, ejemplo, descripcion)
+            self.intenciones[id] = intencion
+            self._nombres[tuple(normalizar_palabra(p) for p in id.split())] = intencion
+            for prefijo in intencion.prefijos:
+                palabras = tuple(normalizar_palabra(p) for p in prefijo.split())
+                self._prefijos[palabras[0]].append((palabras, intencion))
+                self._prefijos[palabras[0]].sort(key=lambda entrada: len(entrada[0]), reverse=True)
+            for clave in intencion.palabras_clave:
+                self._palabras_clave.append((normalizar_palabra(clave), intencion))
+            if por_defecto:
+                self.por_defecto = intencion
+            self.version += 1
+            return manejador
+        return registrar
+
+    def tabla_sinonimos(self):
+        """{intención: sinónimos} para encontrar_comando_similar."""
+        return {id: intencion.sinonimos for id, intencion in self.intenciones.items() if intencion.sinonimos}
+
+    def anticipables(self):
+        return [id for id, intencion in self.intenciones.items() if intencion.politica.anticipable]
+
+    def compensaciones(self):
+        return {id: intencion.politica.compensacion for id, intencion in self.intenciones.items()
+                if intencion.politica.compensacion}
+
+    def ayuda(self):
+        """Líneas "- 'ejemplo': descripción" de las intenciones documentadas, en orden de registro."""
+        return [f"- '{intencion.ejemplo}': {intencion.descripcion}"
+                for intencion in self.intenciones.values() if intencion.ejemplo and intencion.descripcion]
+
+    def _prefijo(self, palabras, intencion=None):
+        """Devuelve (intención, palabras del prefijo) del prefijo más largo con el que empieza la frase."""
+        if not palabras:
+            return None, 0
+        normalizadas = tuple(normalizada for normalizada, _ in palabras)
+        for prefijo, candidata in self._prefijos.get(normalizadas[0], ()):
+            if intencion is not None and candidata is not intencion:
+                continue
+            if normalizadas[:len(prefijo)] == prefijo:
+                return candidata, len(prefijo)
+        return None, 0
+
+    def resolver(self, texto, comando_similar=None):
+        """Devuelve (intención, slots) para lo pronunciado; la intención es None si no hay por defecto."""
+        palabras = [(normalizar_palabra(p), p) for p in texto.split()]
+        palabras = [(normalizada, original) for normalizada, original in palabras if normalizada]
+
+        # Sin sinónimo parecido, la frase puede ser el propio nombre de la intención ("cambiar acento del asistente")
+        intencion = self.intenciones.get(comando_similar) or self._nombres.get(tuple(normalizada for normalizada, _ in palabras))
+        if intencion is not None:
+            _, prefijo = self._prefijo(palabras, intencion)
+            # Sin prefijo, la frase entera es el sinónimo: no queda texto para los slots
+            consumidas = prefijo or len(palabras)
+        else:
+            intencion, prefijo = self._prefijo(palabras)
+            consumidas = prefijo
+        if intencion is None:
+            presentes = {normalizada for normalizada, _ in palabras}
+            intencion = next((candidata for clave, candidata in self._palabras_clave if clave in presentes), None)
+            prefijo = consumidas = 0
+        if intencion is None:
+            intencion = self.por_defecto
+            prefijo = consumidas = 0
+        return intencion, self._extraer_slots(intencion, texto, palabras, prefijo, consumidas)
+
+    def _extraer_slots(self, intencion, texto, palabras, prefijo, consumidas):
+        slots = {"texto": texto, "comando": ' '.join(normalizada for normalizada, _ in palabras)}
+        if intencion is None:
+            return slots
+        for nombre, tipo in intencion.slots.items():
+            if tipo == "texto":
+                slots[nombre] = ' '.join(original for _, original in palabras[consumidas:])
+        slots.update(intencion.gramatica.analizar([normalizada for normalizada, _ in palabras],
+                                                  [original for _, original in palabras], prefijo))
+        return slots
+
+    def despachar(self, app, intencion, slots):
+        """
+        Ejecuta la intención según su política: en el ejecutor de tareas de la aplicación, con su
+        prioridad y plazo, o en línea si la política lo pide (o si no hay ejecutor).
+        Devuelve False si el manejador pide detener el pipeline.
+        """
+        if intencion is None:
+            print(f"Comando no reconocido: {slots['texto']}")
+            return True
+        ejecutor = getattr(app, 'ejecutor', None)
+        if intencion.politica.en_linea or ejecutor is None:
+            return self._ejecutar(app, intencion, slots) is not False
+        tarea = ejecutor.enviar(self._ejecutar, app, intencion, slots, nombre=intencion.id,
+                                prioridad=intencion.politica.prioridad, plazo=intencion.politica.plazo)
+        if tarea is None:
+            print(f"No se pudo encolar la intención '{intencion.id}'")
+        return True
+
+    def _ejecutar(self, app, intencion, slots):
+        print(f"Ejecutando intención '{intencion.id}'")
+        try:
+            if intencion.politica.silenciar:
+                app.ajustar_volumen_para_escuchar()
+            try:
+                resultado = intencion.manejador(app, slots)
+                if asyncio.iscoroutine(resultado):
+                    bucle = getattr(app, 'bucle', None)
+                    resultado = bucle.ejecutar(resultado) if bucle is not None else asyncio.run(resultado)
+                return resultado
+            finally:
+                if intencion.politica.silenciar:
+                    app.restaurar_volumen_original()
+        except TareaCancelada:
+            raise
+        except Exception as e:
+            print(f"Error al ejecutar la intención '{intencion.id}': {e}")
+            return True
+
+
+REGISTRO = RegistroIntenciones()
+intencion = REGISTRO.intencion
+
+
+# Reproducción en Spotify
+
+@intencion("reproduce", sinonimos=["reproduce", "pon", "tocar", "play", "iniciar"],
+           prefijos=["reproduce", "reproducir", "pon", "tocar", "play"], slots={"consulta": "texto"},
+           ejemplo="Reproduce [nombre de la canción o artista]",
+           descripcion="Busca y reproduce la canción o artista especificado.")
+async def reproduce(app, slots):
+    if slots["consulta"]:
+        await app.procesar_comando_buscar_async(slots["consulta"])
+
+
+@intencion("detener", sinonimos=["detener", "stop", "pausar", "pause", "parar"],
+           politica=Politica(silenciar=True, prioridad="control", anticipable=True, compensacion="reproducir"),
+           ejemplo="Detener", descripcion="Detiene la reproducción actual en Spotify.")
+def detener(app, slots):
+    app.procesar_comando_control("detener")
+
+
+@intencion("siguiente", sinonimos=["siguiente", "avanza", "next", "próxima", "adelante"],
+           politica=Politica(silenciar=True, prioridad="control", anticipable=True, compensacion="anterior"),
+           ejemplo="Siguiente", descripcion="Salta a la siguiente canción en la lista de reproducción.")
+def siguiente(app, slots):
+    app.procesar_comando_control("siguiente")
+
+
+@intencion("anterior", sinonimos=["anterior", "previo", "before", "atrás", "regresar"],
+           politica=Politica(silenciar=True, prioridad="control", anticipable=True, compensacion="siguiente"),
+           ejemplo="Anterior", descripcion="Regresa a la canción anterior en la lista de reproducción.")
+def anterior(app, slots):
+    app.procesar_comando_control("anterior")
+
+
+@intencion("reproducir", sinonimos=["reproducir", "continuar", "resume", "reanudar"],
+           politica=Politica(silenciar=True, prioridad="control", anticipable=True, compensacion="detener"),
+           ejemplo="Reproducir", descripcion="Reanuda la reproducción si está pausada.")
+def reproducir(app, slots):
+    app.procesar_comando_control("reproducir")
+
+
+@intencion("elegir dispositivo", sinonimos=["elegir dispositivo", "seleccionar dispositivo", "choose device", "cambiar dispositivo"],
+           ejemplo="Elegir dispositivo", descripcion="Permite seleccionar un dispositivo específico para la reproducción.")
+def elegir_dispositivo(app, slots):
+    app.elegir_y_forzar_dispositivo()
+
+
+@intencion("validar cuenta", sinonimos=["validar cuenta", "verificar cuenta", "validate account", "confirmar cuenta"],
+           ejemplo="Validar cuenta", descripcion="Reautentica tu cuenta de Spotify para verificar el acceso.")
+def validar_cuenta(app, slots):
+    app.reautenticar_spotify()
+
+
+# Configuración del asistente
+
+@intencion("cambiar nombre del asistente", sinonimos=["cambiar nombre", "change name", "nuevo nombre"],
+           ejemplo="Cambia el nombre del asistente", descripcion="Permite cambiar el nombre por el cual se activa el asistente.")
+def cambiar_nombre(app, slots):
+    app.cambiar_nombre_asistente()
+
+
+@intencion("registrar nombre", sinonimos=["registrar nombre", "aprender nombre", "entrenar nombre", "grabar nombre"],
+           ejemplo="Registrar nombre", descripcion="Graba tu voz diciendo el nombre del asistente para reconocerlo sin conexión.")
+def registrar_nombre(app, slots):
+    app.registrar_voz_nombre()
+
+
+@intencion("cambiar acento del asistente", sinonimos=["cambiar acento", "change accent", "modificar acento"],
+           ejemplo="Cambia el acento del asistente", descripcion="Cambia el acento de voz del asistente.")
+def cambiar_acento(app, slots):
+    app.cambiar_acento_asistente()
+
+
+@intencion("cambiar voz del asistente", sinonimos=["cambiar voz", "change voice", "ajustar voz"],
+           ejemplo="Cambia la voz del asistente", descripcion="Permite seleccionar una nueva voz para el asistente.")
+def cambiar_voz(app, slots):
+    app.cambiar_voz_asistente()
+
+
+@intencion("cuéntame un chiste", sinonimos=["chiste", "un chiste", "cuéntame un chiste", "dime un chiste"],
+           politica=Politica(silenciar=True),
+           ejemplo="Cuéntame un chiste", descripcion="El asistente narrará un chiste aleatorio.")
+def chiste(app, slots):
+    app.contar_chiste()
+
+
+# YouTube y reproductores de video
+
+@intencion("busca en youtube", sinonimos=["busca en youtube", "search on youtube", "buscar video"],
+           prefijos=["busca en youtube", "buscar en youtube", "buscar video", "search on youtube"], slots={"consulta": "texto"},
+           ejemplo="Busca en YouTube [consulta]", descripcion="Busca un video en YouTube y lo reproduce.")
+def busca_en_youtube(app, slots):
+    if slots["consulta"]:
+        app.buscar_youtube_y_reproducir(slots["consulta"])
+
+
+@intencion("play video", sinonimos=["play video", "reproducir video", "iniciar video", "continuar video"],
+           politica=Politica(prioridad="control"),
+           ejemplo="Play video", descripcion="Reanuda el video de YouTube.")
+def play_video(app, slots):
+    app.play_video()
+
+
+@intencion("pausa video", sinonimos=["pausa video", "pausar video", "pause video", "detener video"],
+           politica=Politica(prioridad="control"),
+           ejemplo="Pausa video", descripcion="Pausa el video de YouTube.")
+def pausa_video(app, slots):
+    app.pause_video()
+
+
+@intencion("establece volumen", sinonimos=["establece volumen", "volumen video", "cambiar volumen video"],
+           prefijos=["establece volumen", "volumen video"], slots={"volumen": "entero"},
+           politica=Politica(prioridad="control"),
+           ejemplo="Establece volumen [número]", descripcion="Ajusta el volumen del video.")
+def establece_volumen(app, slots):
+    if slots["volumen"] is not None:
+        app.set_video_volume(slots["volumen"])
+    else:
+        print("No se especificó un volumen válido.")
+
+
+@intencion("segundo", sinonimos=["segundo", "adelantar", "retroceder", "navegar video"],
+           prefijos=["segundo", "adelantar", "retroceder"], slots={"segundos": "duracion"},
+           politica=Politica(prioridad="control"),
+           ejemplo="Segundo [número]", descripcion="Lleva el video al segundo indicado.")
+def segundo(app, slots):
+    if slots["segundos"] is not None:
+        app.seek_video(slots["segundos"])
+    else:
+        print("No se especificaron segundos válidos para buscar.")
+
+
+@intencion("vlc", sinonimos=["vlc música", "con vlc", "reproduce con vlc", "pon en vlc"],
+           prefijos=["vlc", "con vlc", "reproduce con vlc", "pon en vlc"], slots={"video": "texto"},
+           ejemplo="VLC [consulta]", descripcion="Busca un video en YouTube y lo reproduce con VLC.")
+def vlc(app, slots):
+    if slots["video"]:
+        app.buscar_youtube_y_reproducir_con_vlc(slots["video"])
+
+
+@intencion("pausa vlc", sinonimos=["pausa vlc", "continuar vlc", "vlc pausa", "vlc continuar"],
+           prefijos=["pausa vlc", "continuar vlc", "vlc pausa", "vlc continuar"],
+           politica=Politica(prioridad="control"),
+           ejemplo="Pausa VLC", descripcion="Pausa o reanuda VLC.")
+def pausa_vlc(app, slots):
+    app.vlc_play_pause()
+
+
+@intencion("vlc volumen", sinonimos=["vlc volumen", "volumen vlc"],
+           prefijos=["vlc volumen", "volumen vlc"], slots={"volumen": "entero"},
+           politica=Politica(prioridad="control"),
+           ejemplo="VLC volumen [número]", descripcion="Ajusta el volumen de VLC.")
+def vlc_volumen(app, slots):
+    if slots["volumen"] is not None:
+        app.vlc_set_volume(slots["volumen"])
+    else:
+        app.responder_con_audio("Por favor, indica un número después de 'volumen' para establecer el volumen.")
+
+
+# Información y favoritos
+
+@intencion("cómo se llama esta canción", sinonimos=["qué canción es", "nombre de la canción", "what song is this", "identificar canción"],
+           politica=Politica(silenciar=True),
+           ejemplo="¿Cómo se llama esta canción?", descripcion="Identifica la canción que se está reproduciendo actualmente.")
+def como_se_llama(app, slots):
+    app.obtener_nombre_cancion_actual()
+
+
+@intencion("agregar a favoritos", sinonimos=["agregar a favoritos", "favorito", "like", "añadir a favoritos"],
+           ejemplo="Agrega a favoritos", descripcion="Añade la canción actual a tu lista de canciones guardadas en Spotify.")
+def agregar_favoritos(app, slots):
+    app.agregar_cancion_a_favoritos()
+
+
+@intencion("eliminar de favoritos", sinonimos=["eliminar de favoritos", "quitar de favoritos", "remove favorite", "no me gusta"],
+           ejemplo="Elimina de favoritos", descripcion="Quita la canción actual de tus canciones guardadas en Spotify.")
+def eliminar_favoritos(app, slots):
+    app.spotify_controller.eliminar_de_favoritos()
+
+
+@intencion("reproducir favoritos", sinonimos=["reproducir favoritos", "play favorites", "canciones favoritas", "mis canciones favoritas"],
+           politica=Politica(silenciar=True),
+           ejemplo="Reproducir favoritos", descripcion="Reproduce las canciones que has marcado como favoritas en Spotify.")
+def reproducir_favoritos(app, slots):
+    app.reproducir_canciones_favoritas()
+
+
+@intencion("mostrar mis playlist", sinonimos=["mostrar playlist", "ver playlist", "show playlist", "listar playlist"],
+           ejemplo="Muestra mis playlists", descripcion="Lista tus playlists actuales y permite seleccionar una para reproducir.")
+def mostrar_playlists(app, slots):
+    app.procesar_comando_mostrar_playlists()
+
+
+@intencion("reproducir album", sinonimos=["reproducir album", "pon album", "play album", "escuchar álbum"],
+           prefijos=["reproducir album", "pon album", "play album", "escuchar album"], slots={"album": "texto"},
+           ejemplo="Reproducir álbum [nombre]", descripcion="Reproduce el álbum indicado.")
+async def reproducir_album(app, slots):
+    await app.spotify_controller.reproducir_album_async(slots["album"], app.responder_con_audio)
+
+
+# Volumen de Spotify
+
+@intencion("subir volumen", sinonimos=["subir volumen", "sube volumen", "sube el volumen", "más volumen"],
+           politica=Politica(prioridad="control", anticipable=True, compensacion="bajar volumen"),
+           ejemplo="Sube el volumen", descripcion="Sube el volumen de reproducción en Spotify.")
+def subir_volumen(app, slots):
+    app.subir_volumen()
+
+
+@intencion("bajar volumen", sinonimos=["bajar volumen", "baja volumen", "baja el volumen", "menos volumen"],
+           politica=Politica(prioridad="control", anticipable=True, compensacion="subir volumen"),
+           ejemplo="Baja el volumen", descripcion="Baja el volumen de reproducción en Spotify.")
+def bajar_volumen(app, slots):
+    app.bajar_volumen()
+
+
+@intencion("volumen", prefijos=["pon el volumen", "pon volumen"], palabras_clave=["volumen"], slots={"volumen": "entero"},
+           politica=Politica(prioridad="control"),
+           ejemplo="Volumen [número]", descripcion="Fija el volumen de reproducción en Spotify.")
+def volumen(app, slots):
+    if slots["volumen"] is not None:
+        app.ajustar_volumen(slots["volumen"])
+    else:
+        app.responder_con_audio("Por favor, indica un número después de 'volumen' para establecer el volumen.")
+
+
+# Modos de reproducción
+
+@intencion("activar aleatorio", sinonimos=["activar aleatorio", "modo aleatorio", "shuffle on", "activa shuffle"],
+           ejemplo="Activar aleatorio", descripcion="Activa el modo aleatorio.")
+def activar_aleatorio(app, slots):
+    app.spotify_controller.activar_desactivar_aleatorio(True)
+
+
+@intencion("desactivar aleatorio", sinonimos=["desactivar aleatorio", "quitar aleatorio", "shuffle off", "desactiva shuffle"],
+           ejemplo="Desactivar aleatorio", descripcion="Desactiva el modo aleatorio.")
+def desactivar_aleatorio(app, slots):
+    app.spotify_controller.activar_desactivar_aleatorio(False)
+
+
+@intencion("cambiar aleatorio", sinonimos=["cambiar aleatorio", "alternar aleatorio", "toggle shuffle", "invertir aleatorio"])
+def cambiar_aleatorio(app, slots):
+    app.spotify_controller.cambiar_aleatorio()
+
+
+@intencion("repetir canción", sinonimos=["repetir canción", "repetir track", "repeat song", "loop song"],
+           ejemplo="Repetir canción", descripcion="Repite la canción actual.")
+def repetir_cancion(app, slots):
+    app.spotify_controller.modo_repeticion('track')
+
+
+@intencion("repetir álbum", sinonimos=["repetir álbum", "repetir lista", "repeat context", "loop album"],
+           ejemplo="Repetir álbum", descripcion="Repite el álbum o la lista actual.")
+def repetir_album(app, slots):
+    app.spotify_controller.modo_repeticion('context')
+
+
+@intencion("desactivar repetición", sinonimos=["desactivar repetición", "sin repetición", "repeat off", "quitar repetición"],
+           ejemplo="Desactivar repetición", descripcion="Desactiva la repetición.")
+def desactivar_repeticion(app, slots):
+    app.spotify_controller.modo_repeticion('off')
+
+
+@intencion("cambiar repetición", sinonimos=["cambiar repetición", "alternar repetición", "toggle repeat", "ciclar repetición"])
+def cambiar_repeticion(app, slots):
+    app.spotify_controller.cambiar_repeticion()
+
+
+# Recomendaciones
+
+@intencion("recomienda canciones", sinonimos=["recomienda canciones", "sugerir canciones", "recommend tracks", "descubrir música"],
+           ejemplo="Recomienda canciones", descripcion="Sugiere canciones según lo que escuchas.")
+def recomienda_canciones(app, slots):
+    app.spotify_controller.obtener_recomendaciones('track')
+
+
+@intencion("recomienda artistas", sinonimos=["recomienda artistas", "sugerir artistas", "recommend artists", "descubrir artistas"],
+           ejemplo="Recomienda artistas", descripcion="Sugiere artistas según lo que escuchas.")
+def recomienda_artistas(app, slots):
+    app.spotify_controller.obtener_recomendaciones('artist')
+
+
+# Clima
+
+@intencion("clima", palabras_clave=["clima", "pronóstico"], slots={"ciudad": "ciudad", "aspecto": "aspecto"},
+           politica=Politica(silenciar=True),
+           ejemplo="¿Cómo está el clima en [ciudad]?", descripcion="Consulta el clima de una ciudad.")
+async def clima(app, slots):
+    await asyncio.to_thread(app.procesar_comando_clima, slots["ciudad"], slots["aspecto"])
+
+
+@intencion("dime", prefijos=["dime"], slots={"consulta": "texto", "ciudad": "ciudad", "aspecto": "aspecto"},
+           politica=Politica(prioridad="lenta"))
+async def dime(app, slots):
+    """Con la forma "dime [aspecto] en [ciudad]" consulta el clima; cualquier otra pregunta va a Gemini."""
+    if not slots["ciudad"]:
+        return await consulta(app, slots)
+    mensaje = await asyncio.to_thread(app.obtener_clima_de, slots["ciudad"], slots["aspecto"])
+    await asyncio.to_thread(app.responder_con_audio, mensaje)
+
+
+# Aplicación
+
+@intencion("cállate", sinonimos=["cállate", "callate", "silencio", "detente"],
+           politica=Politica(prioridad="control"),
+           ejemplo="Cállate", descripcion="Detiene la respuesta hablada del asistente.")
+def callate(app, slots):
+    # Ninguna tarea pendiente o en curso que vaya a hablar (respuestas de Spotify, búsquedas, Gemini)
+    # debe llegar a hacerlo; solo los controles siguen su curso
+    canceladas = app.ejecutor.cancelar(("normal", "lenta"), motivo="cállate") if getattr(app, 'ejecutor', None) else 0
+    if canceladas:
+        print(f"{canceladas} tareas de respuesta canceladas.")
+    app.detener_reproduccion_audio()
+    print("Reproducción de audio detenida.")
+
+
+@intencion("reiniciar configuración", sinonimos=["reiniciar configuración", "restablecer configuración", "reset configuration", "reinicia configuración"],
+           ejemplo="Reiniciar configuración", descripcion="Restablece la configuración del asistente a los valores predeterminados.")
+def reiniciar_configuracion(app, slots):
+    app.reiniciar_configuracion()
+
+
+@intencion("salir", sinonimos=["salir", "exit", "cerrar", "terminar"],
+           politica=Politica(en_linea=True),
+           ejemplo="Salir", descripcion="Cierra la aplicación.")
+def salir(app, slots):
+    app.responder_con_audio("Saliendo de la aplicación")
+    # La aplicación se cierra desde el avatar principal
+    app.detener_escucha()
+    return False
+
+
+@intencion("activar gestos", sinonimos=["activar gestos", "iniciar control gestual", "activa control gestual", "comenzar gestos"],
+           ejemplo="Activar gestos", descripcion="Activa el control por gestos.")
+def activar_gestos(app, slots):
+    app.activar_control_gestual()
+
+
+@intencion("desactivar gestos", sinonimos=["desactiva control gestual", "detener control gestual", "parar gestos"],
+           ejemplo="Desactivar gestos", descripcion="Desactiva el control por gestos.")
+def desactivar_gestos(app, slots):
+    app.desactivar_control_gestual()
+
+
+# Gemini
+
+@intencion("qué ves en mi pantalla", sinonimos=["qué ves en mi pantalla", "describe mi pantalla", "ver pantalla", "pantalla"],
+           politica=Politica(prioridad="lenta"),
+           ejemplo="¿Qué ves en mi pantalla?", descripcion="Describe lo que ve en la pantalla.")
+async def que_ves_en_pantalla(app, slots):
+    screen_file = await asyncio.to_thread(app.capture_screen)
+    if screen_file:
+        await asyncio.to_thread(app._procesar_comando_no_reconocido_thread, "Describe lo que ves en esta imagen", screen_file, None, False)
+    else:
+        await asyncio.to_thread(app.responder_con_audio, "No pude capturar la pantalla.")
+
+
+@intencion("escucha audio", sinonimos=["escucha audio", "analiza audio", "oir audio", "audio"],
+           politica=Politica(prioridad="lenta"),
+           ejemplo="Escucha audio", descripcion="Analiza el audio capturado del micrófono.")
+async def escucha_audio(app, slots):
+    audio_file = await asyncio.to_thread(app.capture_audio)
+    if audio_file:
+        await asyncio.to_thread(app._procesar_comando_no_reconocido_thread, "Analiza este audio", None, audio_file, False)
+    else:
+        await asyncio.to_thread(app.responder_con_audio, "No pude capturar el audio.")
+
+
+@intencion("escucha audio y dime qué canción es", sinonimos=["escucha audio y dime qué canción es", "identifica canción audio", "canción audio"],
+           politica=Politica(prioridad="lenta"),
+           ejemplo="Escucha audio y dime qué canción es", descripcion="Identifica la canción del audio capturado.")
+async def escucha_audio_cancion(app, slots):
+    audio_file = await asyncio.to_thread(app.capture_audio)
+    if audio_file:
+        await asyncio.to_thread(app._procesar_comando_no_reconocido_thread, "¿Qué canción es esta?", None, audio_file, True)
+    else:
+        await asyncio.to_thread(app.responder_con_audio, "No pude capturar el audio.")
+
+
+@intencion("consulta", politica=Politica(prioridad="lenta"), por_defecto=True)
+async def consulta(app, slots):
+    """Lo que no es un comando conocido se envía a Gemini si parece una pregunta o petición."""
+    if app.es_consulta_valida(slots["comando"]):
+        await asyncio.to_thread(app._procesar_comando_no_reconocido_thread, slots["texto"], None, None, False)
+    else:
+        print("Comando no reconocido y no es una consulta válida.")
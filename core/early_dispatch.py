@@ -0,0 +1,101 @@
+import threading
+import time
+
+
+class Enunciado:
+    """
+    Una frase capturada que viaja por el pipeline: su audio, el flujo de reconocimiento
+    incremental (si lo hay), el texto final y el comando que se adelantó con un parcial.
+    """
+
+    def __init__(self):
+        self.audio = None
+        self.fin = None
+        self.flujo = None
+        self.flujo_intentado = False
+        self.texto = None
+        self.anticipado = None
+        self.parcial_previo = None
+        self.parcial_desde = None
+
+
+class DespachoAnticipado:
+    """
+    Ejecuta los comandos de control más frecuentes a partir de hipótesis parciales, sin
+    esperar a que termine la frase.
+
+    Un parcial se tiene en cuenta cuando no ha cambiado durante `estabilidad` segundos; el motor
+    de reconocimiento envía una hipótesis por bloque de audio aunque se repita. Solo
+    se adelantan los comandos de `comandos_inmediatos` y únicamente si lo dicho no es el
+    principio de otro comando (por ejemplo "pausa" podría acabar en "pausa video"). La
+    transcripción final confirma el comando adelantado o lo cancela: en ese caso se lanza
+    su acción contraria, si la tiene (`compensaciones`), y se ejecuta lo que realmente se dijo.
+    """
+
+    COMPENSACIONES = {
+        "siguiente": "anterior",
+        "anterior": "siguiente",
+        "detener": "reproducir",
+        "reproducir": "detener",
+        "subir volumen": "bajar volumen",
+        "bajar volumen": "subir volumen",
+    }
+
+    def __init__(self, interpretar, despachar, comandos_inmediatos, es_ambiguo=None, estabilidad=0.2, compensaciones=None):
+        self.interpretar = interpretar
+        self.despachar = despachar
+        self.comandos_inmediatos = set(comandos_inmediatos)
+        self.es_ambiguo = es_ambiguo or (lambda peticion: False)
+        self.estabilidad = estabilidad
+        self.compensaciones = self.COMPENSACIONES if compensaciones is None else compensaciones
+        self.lock = threading.Lock()
+        self.adelantados = 0
+        self.confirmados = 0
+        self.cancelados = 0
+
+    def parcial(self, enunciado, texto):
+        """Recibe una hipótesis parcial de la frase en curso (desde el hilo del motor de reconocimiento)."""
+        texto = texto.strip()
+        ahora = time.monotonic()
+        with self.lock:
+            if enunciado.anticipado is not None or not texto:
+                return
+            if texto != enunciado.parcial_previo:
+                enunciado.parcial_previo = texto
+                enunciado.parcial_desde = ahora
+                return
+            if ahora - enunciado.parcial_desde < self.estabilidad:
+                return
+            peticion = self.interpretar(texto)
+            if peticion is None or peticion[1] not in self.comandos_inmediatos or self.es_ambiguo(peticion):
+                return
+            enunciado.anticipado = peticion
+            self.adelantados += 1
+        print(f"Comando adelantado con un resultado parcial: '{peticion[1]}'")
+        self.despachar(peticion)
+
+    def confirmar(self, enunciado, peticion):
+        """
+        Compara el comando adelantado con el de la transcripción final.
+        Devuelve la petición que aún hay que ejecutar, o None si ya se ejecutó.
+        """
+        anticipado = enunciado.anticipado
+        if anticipado is None:
+            return peticion
+        if peticion is not None and peticion[1] == anticipado[1]:
+            with self.lock:
+                self.confirmados += 1
+            print(f"Comando adelantado confirmado: '{anticipado[1]}'")
+            return None
+
+        with self.lock:
+            self.cancelados += 1
+        print(f"La transcripción final no confirma '{anticipado[1]}'; se cancela el comando adelantado.")
+        compensacion = self.compensaciones.get(anticipado[1])
+        if compensacion:
+            self.despachar((compensacion, compensacion, compensacion))
+        return peticion
+
+    def metricas(self):
+        with self.lock:
+            return {"adelantados": self.adelantados, "confirmados": self.confirmados, "cancelados": self.cancelados}
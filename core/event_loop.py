@@ -0,0 +1,81 @@
+# spotify_voice_control/core/event_loop.py
+import asyncio
+import concurrent.futures
+import threading
+
+from core.task_executor import TOKEN_ACTUAL, TareaCancelada
+
+
+class BucleEventos:
+    """
+    Bucle asyncio propio de la aplicación, en un hilo aparte.
+
+    Los manejadores de comandos que son corrutinas se ejecutan aquí y envuelven las librerías
+    bloqueantes (spotipy, requests, Gemini, TTS) con `asyncio.to_thread`, que usa el ejecutor por
+    defecto del bucle: un grupo acotado de `hilos_io` hilos. Así un mismo comando puede esperar
+    varias llamadas de red a la vez con `asyncio.gather`.
+
+    `ejecutar` lanza una corrutina desde otro hilo (un trabajador del EjecutorTareas) y espera su
+    resultado; si el token de la tarea se cancela ("cállate"), cancela la corrutina.
+    El token viaja en el contexto de la corrutina y `asyncio.to_thread` lo copia a sus hilos, así que
+    `EjecutorTareas.token_actual()` también lo ve dentro de las funciones bloqueantes.
+    """
+
+    def __init__(self, hilos_io=8):
+        self.loop = asyncio.new_event_loop()
+        self.hilos_io = concurrent.futures.ThreadPoolExecutor(max_workers=hilos_io, thread_name_prefix="io")
+        self.loop.set_default_executor(self.hilos_io)
+        self.hilo = threading.Thread(target=self._correr, name="bucle-eventos", daemon=True)
+        self.hilo.start()
+
+    def _correr(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _con_token(self, corutina, token):
+        TOKEN_ACTUAL.set(token)
+        return await corutina
+
+    def enviar(self, corutina, token=None):
+        """Programa la corrutina en el bucle y devuelve un concurrent.futures.Future con su resultado."""
+        return asyncio.run_coroutine_threadsafe(self._con_token(corutina, token), self.loop)
+
+    def ejecutar(self, corutina, token=None, intervalo=0.1):
+        """
+        Ejecuta la corrutina en el bucle y bloquea hasta su resultado. Por defecto usa el token de la
+        tarea del EjecutorTareas que llama. No debe llamarse desde el propio hilo del bucle.
+        """
+        if threading.current_thread() is self.hilo:
+            corutina.close()
+            raise RuntimeError("BucleEventos.ejecutar no puede llamarse desde el hilo del bucle")
+        token = token if token is not None else TOKEN_ACTUAL.get()
+        futuro = self.enviar(corutina, token)
+        while True:
+            try:
+                return futuro.result(timeout=intervalo)
+            except concurrent.futures.TimeoutError:
+                if token is not None and token.cancelado:
+                    futuro.cancel()
+                    raise TareaCancelada(token.motivo or "cancelada")
+            except concurrent.futures.CancelledError:
+                raise TareaCancelada(token.motivo if token is not None and token.motivo else "cancelada")
+
+    def detener(self, esperar=2.0):
+        """Cancela todas las corrutinas pendientes, para el bucle y libera sus hilos."""
+        if not self.loop.is_running():
+            return
+
+        async def cancelar_todo():
+            tareas = [tarea for tarea in asyncio.all_tasks() if tarea is not asyncio.current_task()]
+            for tarea in tareas:
+                tarea.cancel()
+            await asyncio.gather(*tareas, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(cancelar_todo(), self.loop).result(timeout=esperar)
+        except Exception as e:
+            print(f"Bucle de eventos: no todas las tareas terminaron a tiempo ({e!r})")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.hilo.join(esperar)
+        # Las llamadas bloqueantes en curso no se pueden interrumpir; las que no empezaron se descartan
+        self.hilos_io.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,75 @@
+# spotify_voice_control/core/intent_cache.py
+import threading
+from collections import OrderedDict
+
+
+class CacheIntenciones:
+    """
+    Caché LRU de la interpretación de frases ya vistas.
+
+    Guarda, por transcripción normalizada, lo que cuesta calcular en cada frase (detección del
+    nombre, búsqueda del sinónimo más parecido, resolución de la intención y sus slots), así que
+    las órdenes que se repiten a lo largo del día se resuelven con una consulta a un diccionario.
+
+    `generacion` es una función que devuelve algo comparable que cambia cuando cambia cualquier
+    dato del que dependen las entradas (versión del registro de intenciones, versión del índice de
+    sinónimos, nombre del asistente). Si al consultar no coincide con la de las entradas guardadas,
+    la caché se vacía antes de responder.
+    """
+
+    def __init__(self, capacidad=256, generacion=None):
+        self.capacidad = capacidad
+        self.generacion = generacion or (lambda: None)
+        self.entradas = OrderedDict()
+        self._generacion_actual = None
+        self.lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+
+    def _comprobar_generacion(self, generacion):
+        # Llamar con el lock tomado
+        if generacion != self._generacion_actual:
+            if self.entradas:
+                self.invalidaciones += 1
+            self.entradas.clear()
+            self._generacion_actual = generacion
+
+    def obtener(self, clave, calcular):
+        """Devuelve el valor guardado para `clave` o, si no está, el de `calcular()` (y lo guarda)."""
+        generacion = self.generacion()
+        with self.lock:
+            self._comprobar_generacion(generacion)
+            if clave in self.entradas:
+                self.entradas.move_to_end(clave)
+                self.aciertos += 1
+                return self.entradas[clave]
+            self.fallos += 1
+        valor = calcular()
+        with self.lock:
+            # Si algo cambió mientras se calculaba, el valor ya no vale para la generación nueva
+            if generacion == self._generacion_actual:
+                self.entradas[clave] = valor
+                if len(self.entradas) > self.capacidad:
+                    self.entradas.popitem(last=False)
+        return valor
+
+    def invalidar(self):
+        with self.lock:
+            if self.entradas:
+                self.invalidaciones += 1
+            self.entradas.clear()
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def metricas(self):
+        with self.lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / consultas, 3) if consultas else 0.0,
+                "entradas": len(self.entradas),
+                "invalidaciones": self.invalidaciones,
+            }
@@ -0,0 +1,217 @@
+# spotify_voice_control/core/slot_grammar.py
+# Gramática de slots: lee de una sola pasada sobre las palabras de la frase los argumentos
+# tipados de una intención (enteros escritos con cifras o con palabras, duraciones, ciudad y
+# aspecto del clima). Las palabras llegan ya normalizadas (minúsculas y sin acentos).
+import re
+
+UNIDADES = {
+    "cero": 0, "un": 1, "uno": 1, "una": 1, "dos": 2, "tres": 3, "cuatro": 4, "cinco": 5,
+    "seis": 6, "siete": 7, "ocho": 8, "nueve": 9, "diez": 10, "once": 11, "doce": 12,
+    "trece": 13, "catorce": 14, "quince": 15, "dieciseis": 16, "diecisiete": 17,
+    "dieciocho": 18, "diecinueve": 19, "veinte": 20, "veintiun": 21, "veintiuno": 21,
+    "veintiuna": 21, "veintidos": 22, "veintitres": 23, "veinticuatro": 24, "veinticinco": 25,
+    "veintiseis": 26, "veintisiete": 27, "veintiocho": 28, "veintinueve": 29,
+}
+DECENAS = {
+    "treinta": 30, "cuarenta": 40, "cincuenta": 50, "sesenta": 60, "setenta": 70,
+    "ochenta": 80, "noventa": 90,
+}
+CENTENAS = {
+    "cien": 100, "ciento": 100, "doscientos": 200, "doscientas": 200, "trescientos": 300,
+    "trescientas": 300, "cuatrocientos": 400, "cuatrocientas": 400, "quinientos": 500,
+    "quinientas": 500, "seiscientos": 600, "seiscientas": 600, "setecientos": 700,
+    "setecientas": 700, "ochocientos": 800, "ochocientas": 800, "novecientos": 900,
+    "novecientas": 900,
+}
+ARTICULOS = {"un", "una"}
+
+UNIDADES_TIEMPO = {
+    "hora": 3600, "horas": 3600, "minuto": 60, "minutos": 60, "min": 60,
+    "segundo": 1, "segundos": 1, "seg": 1,
+}
+MEDIO = {"medio", "media"}
+RELOJ = re.compile(r'^(\d+):(\d{1,2})(?::(\d{1,2}))?$')
+
+CLAVES_CLIMA = {"clima", "tiempo", "condiciones", "pronostico"}
+# Aspectos que entiende WeatherService._construir_mensaje_clima
+ASPECTOS = {
+    "temperatura": "temperatura", "grados": "temperatura", "calor": "temperatura", "frio": "temperatura",
+    "viento": "viento", "brisa": "viento",
+    "humedad": "humedad",
+    "presion": "presión",
+    "nubes": "nubes", "nubosidad": "nubes", "nublado": "nubes",
+    "descripcion": "descripción", "lluvia": "descripción", "llueve": "descripción", "cielo": "descripción",
+    "resumen": "resumen",
+}
+PREPOSICIONES_LUGAR = {"en", "de", "para"}
+FIN_CIUDAD = {"sobre", "hoy", "ahora", "manana", "esta", "este", "por", "y", "con", "hace", "que"}
+SIN_SIGNOS = re.compile(r'[^\w\s-]')
+
+TIPOS = ("texto", "entero", "duracion", "ciudad", "aspecto")
+
+
+def leer_numero(palabras, i, articulos=False):
+    """
+    Lee un número entero que empieza en palabras[i], con cifras ("70") o con palabras
+    ("setenta", "ciento veinte", "dos mil quinientos"). Devuelve (valor, índice siguiente)
+    o (None, i). "un"/"una" solo cuentan como 1 con `articulos`.
+    """
+    if i >= len(palabras):
+        return None, i
+    if palabras[i].isdigit():
+        return int(palabras[i]), i + 1
+    total = 0
+    actual = 0
+    nivel = 4  # 3 centenas, 2 decenas, 1 unidades: cada palabra debe ser de un nivel menor
+    j = i
+    while j < len(palabras):
+        palabra = palabras[j]
+        if palabra in CENTENAS and nivel > 3:
+            actual += CENTENAS[palabra]
+            nivel = 3
+            j += 1
+        elif palabra in DECENAS and nivel > 2:
+            actual += DECENAS[palabra]
+            nivel = 2
+            j += 1
+            if j + 1 < len(palabras) and palabras[j] == "y" and 0 < UNIDADES.get(palabras[j + 1], 0) < 10:
+                actual += UNIDADES[palabras[j + 1]]
+                nivel = 1
+                j += 2
+        elif palabra in UNIDADES and nivel > 1:
+            if palabra in ARTICULOS and not articulos and j == i:
+                break
+            actual += UNIDADES[palabra]
+            nivel = 1
+            j += 1
+        elif palabra == "mil" and total == 0:
+            total = max(actual, 1) * 1000
+            actual = 0
+            nivel = 4
+            j += 1
+        else:
+            break
+    if j == i:
+        return None, i
+    return total + actual, j
+
+
+def leer_duracion(palabras, originales, i):
+    """
+    Lee una duración en segundos que empieza en palabras[i]: "1:30", "noventa", "dos minutos",
+    "un minuto y medio", "minuto dos", "una hora y diez minutos". Un número sin unidad son
+    segundos. Devuelve (segundos, índice siguiente) o (None, i).
+    """
+    if i >= len(palabras):
+        return None, i
+    reloj = RELOJ.match(originales[i])
+    if reloj:
+        partes = [int(parte) for parte in reloj.groups() if parte is not None]
+        segundos = 0
+        for parte in partes:
+            segundos = segundos * 60 + parte
+        return segundos, i + 1
+    total = None
+    j = i
+    while j < len(palabras):
+        if palabras[j] in UNIDADES_TIEMPO:
+            # "minuto dos": la unidad delante del número
+            numero, k = leer_numero(palabras, j + 1, articulos=True)
+            if numero is None:
+                break
+            valor = numero * UNIDADES_TIEMPO[palabras[j]]
+        elif palabras[j] in MEDIO and j + 1 < len(palabras) and palabras[j + 1] in UNIDADES_TIEMPO:
+            valor = UNIDADES_TIEMPO[palabras[j + 1]] / 2
+            k = j + 2
+        else:
+            numero, k = leer_numero(palabras, j, articulos=True)
+            if numero is None:
+                break
+            if k < len(palabras) and palabras[k] in UNIDADES_TIEMPO:
+                unidad = UNIDADES_TIEMPO[palabras[k]]
+                valor = numero * unidad
+                k += 1
+                if k + 1 < len(palabras) and palabras[k] == "y" and palabras[k + 1] in MEDIO:
+                    valor += unidad / 2
+                    k += 2
+            elif palabras[j] in ARTICULOS:
+                # "adelantar un poco": sin unidad, "un" es un artículo
+                break
+            else:
+                valor = numero
+        total = (total or 0) + valor
+        j = k
+        # "un minuto y treinta segundos": sigue si tras la "y" viene otra cantidad
+        if j + 1 < len(palabras) and palabras[j] == "y":
+            siguiente, _ = leer_duracion(palabras, originales, j + 1)
+            if siguiente is None:
+                break
+            j += 1
+        else:
+            break
+    if total is None:
+        return None, i
+    return int(round(total)), j
+
+
+class GramaticaSlots:
+    """
+    Esquema de slots de una intención compilado una vez al registrarla.
+
+    `analizar` recorre las palabras una sola vez: en cada posición prueba los lectores de los
+    tipos que pide el esquema ("entero", "duracion", "ciudad"/"aspecto") y avanza tras lo que
+    consume el primero que lee algo. Los slots "texto" no dependen de la posición y los rellena
+    el registro con lo que sigue al prefijo.
+    """
+
+    def __init__(self, esquema):
+        for nombre, tipo in esquema.items():
+            if tipo not in TIPOS:
+                raise ValueError(f"Tipo de slot desconocido '{tipo}' para '{nombre}'")
+        self.esquema = dict(esquema)
+        self.por_tipo = {}
+        for nombre, tipo in esquema.items():
+            self.por_tipo.setdefault(tipo, []).append(nombre)
+        self.clima = "ciudad" in self.por_tipo or "aspecto" in self.por_tipo
+
+    def analizar(self, palabras, originales, desde=0):
+        """Devuelve {slot: valor} para los slots no textuales; los que no aparecen valen None."""
+        valores = {"entero": None, "duracion": None, "ciudad": None, "aspecto": None}
+        en_clima = False
+        i = desde
+        while i < len(palabras):
+            palabra = palabras[i]
+            if "duracion" in self.por_tipo and valores["duracion"] is None:
+                segundos, j = leer_duracion(palabras, originales, i)
+                if segundos is not None:
+                    valores["duracion"] = segundos
+                    i = j
+                    continue
+            if "entero" in self.por_tipo and valores["entero"] is None:
+                numero, j = leer_numero(palabras, i)
+                if numero is not None:
+                    valores["entero"] = numero
+                    i = j
+                    continue
+            if self.clima:
+                if palabra in ASPECTOS:
+                    valores["aspecto"] = valores["aspecto"] or ASPECTOS[palabra]
+                    en_clima = True
+                elif palabra in CLAVES_CLIMA:
+                    en_clima = True
+                elif palabra in PREPOSICIONES_LUGAR and en_clima and valores["ciudad"] is None:
+                    j = i + 1
+                    while j < len(palabras) and not self._fin_ciudad(palabras[j]):
+                        j += 1
+                    if j > i + 1:
+                        valores["ciudad"] = SIN_SIGNOS.sub('', ' '.join(originales[i + 1:j])).strip()
+                        i = j
+                        continue
+            i += 1
+        if self.clima and valores["ciudad"] and valores["aspecto"] is None:
+            valores["aspecto"] = "resumen"
+        return {nombre: valores[tipo] for tipo, nombres in self.por_tipo.items() if tipo != "texto" for nombre in nombres}
+
+    @staticmethod
+    def _fin_ciudad(palabra):
+        return palabra in FIN_CIUDAD or palabra in ASPECTOS or palabra in CLAVES_CLIMA
@@ -0,0 +1,132 @@
+import math
+import re
+import threading
+from collections import defaultdict
+import Levenshtein as lv
+import unidecode
+
+
+def normalizar_sinonimo(texto):
+    """Minúsculas y sin espacios ni signos, igual que se comparaban antes los sinónimos."""
+    return re.sub(r'\W+', '', texto.lower().strip())
+
+
+class IndiceSinonimos:
+    """
+    Índice de los sinónimos de comandos para encontrar el más parecido a lo pronunciado.
+
+    Los sinónimos se normalizan una sola vez al añadirlos y se indexan por sus bigramas (con un
+    marcador de inicio y fin; un bigrama repetido cuenta tantas veces como aparece). Una búsqueda
+    solo puntúa con `Levenshtein.ratio` los sinónimos que pasan un filtro de longitud y de
+    bigramas comunes. Con d la distancia de inserciones y borrados que usa `ratio`:
+        ratio = 1 - d / (la + lb) > umbral  exige  d < (1 - umbral) * (la + lb)
+    y como d >= |la - lb| eso acota la longitud. Cada inserción o borrado rompe como mucho dos
+    bigramas, así que dos cadenas a distancia d comparten al menos max(la, lb) + 1 - 2 * d; el
+    filtro nunca descarta un sinónimo que la búsqueda lineal aceptaría y el resultado es el mismo.
+    Con umbrales bajos la cota puede no exigir ningún bigrama; entonces se puntúan todos los
+    sinónimos de longitud compatible.
+    """
+
+    def __init__(self, tabla=None, umbral=0.8):
+        self.umbral = umbral
+        self.entradas = []
+        self.comandos = []
+        # Las entradas también sin tildes, para comparar prefijos con lo ya pronunciado
+        self.sin_tildes = []
+        self.longitudes = []
+        self.bigramas = defaultdict(list)
+        self.por_longitud = defaultdict(list)
+        self._vistos = set()
+        self.version = 0
+        self.lock = threading.Lock()
+        for comando, sinonimos in (tabla or {}).items():
+            for sinonimo in sinonimos:
+                self.agregar(comando, sinonimo)
+
+    @staticmethod
+    def _bigramas(normalizado):
+        # (bigrama, aparición): cada repetición de un bigrama cuenta aparte, como en la cota
+        marcado = f"^{normalizado}$"
+        apariciones = defaultdict(int)
+        gramas = []
+        for i in range(len(marcado) - 1):
+            bigrama = marcado[i:i + 2]
+            gramas.append((bigrama, apariciones[bigrama]))
+            apariciones[bigrama] += 1
+        return frozenset(gramas)
+
+    def agregar(self, comando, sinonimo):
+        """Añade un sinónimo (o alias definido por el usuario) de `comando`."""
+        normalizado = normalizar_sinonimo(sinonimo)
+        with self.lock:
+            if not normalizado or (comando, normalizado) in self._vistos:
+                return
+            self._vistos.add((comando, normalizado))
+            indice = len(self.entradas)
+            self.entradas.append(normalizado)
+            self.comandos.append(comando)
+            self.sin_tildes.append(unidecode.unidecode(normalizado))
+            gramas = self._bigramas(normalizado)
+            self.longitudes.append(len(normalizado))
+            self.por_longitud[len(normalizado)].append(indice)
+            for grama in gramas:
+                self.bigramas[grama].append(indice)
+            self.version += 1
+
+    def es_prefijo_de_otro(self, texto, comando):
+        """True si `texto` es el principio de un sinónimo más largo de otro comando (p. ej. "pausa" -> "pausa video")."""
+        prefijo = unidecode.unidecode(normalizar_sinonimo(texto))
+        with self.lock:
+            return any(len(entrada) > len(prefijo) and entrada.startswith(prefijo) and otro != comando
+                       for entrada, otro in zip(self.sin_tildes, self.comandos))
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def _exigidos(self, largo):
+        """{longitud compatible: bigramas que un sinónimo de esa longitud debe compartir como mínimo}."""
+        margen = 1 - self.umbral
+        exigidos = {}
+        for longitud in self.por_longitud:
+            # Mayor distancia entera estrictamente menor que margen * (la + lb)
+            distancia = math.ceil(margen * (longitud + largo) - 1e-9) - 1
+            if abs(longitud - largo) <= distancia:
+                exigidos[longitud] = max(longitud, largo) + 1 - 2 * distancia
+        return exigidos
+
+    def candidatos(self, normalizado):
+        """Índices de los sinónimos que pasan el filtro de longitud y de bigramas."""
+        exigidos = self._exigidos(len(normalizado))
+        if not exigidos:
+            return []
+        minimo = min(exigidos.values())
+        if minimo <= 0:
+            return [indice for longitud in exigidos for indice in self.por_longitud[longitud]]
+        gramas = self._bigramas(normalizado)
+        # Quien comparte al menos `minimo` bigramas comparte alguno de los len - minimo + 1 menos
+        # frecuentes: basta con recorrer esas listas y no las de los bigramas más comunes
+        raros = sorted(gramas, key=lambda grama: len(self.bigramas.get(grama, ())))[:len(gramas) - minimo + 1]
+        vistos = set()
+        for grama in raros:
+            vistos.update(self.bigramas.get(grama, ()))
+        # Contar los bigramas comunes de cada uno cuesta más que puntuarlo con `ratio`
+        longitudes = self.longitudes
+        return [indice for indice in vistos if longitudes[indice] in exigidos]
+
+    def buscar(self, texto):
+        """Devuelve (comando, puntuación) del sinónimo más parecido, o (None, puntuación) si no supera el umbral."""
+        normalizado = normalizar_sinonimo(texto)
+        if not normalizado:
+            return None, 0.0
+        with self.lock:
+            mejor_indice = None
+            mejor_puntuacion = 0.0
+            # En orden de inserción, para que los empates se resuelvan como al recorrer la tabla
+            for indice in sorted(self.candidatos(normalizado)):
+                puntuacion = lv.ratio(normalizado, self.entradas[indice])
+                if puntuacion > mejor_puntuacion:
+                    mejor_puntuacion = puntuacion
+                    mejor_indice = indice
+            if mejor_indice is None or mejor_puntuacion <= self.umbral:
+                return None, mejor_puntuacion
+            return self.comandos[mejor_indice], mejor_puntuacion
@@ -0,0 +1,213 @@
+# spotify_voice_control/core/task_executor.py
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+# Clases de prioridad: un número menor se atiende antes
+PRIORIDADES = {"control": 0, "normal": 1, "lenta": 2}
+# Plazo por defecto (segundos desde que se encola) de cada clase: pasado el plazo la tarea ya no se ejecuta
+PLAZOS = {"control": 5.0, "normal": 30.0, "lenta": 120.0}
+# Token de la tarea en curso; una variable de contexto para que lo vean también las corrutinas y sus hilos
+TOKEN_ACTUAL = contextvars.ContextVar("token_tarea", default=None)
+
+
+class TareaCancelada(Exception):
+    """La tarea se canceló mientras se ejecutaba."""
+
+
+class TokenCancelacion:
+    """Señal de cancelación cooperativa: la tarea consulta `cancelado` en sus puntos de espera."""
+
+    def __init__(self, plazo=None):
+        self.evento = threading.Event()
+        self.plazo = plazo
+        self.motivo = None
+
+    def cancelar(self, motivo="cancelada"):
+        self.motivo = self.motivo or motivo
+        self.evento.set()
+
+    @property
+    def vencido(self):
+        return self.plazo is not None and time.monotonic() > self.plazo
+
+    @property
+    def cancelado(self):
+        return self.evento.is_set() or self.vencido
+
+    def comprobar(self):
+        """Lanza TareaCancelada si la tarea debe dejar de trabajar."""
+        if self.evento.is_set():
+            raise TareaCancelada(self.motivo)
+        if self.vencido:
+            raise TareaCancelada("plazo vencido")
+
+
+class Tarea:
+    def __init__(self, nombre, funcion, args, kwargs, prioridad, plazo):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.prioridad = prioridad
+        self.encolada = time.monotonic()
+        self.token = TokenCancelacion(self.encolada + plazo if plazo is not None else None)
+        self.futuro = Future()
+
+
+class EjecutorTareas:
+    """
+    Grupo acotado de hilos trabajadores con una cola de prioridad para los manejadores de comandos.
+
+    - Las tareas se atienden por clase de prioridad ("control" < "normal" < "lenta") y, dentro de
+      cada clase, por orden de llegada. `reservados` trabajadores solo aceptan tareas "control", así
+      que pausar, pasar de canción o cambiar el volumen no esperan a que termine una consulta a
+      Gemini o una descripción de pantalla.
+    - La cola tiene `capacidad` tareas. Si está llena, una tarea nueva desplaza a la pendiente de
+      menor prioridad (si es de menor prioridad que ella) o se rechaza.
+    - Cada tarea tiene un plazo: si sigue en la cola al vencer, se descarta sin ejecutarse.
+    - La cancelación es cooperativa: `cancelar` quita de la cola las tareas pendientes que coinciden
+      y marca el token de las que se están ejecutando, que lo consultan con `token_actual()`.
+    """
+
+    def __init__(self, trabajadores=3, reservados=1, capacidad=32, plazos=None):
+        self.capacidad = capacidad
+        self.plazos = dict(PLAZOS, **(plazos or {}))
+        self.cola = []
+        self.contador = itertools.count()
+        self.en_ejecucion = set()
+        self.condicion = threading.Condition()
+        self.detenido = False
+        self.esperas = {prioridad: deque(maxlen=1000) for prioridad in PRIORIDADES}
+        self.contadores = {"ejecutadas": 0, "fallidas": 0, "canceladas": 0, "vencidas": 0, "rechazadas": 0, "desplazadas": 0}
+        self.hilos = []
+        for i in range(trabajadores + reservados):
+            solo_control = i < reservados
+            hilo = threading.Thread(target=self._trabajar, args=(solo_control,),
+                                    name=f"ejecutor-{'control' if solo_control else 'general'}-{i}", daemon=True)
+            hilo.start()
+            self.hilos.append(hilo)
+
+    def enviar(self, funcion, *args, nombre=None, prioridad="normal", plazo=None, **kwargs):
+        """
+        Encola `funcion(*args, **kwargs)`. Devuelve la Tarea (su `futuro` da el resultado) o None si
+        la cola está llena de tareas más prioritarias o el ejecutor está detenido.
+        """
+        if prioridad not in PRIORIDADES:
+            raise ValueError(f"Prioridad desconocida: {prioridad}")
+        tarea = Tarea(nombre or getattr(funcion, "__name__", "tarea"), funcion, args, kwargs, prioridad,
+                      plazo if plazo is not None else self.plazos[prioridad])
+        with self.condicion:
+            if self.detenido:
+                return None
+            if len(self.cola) >= self.capacidad:
+                peor = max(self.cola)
+                if peor[0] <= PRIORIDADES[prioridad]:
+                    self.contadores["rechazadas"] += 1
+                    print(f"Ejecutor: cola llena, tarea '{tarea.nombre}' rechazada.")
+                    return None
+                self.cola.remove(peor)
+                heapq.heapify(self.cola)
+                self.contadores["desplazadas"] += 1
+                self._descartar(peor[2], "desplazada por una tarea más prioritaria")
+            heapq.heappush(self.cola, (PRIORIDADES[prioridad], next(self.contador), tarea))
+            self.condicion.notify_all()
+        return tarea
+
+    def _siguiente(self, solo_control):
+        # Llamar con la condición tomada
+        while not self.detenido:
+            if self.cola and (not solo_control or self.cola[0][0] == PRIORIDADES["control"]):
+                return heapq.heappop(self.cola)[2]
+            self.condicion.wait()
+        return None
+
+    def _trabajar(self, solo_control):
+        while True:
+            with self.condicion:
+                tarea = self._siguiente(solo_control)
+                if tarea is None:
+                    return
+                if tarea.token.cancelado:
+                    self.contadores["vencidas" if tarea.token.vencido and not tarea.token.evento.is_set() else "canceladas"] += 1
+                    self._descartar(tarea, tarea.token.motivo or "plazo vencido")
+                    continue
+                # El plazo es para esperar en la cola: una tarea que ya empezó solo se corta cancelándola
+                tarea.token.plazo = None
+                self.en_ejecucion.add(tarea)
+                self.esperas[tarea.prioridad].append(time.monotonic() - tarea.encolada)
+            tarea.futuro.set_running_or_notify_cancel()
+            contexto = TOKEN_ACTUAL.set(tarea.token)
+            try:
+                tarea.futuro.set_result(tarea.funcion(*tarea.args, **tarea.kwargs))
+                contador = "ejecutadas"
+            except TareaCancelada as e:
+                print(f"Ejecutor: tarea '{tarea.nombre}' cancelada ({e}).")
+                tarea.futuro.set_exception(e)
+                contador = "canceladas"
+            except Exception as e:
+                print(f"Ejecutor: error en la tarea '{tarea.nombre}': {e}")
+                tarea.futuro.set_exception(e)
+                contador = "fallidas"
+            finally:
+                TOKEN_ACTUAL.reset(contexto)
+            with self.condicion:
+                self.en_ejecucion.discard(tarea)
+                self.contadores[contador] += 1
+
+    def _descartar(self, tarea, motivo):
+        tarea.token.cancelar(motivo)
+        tarea.futuro.cancel()
+        print(f"Ejecutor: tarea '{tarea.nombre}' descartada ({motivo}).")
+
+    def inactivo(self):
+        """True si no hay tareas en la cola ni en ejecución."""
+        with self.condicion:
+            return not self.cola and not self.en_ejecucion
+
+    def token_actual(self):
+        """Token de la tarea en curso (en este hilo o en la corrutina que lo llama), o None fuera del ejecutor."""
+        return TOKEN_ACTUAL.get()
+
+    def cancelar(self, prioridad=None, motivo="cancelada"):
+        """
+        Cancela las tareas pendientes y en ejecución de `prioridad` (una clase o varias; todas si es
+        None). Devuelve cuántas.
+        """
+        clases = None if prioridad is None else {prioridad} if isinstance(prioridad, str) else set(prioridad)
+        with self.condicion:
+            pendientes = [entrada for entrada in self.cola if clases is None or entrada[2].prioridad in clases]
+            for entrada in pendientes:
+                self.cola.remove(entrada)
+                self._descartar(entrada[2], motivo)
+            heapq.heapify(self.cola)
+            activas = [tarea for tarea in self.en_ejecucion if clases is None or tarea.prioridad in clases]
+            for tarea in activas:
+                tarea.token.cancelar(motivo)
+            self.contadores["canceladas"] += len(pendientes)
+        return len(pendientes) + len(activas)
+
+    def detener(self, esperar=1.0):
+        """Cancela todo y despierta a los trabajadores para que terminen."""
+        self.cancelar(motivo="cierre de la aplicación")
+        with self.condicion:
+            self.detenido = True
+            self.condicion.notify_all()
+        limite = time.monotonic() + esperar
+        for hilo in self.hilos:
+            hilo.join(max(0.0, limite - time.monotonic()))
+
+    def metricas(self):
+        with self.condicion:
+            espera = {}
+            for prioridad, tiempos in self.esperas.items():
+                if tiempos:
+                    p50, p95 = np.percentile(tiempos, [50, 95]) * 1000
+                    espera[prioridad] = {"n": len(tiempos), "p50_ms": round(float(p50), 1), "p95_ms": round(float(p95), 1)}
+            return dict(self.contadores, pendientes=len(self.cola), en_ejecucion=len(self.en_ejecucion), espera=espera)
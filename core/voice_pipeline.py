@@ -0,0 +1,184 @@
+import queue
+import threading
+import time
+
+
+class ColaAcotada:
+    """
+    Cola con capacidad fija entre dos etapas del pipeline.
+
+    Políticas cuando está llena:
+      - "bloquear": el productor espera hasta `espera_maxima` segundos (contrapresión) y,
+        si sigue llena, descarta el elemento nuevo.
+      - "descartar_antiguo": se descarta el elemento más viejo para dejar sitio al nuevo.
+      - "descartar_nuevo": se descarta el elemento nuevo.
+    """
+
+    def __init__(self, nombre, capacidad, politica="descartar_antiguo", espera_maxima=1.0):
+        self.nombre = nombre
+        self.cola = queue.Queue(maxsize=capacidad)
+        self.politica = politica
+        self.espera_maxima = espera_maxima
+        self.lock = threading.Lock()
+        self.encolados = 0
+        self.descartados = 0
+        self.profundidad_maxima = 0
+
+    def poner(self, elemento):
+        try:
+            if self.politica == "bloquear":
+                self.cola.put(elemento, timeout=self.espera_maxima)
+            else:
+                self.cola.put_nowait(elemento)
+        except queue.Full:
+            if self.politica != "descartar_antiguo":
+                self._contar_descarte(elemento)
+                return False
+            try:
+                self.cola.get_nowait()
+                self._contar_descarte(elemento)
+            except queue.Empty:
+                pass
+            # Hay un único productor por cola, así que el hueco liberado sigue libre
+            self.cola.put_nowait(elemento)
+        with self.lock:
+            self.encolados += 1
+            self.profundidad_maxima = max(self.profundidad_maxima, self.cola.qsize())
+        return True
+
+    def _contar_descarte(self, elemento):
+        with self.lock:
+            self.descartados += 1
+        print(f"Pipeline: cola '{self.nombre}' llena, elemento descartado.")
+
+    def obtener(self, timeout=0.5):
+        return self.cola.get(timeout=timeout)
+
+    def vaciar(self):
+        while True:
+            try:
+                self.cola.get_nowait()
+            except queue.Empty:
+                return
+
+    def metricas(self):
+        with self.lock:
+            return {
+                "profundidad": self.cola.qsize(),
+                "profundidad_maxima": self.profundidad_maxima,
+                "encolados": self.encolados,
+                "descartados": self.descartados,
+            }
+
+
+class EtapaPipeline:
+    """Hilo que toma elementos de una cola, los procesa con `funcion` y pasa el resultado a la siguiente."""
+
+    def __init__(self, nombre, funcion, entrada, salida, pipeline):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.entrada = entrada
+        self.salida = salida
+        self.pipeline = pipeline
+        self.procesados = 0
+        self.tiempo_total = 0.0
+        self.espera_total = 0.0
+        self.hilo = None
+
+    def iniciar(self):
+        self.hilo = threading.Thread(target=self._bucle, name=f"pipeline-{self.nombre}", daemon=True)
+        self.hilo.start()
+
+    def _bucle(self):
+        while self.pipeline.activo:
+            if self.entrada is None:
+                elemento = None
+            else:
+                try:
+                    elemento, encolado_en = self.entrada.obtener()
+                except Exception:
+                    continue
+                self.espera_total += time.perf_counter() - encolado_en
+
+            inicio = time.perf_counter()
+            try:
+                resultado = self.funcion() if self.entrada is None else self.funcion(elemento)
+            except Exception as e:
+                print(f"Error en la etapa '{self.nombre}' del pipeline: {e}")
+                continue
+            self.tiempo_total += time.perf_counter() - inicio
+            self.procesados += 1
+
+            if resultado is False:
+                # La etapa pidió terminar (p. ej. el comando "salir")
+                self.pipeline.detener()
+                return
+            if resultado is not None and self.salida is not None:
+                self.salida.poner((resultado, time.perf_counter()))
+
+    def metricas(self):
+        procesados = max(self.procesados, 1)
+        return {
+            "procesados": self.procesados,
+            "tiempo_medio_ms": self.tiempo_total / procesados * 1000,
+            "espera_media_ms": self.espera_total / procesados * 1000,
+        }
+
+
+class PipelineVoz:
+    """
+    Bucle de voz en etapas: captura -> reconocimiento -> interpretación -> ejecución.
+
+    Cada etapa corre en su propio hilo y se comunica con la siguiente por una cola
+    acotada, de modo que el micrófono sigue capturando y reconociendo mientras un
+    comando largo se ejecuta. Cada función recibe el resultado de la etapa anterior y
+    devuelve None para descartarlo o False para detener el pipeline.
+    """
+
+    def __init__(self, capturar, reconocer, interpretar, ejecutar, capacidad_audio=4, capacidad_texto=4, capacidad_comandos=8):
+        self.activo = False
+        self.terminado = threading.Event()
+        self.colas = {
+            "audio": ColaAcotada("audio", capacidad_audio, politica="bloquear"),
+            "texto": ColaAcotada("texto", capacidad_texto, politica="descartar_antiguo"),
+            "comandos": ColaAcotada("comandos", capacidad_comandos, politica="descartar_antiguo"),
+        }
+        self.etapas = [
+            EtapaPipeline("captura", capturar, None, self.colas["audio"], self),
+            EtapaPipeline("reconocimiento", reconocer, self.colas["audio"], self.colas["texto"], self),
+            EtapaPipeline("interpretacion", interpretar, self.colas["texto"], self.colas["comandos"], self),
+            EtapaPipeline("ejecucion", ejecutar, self.colas["comandos"], None, self),
+        ]
+
+    def iniciar(self):
+        if self.activo:
+            return
+        self.activo = True
+        self.terminado.clear()
+        for etapa in self.etapas:
+            etapa.iniciar()
+
+    def detener(self):
+        self.activo = False
+        for cola in self.colas.values():
+            cola.vaciar()
+        self.terminado.set()
+
+    def inyectar(self, nombre_cola, elemento):
+        """Mete un elemento directamente en una cola, saltándose las etapas anteriores."""
+        return self.colas[nombre_cola].poner((elemento, time.perf_counter()))
+
+    def esperar(self, timeout=None):
+        return self.terminado.wait(timeout)
+
+    def metricas(self):
+        return {
+            "colas": {nombre: cola.metricas() for nombre, cola in self.colas.items()},
+            "etapas": {etapa.nombre: etapa.metricas() for etapa in self.etapas},
+        }
+
+    def resumen_metricas(self):
+        metricas = self.metricas()
+        partes = [f"{nombre}: {m['profundidad']}/{m['profundidad_maxima']} (descartados {m['descartados']})"
+                  for nombre, m in metricas["colas"].items()]
+        return "Colas del pipeline -> " + ", ".join(partes)
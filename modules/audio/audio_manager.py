@@ -1,58 +1,182 @@
-import tempfile
-import os
+import io
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pygame
 from gtts import gTTS
 import noisereduce as nr
 import numpy as np
 import soundfile as sf
-import librosa
 from utils.audio_utils import normalizar_audio
 import traceback
+from modules.audio.tts_cache import CacheVoz
+from modules.audio.pcm_player import ReproductorPCM, decodificar, soporta_mp3
+
+# Parte de la clave de la caché de voz; gTTS no tiene voces, solo idioma
+MOTOR_TTS = "gtts"
+FIN_FRASE = re.compile(r'(?<=[.!?;])\s+')
+FIN_CLAUSULA = re.compile(r'(?<=,)\s+')
+
+
+def iniciar_mixer_pygame():
+    """Inicializa el mixer de pygame la primera vez que se usa: voz de Gemini o respaldo de la salida PCM."""
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+
+
+def dividir_en_fragmentos(texto, primero=80, maximo=200):
+    """
+    Parte una respuesta en fragmentos por frases, luego por comas y, si hace falta, por espacios.
+    El primero tiene como mucho `primero` caracteres para que empiece a sonar cuanto antes; los
+    demás juntan frases cortas hasta `maximo`. Un texto de un solo fragmento se devuelve tal cual,
+    así su clave en la caché de voz es la de la frase completa.
+    """
+    lineas = [linea.strip() for linea in texto.splitlines() if linea.strip()]
+    piezas = []
+    for linea in lineas:
+        # Sin signo al final de cada línea de una lista, las líneas se leerían seguidas
+        if len(lineas) > 1 and linea[-1] not in ".!?;:,":
+            linea += "."
+        for frase in FIN_FRASE.split(linea):
+            for clausula in (FIN_CLAUSULA.split(frase) if len(frase) > maximo else [frase]):
+                while len(clausula) > maximo:
+                    corte = clausula.rfind(" ", 0, maximo)
+                    corte = corte if corte > 0 else maximo
+                    piezas.append(clausula[:corte].strip())
+                    clausula = clausula[corte:].strip()
+                if clausula:
+                    piezas.append(clausula)
+    if len(piezas) <= 1:
+        return [texto.strip()] if texto.strip() else []
+    fragmentos = [piezas[0]]
+    for pieza in piezas[1:]:
+        limite = primero if len(fragmentos) == 1 else maximo
+        if len(fragmentos[-1]) + 1 + len(pieza) <= limite:
+            fragmentos[-1] += " " + pieza
+        else:
+            fragmentos.append(pieza)
+    return fragmentos
+
 
 class AudioManager:
-    def __init__(self, acento_asistente, audio_lock):
+    def __init__(self, acento_asistente, audio_lock, cache_voz=None, anticipacion=2, reproductor=None):
         self.acento_asistente = acento_asistente
         self.audio_lock = audio_lock
-        pygame.mixer.init()
+        # Las frases ya sintetizadas se leen del disco en lugar de pedirlas otra vez a gTTS
+        self.cache_voz = cache_voz if cache_voz is not None else CacheVoz()
+        # Fragmentos que se sintetizan por delante del que está sonando
+        self.anticipacion = anticipacion
+        self.sintesis = ThreadPoolExecutor(max_workers=anticipacion + 1, thread_name_prefix="tts")
+        # Las respuestas se decodifican en memoria y suenan por una salida abierta toda la sesión;
+        # pygame queda para la voz de Gemini y como respaldo si la salida PCM no está disponible
+        self.reproductor = reproductor if reproductor is not None else ReproductorPCM()
+        if not soporta_mp3():
+            print("libsndfile no decodifica MP3 (hace falta la 1.1 o posterior); las respuestas se reproducirán con pygame.")
+            self.reproductor = None
         self.reproduciendo_audio = False
-        self.detener_audio = False
-        self.audio_thread = None
+        # Cada "detener" suma uno; una respuesta se corta si el contador cambió desde que se pidió,
+        # también si aún esperaba su turno en audio_lock
+        self.paradas = 0
+        self.lock_paradas = threading.Lock()
 
-    def responder_con_audio(self, respuesta, idioma=None):
+    def responder_con_audio(self, respuesta, idioma=None, cancelado=None):
+        """
+        Dice la respuesta fragmento a fragmento: mientras suena uno se sintetizan los
+        `anticipacion` siguientes, así que el primero empieza a sonar sin esperar al resto.
+        Cada fragmento se encola en el reproductor en cuanto está listo, así que suenan seguidos.
+        `cancelado` es una función opcional que corta la respuesta entre fragmentos.
+        """
         if not idioma:
             idioma = self.acento_asistente
+        generacion = self.paradas
+        fragmentos = dividir_en_fragmentos(respuesta)
 
         with self.audio_lock:
+            futuros = []
+            anterior = None
+            if self.paradas != generacion:
+                print(f"Respuesta descartada (se detuvo el audio): {respuesta[:60]}")
+                return
+            self.reproduciendo_audio = True
             try:
-                # Verificar si el mixer está inicializado
-                if not pygame.mixer.get_init():
-                    print("Reinicializando pygame mixer...")
-                    pygame.mixer.init()
-                
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmpfile:
-                    archivo_audio = tmpfile.name
-                
-                tts = gTTS(text=respuesta, lang=idioma)
-                tts.save(archivo_audio)
-                print(f"Audio guardado en: {archivo_audio}")
-                
-                pygame.mixer.music.load(archivo_audio)
-                pygame.mixer.music.play()
-                print(f"Reproduciendo audio desde: {archivo_audio}")
-
-                while pygame.mixer.music.get_busy():
-                    pygame.time.Clock().tick(10)
-                
-                pygame.mixer.music.unload()
-                os.remove(archivo_audio)
-                print(f"Archivo temporal eliminado: {archivo_audio}")
+                futuros = [self.sintesis.submit(self.sintetizar, fragmento, idioma)
+                           for fragmento in fragmentos[:self.anticipacion + 1]]
+                for i in range(len(fragmentos)):
+                    audio = futuros[i].result()
+                    siguiente = i + self.anticipacion + 1
+                    if siguiente < len(fragmentos):
+                        futuros.append(self.sintesis.submit(self.sintetizar, fragmentos[siguiente], idioma))
+                    if self.paradas != generacion or (cancelado is not None and cancelado()):
+                        # Lo que quede encolado de esta respuesta tampoco debe sonar
+                        if self.reproductor is not None:
+                            self.reproductor.detener()
+                        break
+                    actual = self._encolar(audio)
+                    # Se espera al fragmento anterior, no a este: el siguiente ya está en la cola
+                    if anterior is not None:
+                        anterior.esperar()
+                    if self.paradas != generacion:
+                        # Se detuvo mientras se encolaba este fragmento
+                        if actual is not None:
+                            self.reproductor.detener()
+                        break
+                    if actual is None:
+                        self._reproducir_pygame(audio, generacion)
+                    anterior = actual
+                if anterior is not None and self.paradas == generacion:
+                    anterior.esperar()
             except Exception as e:
                 print(f"Error al responder con audio: {e}")
                 traceback.print_exc()
+            finally:
+                for futuro in futuros:
+                    futuro.cancel()
+                self.reproduciendo_audio = False
+
+    def _encolar(self, audio):
+        """Decodifica el MP3 en memoria y lo encola; None si hay que usar pygame."""
+        if self.reproductor is None:
+            return None
+        try:
+            return self.reproductor.reproducir(*decodificar(audio))
+        except Exception as e:
+            print(f"Salida de audio PCM no disponible ({e}); se usa pygame.")
+            self.reproductor = None
+            return None
+
+    def _reproducir_pygame(self, audio, generacion):
+        iniciar_mixer_pygame()
+        pygame.mixer.music.load(io.BytesIO(audio), "mp3")
+        pygame.mixer.music.play()
+        reloj = pygame.time.Clock()
+        while pygame.mixer.music.get_busy() and self.paradas == generacion:
+            reloj.tick(10)
+        pygame.mixer.music.unload()
+
+    def precalentar(self, texto, idioma=None):
+        """Sintetiza y guarda en la caché los fragmentos de `texto` sin reproducirlos."""
+        for fragmento in dividir_en_fragmentos(texto):
+            self.sintetizar(fragmento, idioma)
+
+    def sintetizar(self, texto, idioma=None):
+        """MP3 de `texto` desde la caché de voz o, si no está, de gTTS (y se guarda)."""
+        idioma = idioma or self.acento_asistente
+        return self.cache_voz.obtener(texto, idioma, MOTOR_TTS, sintetizar=lambda: self._sintetizar_gtts(texto, idioma))
+
+    def en_cache(self, texto, idioma=None):
+        idioma = idioma or self.acento_asistente
+        return all(self.cache_voz.contiene(fragmento, idioma, MOTOR_TTS) for fragmento in dividir_en_fragmentos(texto))
+
+    @staticmethod
+    def _sintetizar_gtts(texto, idioma):
+        buffer = io.BytesIO()
+        gTTS(text=texto, lang=idioma).write_to_fp(buffer)
+        return buffer.getvalue()
 
     def reducir_ruido(self, audio):
         try:
-            audio_data = np.frombuffer(audio.get_wav_data(), dtype=np.int16)
+            # float32 evita el desbordamiento de audio_data ** 2 con int16
+            audio_data = np.frombuffer(audio.get_raw_data(convert_width=2), dtype=np.int16).astype(np.float32)
             energia_señal_original = np.sum(audio_data ** 2)
             energia_ruido_original = 0.1 * energia_señal_original
             reduced_noise_audio = nr.reduce_noise(y=audio_data, sr=audio.sample_rate)
@@ -70,14 +194,22 @@ class AudioManager:
 
     def detener_reproduccion_audio(self):
         """
-        Detiene la reproducción del audio si está en curso.
+        Detiene la reproducción del audio en curso y descarta las respuestas que esperaban turno.
         """
+        with self.lock_paradas:
+            self.paradas += 1
+        if self.reproductor is not None:
+            self.reproductor.detener()
         if self.reproduciendo_audio:
             print("Deteniendo reproducción de audio...")
-            self.detener_audio = True
-            pygame.mixer.music.stop()
-            if self.audio_thread and self.audio_thread.is_alive():
-                self.audio_thread.join()
-            self.reproduciendo_audio = False
+            if pygame.mixer.get_init():
+                pygame.mixer.music.stop()
         else:
             print("No hay audio reproduciéndose.")
+
+    def cerrar(self):
+        with self.lock_paradas:
+            self.paradas += 1
+        if self.reproductor is not None:
+            self.reproductor.cerrar()
+        self.sintesis.shutdown(wait=False, cancel_futures=True)
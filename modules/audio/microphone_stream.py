@@ -0,0 +1,254 @@
+import threading
+import numpy as np
+import sounddevice as sd
+from modules.audio.resampler import Remuestreador
+from utils.audio_utils import a_int16
+
+
+class RingBuffer:
+    """
+    Buffer circular de tamaño fijo para muestras de audio mono.
+    Las posiciones son absolutas (muestras escritas desde el inicio), así varios
+    lectores pueden consumir el mismo audio sin copiarlo ni reabrir el micrófono.
+    """
+
+    def __init__(self, capacidad, dtype=np.int16):
+        self.capacidad = int(capacidad)
+        self.datos = np.zeros(self.capacidad, dtype=dtype)
+        self.escritas = 0
+        self.condicion = threading.Condition()
+
+    def escribir(self, bloque):
+        n = len(bloque)
+        if n == 0:
+            return
+        with self.condicion:
+            if n > self.capacidad:
+                self.escritas += n - self.capacidad
+                bloque = bloque[-self.capacidad:]
+                n = self.capacidad
+            inicio = self.escritas % self.capacidad
+            fin = inicio + n
+            if fin <= self.capacidad:
+                self.datos[inicio:fin] = bloque
+            else:
+                corte = self.capacidad - inicio
+                self.datos[inicio:] = bloque[:corte]
+                self.datos[:fin - self.capacidad] = bloque[corte:]
+            self.escritas += n
+            self.condicion.notify_all()
+
+    def leer(self, desde, hasta):
+        """Devuelve una copia de las muestras [desde, hasta) que sigan en el buffer."""
+        with self.condicion:
+            desde = max(desde, self.escritas - self.capacidad, 0)
+            hasta = min(hasta, self.escritas)
+            if hasta <= desde:
+                return np.zeros(0, dtype=self.datos.dtype)
+            inicio = desde % self.capacidad
+            n = hasta - desde
+            if inicio + n <= self.capacidad:
+                return self.datos[inicio:inicio + n].copy()
+            return np.concatenate((self.datos[inicio:], self.datos[:n - (self.capacidad - inicio)]))
+
+    def esperar(self, posicion, timeout=None):
+        """Bloquea hasta que se hayan escrito al menos `posicion` muestras."""
+        with self.condicion:
+            return self.condicion.wait_for(lambda: self.escritas >= posicion, timeout)
+
+    def posicion(self):
+        with self.condicion:
+            return self.escritas
+
+
+class _Grabacion:
+    """Copia de la señal del micrófono a otra frecuencia, mientras dure una grabación puntual."""
+
+    def __init__(self, remuestreador, muestras):
+        self.remuestreador = remuestreador
+        self.faltan = muestras
+        self.partes = []
+        self.terminada = threading.Event()
+
+    def agregar(self, indata):
+        salida = self.remuestreador.procesar(indata)[:self.faltan]
+        self.partes.append(salida)
+        self.faltan -= len(salida)
+        if self.faltan <= 0:
+            self.terminada.set()
+
+
+class MicrophoneStream:
+    """
+    Flujo de entrada del micrófono abierto una sola vez durante toda la sesión.
+    El callback de sounddevice escribe en un RingBuffer y el resto del pipeline
+    (segmentación, detección del nombre y reconocimiento) lee de ese buffer.
+
+    El dispositivo se abre a su frecuencia nativa y el callback mezcla a mono y remuestrea
+    una sola vez a `sample_rate` (p. ej. 16 kHz para voz), de modo que todo lo que lee del
+    buffer trabaja con menos muestras. Con `sample_rate=None` se usa la del dispositivo.
+    """
+
+    def __init__(self, device_index=0, sample_rate=None, duracion_bloque=0.03, segundos_buffer=30,
+                 sample_rate_dispositivo=None, canales=1):
+        self.device_index = device_index
+        self.sample_rate = sample_rate
+        self.sample_rate_dispositivo = sample_rate_dispositivo
+        self.canales = canales
+        self.remuestreador = None
+        self.grabaciones = []
+        self.duracion_bloque = duracion_bloque
+        self.segundos_buffer = segundos_buffer
+        self.tamano_bloque = None
+        self.buffer = None
+        self.stream = None
+        self.activo = False
+        self.desbordes = 0
+        self.lock = threading.Lock()
+
+    def iniciar(self):
+        """Abre el micrófono si todavía no está abierto."""
+        with self.lock:
+            if self.activo:
+                return
+            if not self.sample_rate_dispositivo:
+                info = sd.query_devices(self.device_index, 'input')
+                self.sample_rate_dispositivo = int(info['default_samplerate'])
+            if not self.sample_rate:
+                self.sample_rate = self.sample_rate_dispositivo
+            if self.remuestreador is None:
+                self.remuestreador = Remuestreador(self.sample_rate_dispositivo, self.sample_rate)
+            self.tamano_bloque = int(self.sample_rate * self.duracion_bloque)
+            if self.buffer is None:
+                self.buffer = RingBuffer(self.sample_rate * self.segundos_buffer)
+            self.stream = sd.InputStream(
+                device=self.device_index,
+                channels=self.canales,
+                samplerate=self.sample_rate_dispositivo,
+                dtype='int16',
+                blocksize=int(self.sample_rate_dispositivo * self.duracion_bloque),
+                callback=self._callback
+            )
+            self.stream.start()
+            self.activo = True
+            print(f"Micrófono abierto a {self.sample_rate_dispositivo} Hz, entregando {self.sample_rate} Hz mono "
+                  f"(bloques de {self.tamano_bloque} muestras).")
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            self.desbordes += 1
+        if self.remuestreador.directo and indata.shape[1] == 1:
+            bloque = indata[:, 0]
+        else:
+            bloque = a_int16(self.remuestreador.procesar(indata))
+        self.buffer.escribir(bloque)
+        for grabacion in list(self.grabaciones):
+            grabacion.agregar(indata)
+            if grabacion.terminada.is_set():
+                try:
+                    self.grabaciones.remove(grabacion)
+                except ValueError:
+                    pass
+
+    def grabar(self, segundos, sample_rate):
+        """
+        Graba los próximos `segundos` a `sample_rate` Hz (mono, int16) remuestreando desde la
+        señal original del dispositivo, sin abrir otro flujo. Devuelve None si el micrófono se cierra.
+        """
+        self.iniciar()
+        grabacion = _Grabacion(Remuestreador(self.sample_rate_dispositivo, sample_rate), int(segundos * sample_rate))
+        self.grabaciones.append(grabacion)
+        if not grabacion.terminada.wait(segundos + 2):
+            try:
+                self.grabaciones.remove(grabacion)
+            except ValueError:
+                pass
+            return None
+        return a_int16(np.concatenate(grabacion.partes))
+
+    def detener(self):
+        with self.lock:
+            if not self.activo:
+                return
+            self.activo = False
+            try:
+                self.stream.stop()
+                self.stream.close()
+            except Exception as e:
+                print(f"Error al cerrar el micrófono: {e}")
+            self.stream = None
+            # Despertar a los lectores que estén esperando datos
+            with self.buffer.condicion:
+                self.buffer.condicion.notify_all()
+
+    def posicion_actual(self):
+        return self.buffer.posicion()
+
+    def leer(self, desde, hasta):
+        return self.buffer.leer(desde, hasta)
+
+    def ultimos_segundos(self, segundos):
+        """
+        Devuelve (captura retroactiva) los últimos `segundos` de audio del micrófono como int16.
+        Lo que exceda la capacidad del buffer circular se recorta.
+        """
+        fin = self.posicion_actual()
+        return self.leer(fin - int(segundos * self.sample_rate), fin)
+
+    def bloques(self, desde=None, timeout_bloque=1.0):
+        """
+        Generador de bloques consecutivos a partir de `desde` (por defecto, ahora).
+        Devuelve tuplas (posicion, bloque) y termina cuando el micrófono se cierra.
+        """
+        posicion = self.posicion_actual() if desde is None else desde
+        while self.activo:
+            fin = posicion + self.tamano_bloque
+            if not self.buffer.esperar(fin, timeout_bloque):
+                continue
+            # Si el lector se quedó atrás más de lo que guarda el buffer, saltar al audio disponible
+            posicion = max(posicion, self.buffer.posicion() - self.buffer.capacidad)
+            fin = posicion + self.tamano_bloque
+            yield posicion, self.buffer.leer(posicion, fin)
+            posicion = fin
+
+
+class FuenteGrabada:
+    """
+    Sustituto del micrófono para audio ya grabado (modo de reproducción offline).
+    Ofrece la misma interfaz de lectura que MicrophoneStream (bloques, leer, sample_rate),
+    pero entrega los bloques tan rápido como se consumen, sin esperar al tiempo real.
+    """
+
+    def __init__(self, muestras, sample_rate, duracion_bloque=0.03):
+        self.muestras = np.asarray(muestras, dtype=np.int16)
+        self.sample_rate = sample_rate
+        self.duracion_bloque = duracion_bloque
+        self.tamano_bloque = int(sample_rate * duracion_bloque)
+        self.segundos_buffer = len(self.muestras) / sample_rate
+        self.posicion = 0
+        self.activo = True
+
+    def iniciar(self):
+        pass
+
+    def detener(self):
+        self.activo = False
+
+    def posicion_actual(self):
+        return self.posicion
+
+    def leer(self, desde, hasta):
+        return self.muestras[max(desde, 0):min(hasta, self.posicion)].copy()
+
+    def ultimos_segundos(self, segundos):
+        return self.leer(self.posicion - int(segundos * self.sample_rate), self.posicion)
+
+    def bloques(self, desde=None, timeout_bloque=None):
+        """Igual que MicrophoneStream.bloques; termina al agotarse la grabación."""
+        posicion = self.posicion if desde is None else desde
+        while self.activo and posicion + self.tamano_bloque <= len(self.muestras):
+            fin = posicion + self.tamano_bloque
+            bloque = self.muestras[posicion:fin]
+            self.posicion = max(self.posicion, fin)
+            yield posicion, bloque
+            posicion = fin
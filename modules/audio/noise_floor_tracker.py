@@ -0,0 +1,59 @@
+import math
+import threading
+
+
+class NoiseFloorTracker:
+    """
+    Sigue el nivel de ruido de fondo del flujo del micrófono con una media móvil
+    exponencial del RMS por bloque y deriva de él el umbral de energía del segmentador.
+    Sustituye a `adjust_for_ambient_noise`: el umbral se adapta continuamente en lugar
+    de recalibrarse antes de cada frase.
+
+    El umbral es el ruido de fondo multiplicado por `ratio`. El control "suprimir ruido" (los
+    sliders y `energy_threshold` en la configuración) fija ese ratio y no el umbral, que la
+    media volvería a mover en medio segundo: 5000, el valor por defecto, equivale al 1.5 de
+    `adjust_for_ambient_noise`, y el doble a 3 veces el ruido de fondo.
+
+    Lo alimenta el segmentador con la decisión del detector de voz de cada bloque: solo los
+    bloques sin voz mueven el piso, ni la voz ni lo que suene mientras no se escucha (las
+    respuestas del asistente) entran en la media.
+    """
+
+    CONTROL_REFERENCIA = 5000
+    RATIO_REFERENCIA = 1.5
+
+    def __init__(self, control=5000, umbral_inicial=5000, tau_bajada=0.5, tau_subida=4.0, umbral_minimo=50,
+                 ratio_minimo=1.0):
+        self.ratio_minimo = ratio_minimo
+        self.ratio = self.ratio_de_control(control)
+        # Bajar rápido cuando la sala se calla y subir despacio para no perseguir la voz
+        self.tau_bajada = tau_bajada
+        self.tau_subida = tau_subida
+        self.umbral_minimo = umbral_minimo
+        self.ruido = float(umbral_inicial) / self.ratio
+        self.lock = threading.Lock()
+
+    def ratio_de_control(self, control):
+        return max(float(control) / self.CONTROL_REFERENCIA * self.RATIO_REFERENCIA, self.ratio_minimo)
+
+    def establecer_control(self, control):
+        """Aplica el valor del slider; el umbral cambia en el siguiente bloque y se mantiene al seguir el ruido."""
+        with self.lock:
+            self.ratio = self.ratio_de_control(control)
+
+    def actualizar(self, rms, duracion_bloque, voz=False):
+        """Incorpora el RMS de un bloque; los bloques con voz no cuentan como ruido de fondo."""
+        if voz:
+            return
+        with self.lock:
+            tau = self.tau_bajada if rms < self.ruido else self.tau_subida
+            alpha = 1.0 - math.exp(-duracion_bloque / tau)
+            self.ruido += alpha * (rms - self.ruido)
+
+    def umbral_actual(self):
+        with self.lock:
+            return max(self.ruido * self.ratio, self.umbral_minimo)
+
+    def piso_ruido(self):
+        with self.lock:
+            return self.ruido
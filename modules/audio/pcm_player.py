@@ -0,0 +1,132 @@
+import io
+import threading
+from collections import deque
+import numpy as np
+import sounddevice as sd
+import soundfile as sf
+from modules.audio.resampler import Remuestreador, remuestrear
+
+
+def soporta_mp3():
+    """soundfile decodifica MP3 desde libsndfile 1.1; las versiones anteriores no lo incluyen."""
+    return 'MP3' in sf.available_formats()
+
+
+def decodificar(datos):
+    """Decodifica en memoria un audio comprimido (MP3, WAV, OGG) a (muestras float32 mono, frecuencia)."""
+    muestras, frecuencia = sf.read(io.BytesIO(datos), dtype='float32')
+    return Remuestreador.a_mono(muestras), frecuencia
+
+
+class Reproduccion:
+    """Un audio en la cola del reproductor; `terminada` se activa al sonar su última muestra o al detenerlo."""
+
+    def __init__(self, muestras, frecuencia):
+        self.muestras = muestras
+        self.posicion = 0
+        self.duracion = len(muestras) / frecuencia
+        self.terminada = threading.Event()
+
+    def esperar(self, margen=1.0):
+        """Bloquea hasta que termina; el margen evita quedarse colgado si el dispositivo deja de pedir audio."""
+        return self.terminada.wait(self.duracion + margen)
+
+
+class ReproductorPCM:
+    """
+    Salida de audio abierta una sola vez durante toda la sesión.
+
+    `reproducir` pone las muestras en una cola y vuelve enseguida; el callback de sounddevice
+    las copia al dispositivo bloque a bloque y, al acabar cada audio, activa su evento. Los
+    audios encolados seguidos suenan sin hueco entre ellos. Las muestras se remuestrean a la
+    frecuencia nativa del dispositivo antes de encolarlas.
+    """
+
+    def __init__(self, device_index=None, sample_rate=None, duracion_bloque=0.02):
+        self.device_index = device_index
+        self.sample_rate = sample_rate
+        self.duracion_bloque = duracion_bloque
+        self.cola = deque()
+        self.stream = None
+        self.activo = False
+        self.vacios = 0
+        # `lock` protege abrir y cerrar la salida; `lock_cola` la cola, que también lee el callback
+        self.lock = threading.Lock()
+        self.lock_cola = threading.Lock()
+
+    def iniciar(self):
+        """Abre la salida si todavía no está abierta."""
+        with self.lock:
+            if self.activo:
+                return
+            if not self.sample_rate:
+                info = sd.query_devices(self.device_index, 'output')
+                self.sample_rate = int(info['default_samplerate'])
+            self.stream = sd.OutputStream(
+                device=self.device_index,
+                channels=1,
+                samplerate=self.sample_rate,
+                dtype='float32',
+                blocksize=int(self.sample_rate * self.duracion_bloque),
+                callback=self._callback
+            )
+            self.stream.start()
+            self.activo = True
+            print(f"Salida de audio abierta a {self.sample_rate} Hz.")
+
+    def _callback(self, outdata, frames, time_info, status):
+        if status:
+            self.vacios += 1
+        salida = outdata[:, 0]
+        escritas = 0
+        with self.lock_cola:
+            while escritas < frames and self.cola:
+                actual = self.cola[0]
+                n = min(frames - escritas, len(actual.muestras) - actual.posicion)
+                salida[escritas:escritas + n] = actual.muestras[actual.posicion:actual.posicion + n]
+                actual.posicion += n
+                escritas += n
+                if actual.posicion >= len(actual.muestras):
+                    self.cola.popleft()
+                    actual.terminada.set()
+        salida[escritas:] = 0
+
+    def reproducir(self, muestras, frecuencia):
+        """Encola el audio y devuelve su Reproduccion sin esperar a que suene."""
+        self.iniciar()
+        if frecuencia != self.sample_rate:
+            muestras = remuestrear(muestras, frecuencia, self.sample_rate)
+        reproduccion = Reproduccion(np.ascontiguousarray(muestras, dtype=np.float32), self.sample_rate)
+        with self.lock_cola:
+            if len(reproduccion.muestras):
+                self.cola.append(reproduccion)
+            else:
+                reproduccion.terminada.set()
+        return reproduccion
+
+    def ocupado(self):
+        with self.lock_cola:
+            return bool(self.cola)
+
+    def detener(self):
+        """Corta lo que esté sonando y descarta lo encolado."""
+        with self.lock_cola:
+            pendientes = list(self.cola)
+            self.cola.clear()
+        for reproduccion in pendientes:
+            reproduccion.terminada.set()
+
+    def cerrar(self):
+        self.detener()
+        with self.lock:
+            if not self.activo:
+                return
+            self.activo = False
+            stream = self.stream
+            self.stream = None
+        # Fuera de los locks: stop() espera a que vuelva el callback en curso
+        try:
+            stream.stop()
+            stream.close()
+        except Exception as e:
+            print(f"Error al cerrar la salida de audio: {e}")
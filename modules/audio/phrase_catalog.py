@@ -0,0 +1,140 @@
+import ast
+import os
+import threading
+import time
+
+# Llamadas cuyo primer argumento es una frase que se dice en voz alta
+LLAMADAS_RESPUESTA = {"responder_con_audio", "responder_con_audio_callback", "responder"}
+CARPETAS_FUENTES = ("core", "modules", "gui")
+
+
+def _nombre_llamada(nodo):
+    if isinstance(nodo.func, ast.Attribute):
+        return nodo.func.attr
+    if isinstance(nodo.func, ast.Name):
+        return nodo.func.id
+    return None
+
+
+def _expandir(cadena, expansiones):
+    """Frases de una f-string si todos sus huecos tienen valores conocidos; si no, ninguna."""
+    frases = [""]
+    for parte in cadena.values:
+        if isinstance(parte, ast.Constant):
+            frases = [frase + str(parte.value) for frase in frases]
+            continue
+        if parte.format_spec is not None or parte.conversion != -1:
+            return []
+        valores = expansiones.get(ast.unparse(parte.value))
+        if valores is None:
+            return []
+        frases = [frase + str(valor) for frase in frases for valor in valores]
+    return frases
+
+
+def frases_de_fuente(codigo, expansiones=None):
+    """Frases fijas que el código pasa a responder_con_audio (y a sus callbacks)."""
+    expansiones = expansiones or {}
+    frases = []
+    for nodo in ast.walk(ast.parse(codigo)):
+        if not isinstance(nodo, ast.Call) or _nombre_llamada(nodo) not in LLAMADAS_RESPUESTA or not nodo.args:
+            continue
+        argumento = nodo.args[0]
+        if isinstance(argumento, ast.Constant) and isinstance(argumento.value, str):
+            frases.append(argumento.value)
+        elif isinstance(argumento, ast.JoinedStr):
+            frases.extend(_expandir(argumento, expansiones))
+    return frases
+
+
+def catalogo_frases(raiz, expansiones=None):
+    """
+    Catálogo de respuestas fijas del asistente, leído de las fuentes bajo `raiz`. Las f-strings
+    solo entran si sus huecos están en `expansiones` ({expresión: valores posibles}), por
+    ejemplo {"nuevo_volumen": range(101)}; las que dependen de una canción o una búsqueda no.
+    """
+    frases = {}
+    for carpeta in CARPETAS_FUENTES:
+        for directorio, _, archivos in os.walk(os.path.join(raiz, carpeta)):
+            for archivo in sorted(archivos):
+                if not archivo.endswith(".py"):
+                    continue
+                try:
+                    with open(os.path.join(directorio, archivo), encoding="utf-8") as fuente:
+                        codigo = fuente.read()
+                    for frase in frases_de_fuente(codigo, expansiones):
+                        if frase.strip():
+                            frases[frase] = None
+                except (OSError, SyntaxError) as e:
+                    print(f"Catálogo de frases: no se pudo leer {archivo} ({e})")
+    return list(frases)
+
+
+class PresintetizadorVoz:
+    """
+    Sintetiza en segundo plano las frases del catálogo que aún no están en la caché de voz.
+
+    Trabaja en un solo hilo, de una frase en una frase, y antes de cada una espera a que
+    `ocupado()` sea falso (no hay comandos en curso ni audio sonando), así que nunca compite con
+    una orden del usuario. Tras `max_fallos` errores seguidos (sin conexión) lo deja para el
+    siguiente arranque.
+    """
+
+    def __init__(self, audio_manager, frases, ocupado=None, max_fallos=3, pausa=0.2):
+        self.audio_manager = audio_manager
+        self.frases = frases
+        self.ocupado = ocupado or (lambda: False)
+        self.max_fallos = max_fallos
+        self.pausa = pausa
+        self.total = 0
+        self.hechas = 0
+        self.fallidas = 0
+        self.terminado = threading.Event()
+        self.detenido = threading.Event()
+        self.hilo = None
+
+    def iniciar(self):
+        self.hilo = threading.Thread(target=self._trabajar, name="presintesis-voz", daemon=True)
+        self.hilo.start()
+
+    def detener(self):
+        self.detenido.set()
+
+    def _trabajar(self):
+        idioma = self.audio_manager.acento_asistente
+        pendientes = [frase for frase in self.frases if not self.audio_manager.en_cache(frase, idioma)]
+        self.total = len(pendientes)
+        if pendientes:
+            print(f"Presíntesis de voz: {len(pendientes)} de {len(self.frases)} frases por sintetizar.")
+        seguidos = 0
+        siguiente_aviso = 0.1
+        inicio = time.monotonic()
+        for frase in pendientes:
+            while self.ocupado() and not self.detenido.is_set():
+                self.detenido.wait(self.pausa)
+            if self.detenido.is_set():
+                break
+            try:
+                self.audio_manager.precalentar(frase, idioma)
+                self.hechas += 1
+                seguidos = 0
+            except Exception as e:
+                self.fallidas += 1
+                seguidos += 1
+                if seguidos >= self.max_fallos:
+                    print(f"Presíntesis de voz: interrumpida tras {seguidos} errores seguidos ({e}).")
+                    break
+            if self.progreso() >= siguiente_aviso:
+                print(f"Presíntesis de voz: {self.progreso():.0%} ({self.hechas}/{self.total})")
+                siguiente_aviso = self.progreso() + 0.1
+        if self.total:
+            print(f"Presíntesis de voz: {self.hechas} frases guardadas, {self.fallidas} fallidas, "
+                  f"{time.monotonic() - inicio:.1f} s.")
+        self.terminado.set()
+
+    def progreso(self):
+        return (self.hechas + self.fallidas) / self.total if self.total else 1.0
+
+    def metricas(self):
+        return {"total": self.total, "hechas": self.hechas, "fallidas": self.fallidas,
+                "progreso": round(self.progreso(), 3), "terminado": self.terminado.is_set()}
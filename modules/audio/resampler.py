@@ -0,0 +1,108 @@
+from functools import lru_cache
+from math import gcd
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import firwin
+
+
+@lru_cache(maxsize=16)
+def filtro_polifasico(origen, destino, semiancho=10, beta=5.0):
+    """
+    Diseña (una sola vez por par de frecuencias) el filtro FIR paso bajo para pasar de
+    `origen` a `destino` Hz y lo reparte en sus L fases.
+    Devuelve (L, M, fases) con fases[p] ya invertida para aplicarla con un producto escalar.
+    """
+    divisor = gcd(int(origen), int(destino))
+    subida = int(destino) // divisor
+    bajada = int(origen) // divisor
+    factor = max(subida, bajada)
+    coeficientes = firwin(2 * semiancho * factor + 1, 1.0 / factor, window=('kaiser', beta)) * subida
+    por_fase = -(-len(coeficientes) // subida)
+    relleno = np.zeros(por_fase * subida)
+    relleno[:len(coeficientes)] = coeficientes
+    # fases[p, j] = h[p + j*L]; se invierte j para multiplicar ventanas en orden temporal
+    fases = relleno.reshape(por_fase, subida).T[:, ::-1]
+    fases = np.ascontiguousarray(fases, dtype=np.float32)
+    fases.setflags(write=False)
+    return subida, bajada, fases
+
+
+class Remuestreador:
+    """
+    Front end de audio: mezcla a mono y cambia la frecuencia de muestreo bloque a bloque con un
+    filtro polifásico racional (L/M) cacheado. Guarda el estado entre bloques, así que trocear
+    la señal no cambia el resultado. La salida va retrasada medio filtro (unas pocas muestras).
+    """
+
+    def __init__(self, origen, destino):
+        self.origen = int(origen)
+        self.destino = int(destino)
+        self.directo = self.origen == self.destino
+        if self.directo:
+            self.subida, self.bajada, self.fases = 1, 1, np.ones((1, 1), dtype=np.float32)
+        else:
+            self.subida, self.bajada, self.fases = filtro_polifasico(self.origen, self.destino)
+        por_fase = self.fases.shape[1]
+        self.historia = np.zeros(por_fase - 1, dtype=np.float32)
+        self.leidas = 0
+        self.generadas = 0
+        # Índices de entrada y fases de cada salida: se repiten cada M muestras de entrada, así
+        # que con bloques de tamaño fijo se calculan una vez por (leidas mod M, tamaño del bloque)
+        self._patrones = {}
+
+    @staticmethod
+    def a_mono(bloque):
+        bloque = np.asarray(bloque)
+        if bloque.ndim == 2:
+            if bloque.shape[1] == 1:
+                return bloque[:, 0].astype(np.float32)
+            return bloque.astype(np.float32).mean(axis=1)
+        return bloque.astype(np.float32)
+
+    def procesar(self, bloque):
+        """Devuelve las muestras de salida (float32, misma escala que la entrada) disponibles tras este bloque."""
+        x = self.a_mono(bloque)
+        if self.directo:
+            return x
+        por_fase = self.fases.shape[1]
+        datos = np.concatenate((self.historia, x))
+        total = self.leidas + len(x)
+        # Salida n usa la entrada floor(n*M/L) y las por_fase-1 anteriores
+        fin = (total * self.subida - 1) // self.bajada + 1 if total else 0
+        cantidad = fin - self.generadas
+        # datos[0] corresponde a la entrada absoluta leidas - (por_fase - 1)
+        ventanas = sliding_window_view(datos, por_fase)
+        if cantidad <= 0:
+            salida = np.zeros(0, dtype=np.float32)
+        elif self.subida == 1:
+            # Decimación entera (p. ej. 48 -> 16 kHz): una sola fase, basta una vista con paso M
+            primera = self.generadas * self.bajada - self.leidas
+            salida = ventanas[primera:primera + cantidad * self.bajada:self.bajada] @ self.fases[0]
+        else:
+            relativos, fases = self._patron(len(x))
+            salida = np.einsum('ij,ij->i', ventanas[relativos], fases)
+        self.historia = datos[len(datos) - (por_fase - 1):] if por_fase > 1 else datos[:0]
+        self.leidas = total
+        self.generadas = fin
+        return salida.astype(np.float32, copy=False)
+
+    def _patron(self, n):
+        resto = self.leidas % self.bajada
+        clave = (resto, n)
+        patron = self._patrones.get(clave)
+        if patron is None:
+            # Mismo cálculo que con las posiciones absolutas, desplazado a leidas = resto
+            total = resto + n
+            inicio = -(-resto * self.subida // self.bajada)
+            fin = (total * self.subida - 1) // self.bajada + 1 if total else 0
+            posicion = np.arange(inicio, fin, dtype=np.int64) * self.bajada
+            patron = (posicion // self.subida - resto, np.ascontiguousarray(self.fases[posicion % self.subida]))
+            if len(self._patrones) >= 16:
+                self._patrones.clear()
+            self._patrones[clave] = patron
+        return patron
+
+
+def remuestrear(audio, origen, destino):
+    """Versión de un solo uso para señales completas (mezcla a mono y cambia la frecuencia)."""
+    return Remuestreador(origen, destino).procesar(audio)
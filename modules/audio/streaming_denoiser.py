@@ -0,0 +1,129 @@
+import time
+import numpy as np
+
+
+class ReductorRuidoStreaming:
+    """
+    Reducción de ruido por compuerta espectral que procesa el audio bloque a bloque.
+
+    El perfil de ruido (media + n_std desviaciones en dB por banda) se aprende de los
+    bloques de silencio del flujo del micrófono, se guarda en caché y se refresca cada
+    `intervalo_refresco` segundos. La síntesis usa ventanas raíz de Hann con 50 % de
+    solapamiento, de modo que sin atenuación la señal se reconstruye exactamente.
+    Todo el cálculo se hace en float32 (escala int16).
+    """
+
+    def __init__(self, sample_rate, duracion_ventana=0.032, n_std=1.5, atenuacion=0.1,
+                 suavizado=0.6, intervalo_refresco=5.0, tramas_minimas=10):
+        self.sample_rate = sample_rate
+        self.n_fft = 1 << int(np.ceil(np.log2(duracion_ventana * sample_rate)))
+        self.hop = self.n_fft // 2
+        self.ventana = np.sqrt(np.hanning(self.n_fft + 1)[:-1]).astype(np.float32)
+        self.n_std = n_std
+        self.atenuacion = atenuacion
+        self.suavizado = suavizado
+        self.intervalo_refresco = intervalo_refresco
+        self.tramas_minimas = tramas_minimas
+
+        # Perfil de ruido en caché (None hasta haber visto suficiente silencio)
+        self.umbral_db = None
+        self._umbral_potencia = None
+        self._suma = np.zeros(self.n_fft // 2 + 1, dtype=np.float64)
+        self._suma_cuadrados = np.zeros_like(self._suma)
+        self._tramas_ruido = 0
+        self._ruido_pendiente = np.zeros(0, dtype=np.float32)
+        self._ultimo_refresco = time.monotonic()
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Prepara el estado de síntesis para una nueva frase (el perfil de ruido se conserva)."""
+        self._entrada = np.zeros(self.n_fft - self.hop, dtype=np.float32)
+        # Segunda mitad de la última trama sintetizada, pendiente de sumar a la siguiente
+        self._cola = np.zeros(self.hop, dtype=np.float32)
+        self._mascara_previa = None
+        self._descartar = self.n_fft - self.hop
+        self._muestras_entrada = 0
+        self._muestras_salida = 0
+
+    def _espectro(self, senal):
+        # Con un salto de media ventana cada trama son dos medios saltos consecutivos
+        saltos = len(senal) // self.hop
+        medias = senal[:saltos * self.hop].reshape(saltos, self.hop)
+        tramas = np.concatenate((medias[:-1], medias[1:]), axis=1)
+        return np.fft.rfft(tramas * self.ventana, axis=1)
+
+    def aprender_ruido(self, bloque):
+        """Acumula estadísticas de un bloque sin voz y refresca el perfil cuando toca."""
+        self._ruido_pendiente = np.concatenate((self._ruido_pendiente, np.asarray(bloque, dtype=np.float32)))
+        if len(self._ruido_pendiente) < self.n_fft:
+            return
+        espectro = self._espectro(self._ruido_pendiente)
+        consumidas = len(espectro) * self.hop
+        self._ruido_pendiente = self._ruido_pendiente[consumidas:]
+
+        magnitud_db = 20 * np.log10(np.abs(espectro) + 1e-6)
+        self._suma += magnitud_db.sum(axis=0)
+        self._suma_cuadrados += (magnitud_db.astype(np.float64) ** 2).sum(axis=0)
+        self._tramas_ruido += len(magnitud_db)
+
+        vencido = time.monotonic() - self._ultimo_refresco >= self.intervalo_refresco
+        if self._tramas_ruido >= self.tramas_minimas and (self.umbral_db is None or vencido):
+            self._refrescar_perfil()
+
+    def _refrescar_perfil(self):
+        media = self._suma / self._tramas_ruido
+        varianza = np.maximum(self._suma_cuadrados / self._tramas_ruido - media ** 2, 0)
+        self.umbral_db = (media + self.n_std * np.sqrt(varianza)).astype(np.float32)
+        self._umbral_potencia = (np.maximum(10 ** (self.umbral_db.astype(np.float64) / 20) - 1e-6, 0) ** 2).astype(np.float32)
+        self._suma[:] = 0
+        self._suma_cuadrados[:] = 0
+        self._tramas_ruido = 0
+        self._ultimo_refresco = time.monotonic()
+
+    def _mascara(self, espectro):
+        if self.umbral_db is None:
+            return np.ones(espectro.shape, dtype=np.float32)
+        # Equivale a 20*log10(|X| + 1e-6) > umbral_db sin logaritmos ni raíces por banda
+        potencia = espectro.real ** 2 + espectro.imag ** 2
+        mascara = (potencia > self._umbral_potencia).astype(np.float32)
+        # Suavizar entre bandas vecinas para evitar "ruido musical"
+        mascara[:, 1:-1] = 0.25 * mascara[:, :-2] + 0.5 * mascara[:, 1:-1] + 0.25 * mascara[:, 2:]
+        # Liberación suave en el tiempo
+        for i in range(len(mascara)):
+            if self._mascara_previa is not None:
+                np.maximum(mascara[i], self._mascara_previa * self.suavizado, out=mascara[i])
+            self._mascara_previa = mascara[i]
+        return self.atenuacion + (1.0 - self.atenuacion) * mascara
+
+    def procesar(self, bloque):
+        """Procesa un bloque y devuelve las muestras limpias ya disponibles (float32, escala int16)."""
+        bloque = np.asarray(bloque, dtype=np.float32)
+        self._muestras_entrada += len(bloque)
+        self._entrada = np.concatenate((self._entrada, bloque))
+        if len(self._entrada) < self.n_fft:
+            return np.zeros(0, dtype=np.float32)
+
+        espectro = self._espectro(self._entrada)
+        tramas = np.fft.irfft(espectro * self._mascara(espectro), n=self.n_fft, axis=1).astype(np.float32)
+        tramas *= self.ventana
+        self._entrada = self._entrada[len(tramas) * self.hop:]
+
+        # Solapamiento del 50 %: cada salto de salida es la primera mitad de una trama más la
+        # segunda mitad de la anterior
+        anteriores = np.concatenate((self._cola[None], tramas[:-1, self.hop:]))
+        salida = (tramas[:, :self.hop] + anteriores).ravel()
+        self._cola = tramas[-1, self.hop:].copy()
+
+        if self._descartar:
+            descartadas = min(self._descartar, len(salida))
+            salida = salida[descartadas:]
+            self._descartar -= descartadas
+        self._muestras_salida += len(salida)
+        return salida
+
+    def finalizar(self):
+        """Vacía las muestras retenidas al final de la frase y reinicia el estado de síntesis."""
+        pendientes = self._muestras_entrada - self._muestras_salida
+        cola = self.procesar(np.zeros(self.n_fft, dtype=np.float32))[:pendientes]
+        self.reiniciar()
+        return cola
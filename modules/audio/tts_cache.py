@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class CacheVoz:
+    """
+    Caché en disco del audio sintetizado, direccionada por contenido.
+
+    La clave es un hash de (texto, idioma, motor): cada frase ya dicha con el mismo motor se
+    guarda una sola vez como `<hash>.<extension>` en `directorio` y la siguiente vez se lee del
+    disco sin llamar a la red. El directorio tiene un tamaño máximo en bytes; al superarlo se
+    borran los archivos usados hace más tiempo. El orden de uso es la fecha de modificación, que
+    se actualiza en cada acierto, así que se conserva entre reinicios.
+
+    Es segura entre hilos: las escrituras van a un archivo temporal que se renombra al final y
+    dos hilos que piden a la vez la misma frase nueva la sintetizan una sola vez.
+    """
+
+    def __init__(self, directorio="tts_cache", capacidad_mb=100, extension="mp3"):
+        self.directorio = directorio
+        self.capacidad = int(capacidad_mb * 1024 * 1024)
+        self.extension = extension
+        self.lock = threading.Lock()
+        self.en_curso = {}
+        self.entradas = OrderedDict()  # hash -> tamaño en bytes, del menos al más usado
+        self.ocupado = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        os.makedirs(directorio, exist_ok=True)
+        self._cargar_indice()
+
+    def _cargar_indice(self):
+        archivos = []
+        for nombre in os.listdir(self.directorio):
+            clave, extension = os.path.splitext(nombre)
+            if extension != f".{self.extension}":
+                continue
+            try:
+                estado = os.stat(os.path.join(self.directorio, nombre))
+            except OSError:
+                continue
+            archivos.append((estado.st_mtime, clave, estado.st_size))
+        for _, clave, tamano in sorted(archivos):
+            self.entradas[clave] = tamano
+            self.ocupado += tamano
+        with self.lock:
+            self._expulsar()
+
+    @staticmethod
+    def clave(texto, idioma, motor):
+        datos = json.dumps([texto, idioma, motor], ensure_ascii=False)
+        return hashlib.sha256(datos.encode("utf-8")).hexdigest()
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f"{clave}.{self.extension}")
+
+    def contiene(self, texto, idioma, motor):
+        with self.lock:
+            return self.clave(texto, idioma, motor) in self.entradas
+
+    def obtener(self, texto, idioma, motor, sintetizar=None):
+        """
+        Devuelve los bytes del audio de `texto` o None si no está. Con `sintetizar` (una función
+        sin argumentos que devuelve los bytes) lo genera y lo guarda cuando falta.
+        """
+        clave = self.clave(texto, idioma, motor)
+        while True:
+            with self.lock:
+                if clave in self.entradas:
+                    datos = self._leer(clave)
+                    if datos is not None:
+                        self.aciertos += 1
+                        return datos
+                if sintetizar is None:
+                    self.fallos += 1
+                    return None
+                evento = self.en_curso.get(clave)
+                if evento is None:
+                    self.en_curso[clave] = threading.Event()
+                    self.fallos += 1
+                    break
+            # Otro hilo está sintetizando la misma frase: se espera a que la guarde
+            evento.wait()
+        try:
+            datos = sintetizar()
+            self.guardar(clave, datos)
+            return datos
+        finally:
+            with self.lock:
+                self.en_curso.pop(clave).set()
+
+    def _leer(self, clave):
+        # Llamar con el lock tomado
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, "rb") as archivo:
+                datos = archivo.read()
+            os.utime(ruta)
+        except OSError:
+            self.ocupado -= self.entradas.pop(clave)
+            return None
+        self.entradas.move_to_end(clave)
+        return datos
+
+    def guardar(self, clave, datos):
+        if not datos or len(datos) > self.capacidad:
+            return
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as archivo:
+                archivo.write(datos)
+            os.replace(temporal, self._ruta(clave))
+        except OSError as e:
+            print(f"Caché de voz: no se pudo guardar el audio ({e})")
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            return
+        with self.lock:
+            self.ocupado += len(datos) - self.entradas.pop(clave, 0)
+            self.entradas[clave] = len(datos)
+            self._expulsar()
+
+    def _expulsar(self):
+        # Llamar con el lock tomado
+        while self.ocupado > self.capacidad and self.entradas:
+            clave, tamano = self.entradas.popitem(last=False)
+            self.ocupado -= tamano
+            self.expulsiones += 1
+            try:
+                os.remove(self._ruta(clave))
+            except OSError as e:
+                print(f"Caché de voz: no se pudo borrar {clave} ({e})")
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def metricas(self):
+        with self.lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / consultas, 3) if consultas else 0.0,
+                "entradas": len(self.entradas),
+                "mb": round(self.ocupado / (1024 * 1024), 2),
+                "expulsiones": self.expulsiones,
+            }
@@ -0,0 +1,74 @@
+from functools import lru_cache
+import numpy as np
+
+
+@lru_cache(maxsize=8)
+def ventana_hann(n):
+    ventana = np.hanning(n).astype(np.float32)
+    ventana.setflags(write=False)
+    return ventana
+
+
+class DetectorActividadVoz:
+    """
+    Detector de actividad de voz por bloques.
+
+    Un bloque cuenta como voz si supera el umbral de energía y además tiene pocos cruces
+    por cero y un espectro poco plano (la música de fondo y el ruido blanco suelen fallar
+    alguna de las dos). El inicio exige `duracion_inicio` segundos seguidos de voz y el
+    final llega tras `hangover` segundos sin voz, así la frase se entrega en cuanto el
+    hablante se calla en lugar de esperar al límite de duración.
+    """
+
+    def __init__(self, sample_rate, hangover=0.25, duracion_inicio=0.06, max_cruces_por_segundo=5000, max_planitud=0.45):
+        self.sample_rate = sample_rate
+        self.muestras_hangover = int(hangover * sample_rate)
+        self.muestras_inicio = int(duracion_inicio * sample_rate)
+        self.max_cruces_por_segundo = max_cruces_por_segundo
+        self.max_planitud = max_planitud
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.en_voz = False
+        self.voz_seguida = 0
+        self.silencio_seguido = 0
+
+    def caracteristicas(self, bloque):
+        """Devuelve (rms, cruces por segundo, planitud espectral) del bloque en una sola pasada vectorizada."""
+        x = np.asarray(bloque, dtype=np.float32)
+        if len(x) < 2:
+            return 0.0, 0.0, 1.0
+        rms = float(np.sqrt(np.mean(x * x)))
+        cruces = np.count_nonzero(np.signbit(x[1:]) != np.signbit(x[:-1]))
+        cruces_por_segundo = cruces * self.sample_rate / len(x)
+        espectro = np.fft.rfft(x * ventana_hann(len(x)))
+        potencia = espectro.real ** 2 + espectro.imag ** 2 + 1e-10
+        planitud = float(np.exp(np.mean(np.log(potencia))) / np.mean(potencia))
+        return rms, cruces_por_segundo, planitud
+
+    def es_voz(self, bloque, umbral_energia):
+        rms, cruces_por_segundo, planitud = self.caracteristicas(bloque)
+        return (rms > umbral_energia
+                and cruces_por_segundo < self.max_cruces_por_segundo
+                and planitud < self.max_planitud)
+
+    def procesar(self, bloque, umbral_energia):
+        """
+        Actualiza el estado con un bloque y devuelve 'inicio', 'fin' o None.
+        También devuelve si el bloque se clasificó como voz.
+        """
+        voz = self.es_voz(bloque, umbral_energia)
+        if voz:
+            self.voz_seguida += len(bloque)
+            self.silencio_seguido = 0
+        else:
+            self.voz_seguida = 0
+            self.silencio_seguido += len(bloque)
+
+        if not self.en_voz and self.voz_seguida >= self.muestras_inicio:
+            self.en_voz = True
+            return 'inicio', voz
+        if self.en_voz and self.silencio_seguido >= self.muestras_hangover:
+            self.en_voz = False
+            return 'fin', voz
+        return None, voz
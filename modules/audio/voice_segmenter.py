@@ -0,0 +1,112 @@
+import time
+import numpy as np
+import speech_recognition as sr
+from modules.audio.streaming_denoiser import ReductorRuidoStreaming
+from modules.audio.vad import DetectorActividadVoz
+from utils.audio_utils import a_pcm16, energia_rms
+
+
+class SegmentadorVoz:
+    """
+    Separa frases del flujo continuo del micrófono sin reabrir ni recalibrar el dispositivo.
+    El detector de actividad de voz marca el inicio y el final de cada frase (con un
+    `hangover` corto), y el umbral de energía se consulta al rastreador de ruido en cada
+    bloque, así los cambios se aplican al instante. A su vez, los bloques que el detector
+    no considera voz actualizan el ruido de fondo del rastreador.
+    Con `reduccion_ruido` activa, los bloques de silencio alimentan el perfil de ruido y los de la
+    frase se limpian a medida que llegan, de modo que al terminar la frase ya está procesada.
+    Cada frase incluye `pre_roll` segundos de audio anteriores al inicio detectado (sin solaparse
+    con la frase anterior), para no cortar la primera sílaba del nombre del asistente.
+    """
+
+    def __init__(self, microfono, rastreador_ruido, hangover=0.25, phrase_time_limit=5, pre_roll=0.5,
+                 reduccion_ruido=True):
+        self.microfono = microfono
+        self.rastreador_ruido = rastreador_ruido
+        self.hangover = hangover
+        self.phrase_time_limit = phrase_time_limit
+        self.pre_roll = pre_roll
+        self.fin_ultima_frase = 0
+        self.reduccion_ruido = reduccion_ruido
+        self.reductor = None
+        self.vad = None
+
+    def _preparar(self):
+        # La frecuencia de muestreo solo se conoce una vez abierto el micrófono
+        if self.vad is None:
+            self.vad = DetectorActividadVoz(self.microfono.sample_rate, hangover=self.hangover)
+        if self.reduccion_ruido and self.reductor is None:
+            self.reductor = ReductorRuidoStreaming(self.microfono.sample_rate)
+
+    def escuchar_frase(self, timeout=None, al_bloque=None):
+        """
+        Espera a que empiece una frase y la devuelve como `sr.AudioData` cuando termina.
+        Lanza `sr.WaitTimeoutError` si no empieza ninguna frase antes de `timeout` segundos.
+        Si se pasa `al_bloque`, se llama con cada tramo de la frase (ya limpio) a medida que
+        llega, para alimentar un reconocimiento incremental.
+        """
+        self._preparar()
+        sample_rate = self.microfono.sample_rate
+        vad = self.vad
+        reductor = self.reductor
+        procesado = []
+        muestras_previas = int(self.pre_roll * sample_rate)
+        muestras_maximas = int(self.phrase_time_limit * sample_rate) if self.phrase_time_limit else None
+
+        vad.reiniciar()
+        inicio_espera = time.monotonic()
+        inicio_frase = None
+        fin_frase = None
+
+        try:
+            for posicion, bloque in self.microfono.bloques():
+                fin_bloque = posicion + len(bloque)
+                evento, voz = vad.procesar(bloque, self.rastreador_ruido.umbral_actual())
+                self.rastreador_ruido.actualizar(energia_rms(bloque), len(bloque) / sample_rate, voz)
+
+                if inicio_frase is None:
+                    if evento == 'inicio':
+                        # La voz empezó con el primer bloque de la racha que confirmó el inicio
+                        inicio_frase = max(fin_bloque - vad.voz_seguida - muestras_previas, self.fin_ultima_frase)
+                        tramo = self.microfono.leer(inicio_frase, fin_bloque)
+                        if reductor:
+                            tramo = reductor.procesar(tramo)
+                            procesado.append(tramo)
+                        if al_bloque:
+                            al_bloque(tramo)
+                        continue
+                    if reductor and not voz:
+                        reductor.aprender_ruido(bloque)
+                    if timeout and time.monotonic() - inicio_espera > timeout:
+                        raise sr.WaitTimeoutError("Tiempo de espera agotado sin detectar voz")
+                    continue
+
+                tramo = bloque
+                if reductor:
+                    tramo = reductor.procesar(bloque)
+                    procesado.append(tramo)
+                if al_bloque:
+                    al_bloque(tramo)
+                if evento == 'fin':
+                    fin_frase = fin_bloque
+                    break
+                if muestras_maximas and fin_bloque - inicio_frase >= muestras_maximas:
+                    fin_frase = fin_bloque
+                    break
+        finally:
+            if reductor and fin_frase is None:
+                reductor.reiniciar()
+
+        if inicio_frase is None or fin_frase is None:
+            raise sr.WaitTimeoutError("El micrófono se cerró mientras se escuchaba")
+        self.fin_ultima_frase = fin_frase
+
+        if reductor:
+            cola = reductor.finalizar()
+            procesado.append(cola)
+            if al_bloque:
+                al_bloque(cola)
+            muestras = np.concatenate(procesado)
+        else:
+            muestras = self.microfono.leer(inicio_frase, fin_frase)
+        return sr.AudioData(a_pcm16(muestras), sample_rate, 2)
@@ -1095,6 +1095,9 @@ class Avatar3D:
     def _handle_mouse_release(self, event):
         """Manejar liberación del mouse"""
         if event.button == 1:  # Click izquierdo
+            if self.slider_dragging and self.app_instance:
+                # Guardar el umbral al soltar el slider
+                self.app_instance.on_threshold_change()
             self.slider_dragging = False
     
     def _handle_mouse_motion(self, event):
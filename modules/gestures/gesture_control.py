@@ -66,7 +66,7 @@ class ControlGestual:
                         if current_time - self.ultimo_gesto_time > self.cooldown_global:
                             print(f"Gesto detectado: {gesto_detectado}")
                             self.gesto_en_ejecucion = True  # Establecer bandera para ejecutar
-                            threading.Thread(target=self.ejecutar_gesto, args=(gesto_detectado,)).start()
+                            self.enviar_gesto(gesto_detectado)
                             self.ultimo_gesto_time = current_time
                             self.gesto_actual = None
                             self.frames_gesto = 0
@@ -285,6 +285,19 @@ class ControlGestual:
         return (pulgar[1] > indice[1] and pulgar[1] > medio[1] and pulgar[1] > anular[1]
                 and pulgar[1] > meñique[1])
 
+    def enviar_gesto(self, gesto_detectado):
+        """Las acciones de los gestos son controles de reproducción: van al ejecutor con prioridad de control."""
+        ejecutor = getattr(self.espotify, 'ejecutor', None)
+        if ejecutor is None:
+            threading.Thread(target=self.ejecutar_gesto, args=(gesto_detectado,), daemon=True).start()
+            return
+        tarea = ejecutor.enviar(self.ejecutar_gesto, gesto_detectado, nombre=f"gesto {gesto_detectado}", prioridad="control")
+        if tarea is None:
+            self.gesto_en_ejecucion = False
+        else:
+            # Si la tarea se descarta sin ejecutarse (plazo vencido, cierre) la bandera también se libera
+            tarea.futuro.add_done_callback(lambda futuro: setattr(self, 'gesto_en_ejecucion', False))
+
     def ejecutar_gesto(self, gesto_detectado):
         try:
             if gesto_detectado in self.gestos_acciones:
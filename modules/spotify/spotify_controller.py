@@ -1,3 +1,4 @@
+import asyncio
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 import os
@@ -315,47 +316,8 @@ class SpotifyController:
             responder_con_audio_callback("Ocurrió un error al ajustar el volumen.")
 
     def buscar_y_reproducir_cancion(self, cancion, responder_con_audio_callback=None):
-        # Asegurarse de que tenemos una función de callback válida
-        if responder_con_audio_callback is None:
-            responder_con_audio_callback = self.audio_manager.responder_con_audio
-            
-        if not cancion.strip():
-            responder_con_audio_callback("La consulta de búsqueda está vacía.")
-            return
-        dispositivos = self.sp.devices()
-        if len(dispositivos['devices']) == 1:
-            device_id = dispositivos['devices'][0]['id']
-            try:
-                results = self.sp.search(q=cancion, type="track", limit=1)
-                if results["tracks"]["items"]:
-                    track_uri = results["tracks"]["items"][0]["uri"]
-                    self.sp.start_playback(device_id=device_id, uris=[track_uri])
-                    nombre_cancion = results["tracks"]["items"][0]["name"]
-                    responder_con_audio_callback(f"Reproduciendo {nombre_cancion}")
-                else:
-                    responder_con_audio_callback("No se encontraron resultados para tu búsqueda.")
-            except spotipy.SpotifyException as e:
-                responder_con_audio_callback("Ocurrió un error al buscar la canción.")
-                print(f"Error al buscar la canción {cancion}: {e}")
-        elif len(dispositivos['devices']) > 1:
-            device_id = self.obtener_device_id_activo()
-            if not device_id:
-                responder_con_audio_callback("No se encontró un dispositivo activo.")
-                return
-            try:
-                results = self.sp.search(q=cancion, type="track", limit=1)
-                if results["tracks"]["items"]:
-                    track_uri = results["tracks"]["items"][0]["uri"]
-                    self.sp.start_playback(device_id=device_id, uris=[track_uri])
-                    nombre_cancion = results["tracks"]["items"][0]["name"]
-                    responder_con_audio_callback(f"Reproduciendo {nombre_cancion}")
-                else:
-                    responder_con_audio_callback("No se encontraron resultados para tu búsqueda.")
-            except spotipy.SpotifyException as e:
-                responder_con_audio_callback("Ocurrió un error al buscar la canción.")
-                print(f"Error al buscar la canción {cancion}: {e}")
-        else:
-            responder_con_audio_callback("No se encontraron dispositivos disponibles para reproducir.")
+        """Versión síncrona de buscar_y_reproducir_cancion_async, para llamarla fuera del bucle asyncio."""
+        asyncio.run(self.buscar_y_reproducir_cancion_async(cancion, responder_con_audio_callback))
 
     # Los métodos intermedios se mantienen iguales...
 
@@ -425,43 +387,69 @@ class SpotifyController:
             print(f"Error al configurar modo de repetición: {e}")
             responder_con_audio_callback("Ocurrió un error al configurar el modo de repetición.")
 
-    def reproducir_album(self, album_nombre=None):
+    def reproducir_album(self, album_nombre=None, responder_con_audio_callback=None):
+        """Versión síncrona de reproducir_album_async, para llamarla fuera del bucle asyncio."""
+        asyncio.run(self.reproducir_album_async(album_nombre, responder_con_audio_callback))
+
+    @staticmethod
+    def dispositivo_para_reproducir(dispositivos):
+        """Con un solo dispositivo, ese; con varios, el activo; sin dispositivos, None."""
+        lista = dispositivos.get('devices', [])
+        if len(lista) == 1:
+            return lista[0]['id']
+        return next((dispositivo['id'] for dispositivo in lista if dispositivo['is_active']), None)
+
+    async def buscar_y_reproducir_cancion_async(self, cancion, responder_con_audio_callback=None):
+        """Busca la canción y la reproduce; pide los dispositivos y hace la búsqueda a la vez."""
+        responder = responder_con_audio_callback or self.audio_manager.responder_con_audio
+        if not cancion.strip():
+            await asyncio.to_thread(responder, "La consulta de búsqueda está vacía.")
+            return
         try:
-            if not album_nombre and hasattr(self, 'last_command'):
-                # Try to extract album name from last command
-                comando = self.last_command
-                if "reproducir álbum" in comando or "reproducir album" in comando:
-                    album_nombre = comando.replace("reproducir álbum", "", 1).replace("reproducir album", "", 1).strip()
-            
-            if not album_nombre:
-                self.audio_manager.responder_con_audio("Por favor, especifica qué álbum quieres reproducir.")
-                return
-                
-            # Search for the album
-            results = self.sp.search(q=f"album:{album_nombre}", type="album", limit=1)
-            
+            dispositivos, results = await asyncio.gather(
+                asyncio.to_thread(self.sp.devices),
+                asyncio.to_thread(self.sp.search, q=cancion, type="track", limit=1))
+            if not dispositivos['devices']:
+                mensaje = "No se encontraron dispositivos disponibles para reproducir."
+            elif not results["tracks"]["items"]:
+                mensaje = "No se encontraron resultados para tu búsqueda."
+            else:
+                device_id = self.dispositivo_para_reproducir(dispositivos)
+                if not device_id:
+                    mensaje = "No se encontró un dispositivo activo."
+                else:
+                    track = results["tracks"]["items"][0]
+                    await asyncio.to_thread(self.sp.start_playback, device_id=device_id, uris=[track["uri"]])
+                    mensaje = f"Reproduciendo {track['name']}"
+        except spotipy.SpotifyException as e:
+            print(f"Error al buscar la canción {cancion}: {e}")
+            mensaje = "Ocurrió un error al buscar la canción."
+        await asyncio.to_thread(responder, mensaje)
+
+    async def reproducir_album_async(self, album_nombre, responder_con_audio_callback=None):
+        """Busca el álbum y lo reproduce; pide los dispositivos y hace la búsqueda a la vez."""
+        responder = responder_con_audio_callback or self.audio_manager.responder_con_audio
+        if not album_nombre:
+            await asyncio.to_thread(responder, "Por favor, especifica qué álbum quieres reproducir.")
+            return
+        try:
+            dispositivos, results = await asyncio.gather(
+                asyncio.to_thread(self.sp.devices),
+                asyncio.to_thread(self.sp.search, q=f"album:{album_nombre}", type="album", limit=1))
             if not results['albums']['items']:
-                self.audio_manager.responder_con_audio(f"No encontré ningún álbum con el nombre {album_nombre}.")
-                return
-                
-            album_id = results['albums']['items'][0]['id']
-            album_uri = f"spotify:album:{album_id}"
-            
-            # Get active device
-            device_id = self.obtener_device_id_activo()
-            if not device_id:
-                self.audio_manager.responder_con_audio("No se encontró un dispositivo activo para reproducir.")
-                return
-                
-            # Play the album
-            self.sp.start_playback(device_id=device_id, context_uri=album_uri)
-            album_name = results['albums']['items'][0]['name']
-            artist_name = results['albums']['items'][0]['artists'][0]['name']
-            self.audio_manager.responder_con_audio(f"Reproduciendo el álbum {album_name} de {artist_name}.")
-            
+                mensaje = f"No encontré ningún álbum con el nombre {album_nombre}."
+            else:
+                device_id = self.dispositivo_para_reproducir(dispositivos)
+                if not device_id:
+                    mensaje = "No se encontró un dispositivo activo para reproducir."
+                else:
+                    album = results['albums']['items'][0]
+                    await asyncio.to_thread(self.sp.start_playback, device_id=device_id, context_uri=f"spotify:album:{album['id']}")
+                    mensaje = f"Reproduciendo el álbum {album['name']} de {album['artists'][0]['name']}."
         except Exception as e:
             print(f"Error al reproducir álbum: {e}")
-            self.audio_manager.responder_con_audio("Ocurrió un error al intentar reproducir el álbum.")
+            mensaje = "Ocurrió un error al intentar reproducir el álbum."
+        await asyncio.to_thread(responder, mensaje)
 
     def cambiar_aleatorio(self, responder_con_audio_callback=None):
         # Asegurarse de que tenemos una función de callback válida
@@ -0,0 +1,374 @@
+import importlib.util
+import json
+from abc import ABC, abstractmethod
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import speech_recognition as sr
+
+
+class BackendSTT(ABC):
+    """
+    Interfaz común de los motores de reconocimiento de voz.
+    `reconocer` recibe un `sr.AudioData` y devuelve el texto, o lanza
+    `sr.UnknownValueError` (no se entendió nada) / `sr.RequestError` (el motor falló).
+    Los motores con `soporta_parciales` también pueden abrir un flujo incremental con
+    `iniciar_flujo`, que va devolviendo hipótesis parciales mientras se habla.
+    """
+    nombre = "base"
+    soporta_parciales = False
+
+    def disponible(self):
+        return True
+
+    def iniciar(self):
+        """Prepara el motor antes de la primera frase; los que no cargan nada no hacen nada."""
+        pass
+
+    @abstractmethod
+    def reconocer(self, audio):
+        pass
+
+    def iniciar_flujo(self, sample_rate, al_parcial=None):
+        raise sr.RequestError(f"El motor {self.nombre} no ofrece reconocimiento incremental")
+
+    def cerrar(self):
+        pass
+
+
+class GoogleSTT(BackendSTT):
+    """Reconocimiento en la nube con la API web de Google (el comportamiento original)."""
+    nombre = "google"
+
+    def __init__(self, recognizer, idioma="es-ES", timeout=4.0):
+        self.recognizer = recognizer
+        self.idioma = idioma
+        # Sin límite, una red lenta bloquea el bucle de escucha indefinidamente
+        self.recognizer.operation_timeout = timeout
+
+    def reconocer(self, audio):
+        return self.recognizer.recognize_google(audio, language=self.idioma)
+
+
+def _trabajador_vosk(ruta_modelo, entrada, salida):
+    """
+    Proceso hijo: carga el modelo una vez y atiende peticiones (id, tipo, datos) hasta recibir None.
+    Tipos: "frase" (pcm, sample_rate) reconoce una frase completa; "inicio" (sample_rate),
+    "bloque" (pcm), "fin" y "cancelar" gestionan un flujo incremental que responde con
+    resultados "parcial" por cada bloque y "ok" con el texto final.
+    """
+    from vosk import Model, KaldiRecognizer, SetLogLevel
+    SetLogLevel(-1)
+    modelo = Model(ruta_modelo)
+    salida.put((None, "listo", None))
+    flujos = {}
+    while True:
+        peticion = entrada.get()
+        if peticion is None:
+            break
+        ident, tipo, datos = peticion
+        try:
+            if tipo == "frase":
+                pcm, sample_rate = datos
+                reconocedor = KaldiRecognizer(modelo, sample_rate)
+                reconocedor.AcceptWaveform(pcm)
+                salida.put((ident, "ok", json.loads(reconocedor.FinalResult()).get("text", "")))
+            elif tipo == "inicio":
+                flujos[ident] = [KaldiRecognizer(modelo, datos), ""]
+            elif tipo == "bloque":
+                if ident not in flujos:
+                    continue
+                reconocedor, acumulado = flujos[ident]
+                if reconocedor.AcceptWaveform(datos):
+                    # Vosk cerró un segmento interno; el texto se acumula hasta el final de la frase
+                    acumulado = f"{acumulado} {json.loads(reconocedor.Result()).get('text', '')}".strip()
+                    flujos[ident][1] = acumulado
+                    parcial = ""
+                else:
+                    parcial = json.loads(reconocedor.PartialResult()).get("partial", "")
+                salida.put((ident, "parcial", f"{acumulado} {parcial}".strip()))
+            elif tipo == "fin":
+                reconocedor, acumulado = flujos.pop(ident)
+                final = json.loads(reconocedor.FinalResult()).get("text", "")
+                salida.put((ident, "ok", f"{acumulado} {final}".strip()))
+            elif tipo == "cancelar":
+                flujos.pop(ident, None)
+        except Exception as e:
+            flujos.pop(ident, None)
+            salida.put((ident, "error", str(e)))
+
+
+class FlujoSTT:
+    """
+    Sesión de reconocimiento incremental de una frase.
+    `aceptar` envía bloques PCM de 16 bits sin esperar respuesta; las hipótesis parciales
+    llegan a `al_parcial` desde el hilo lector del motor. `finalizar` devuelve el texto
+    definitivo y `cancelar` descarta la sesión.
+    """
+
+    def __init__(self, backend, ident, al_parcial=None):
+        self.backend = backend
+        self.motor = backend.nombre
+        self.ident = ident
+        self.al_parcial = al_parcial
+        self.parcial = ""
+        self.abierto = True
+
+    def aceptar(self, pcm):
+        if self.abierto:
+            self.backend._enviar(self.ident, "bloque", pcm)
+
+    def _recibir_parcial(self, texto):
+        # Llega una hipótesis por bloque de audio, también si no cambió: repetirla es lo que
+        # indica que es estable (DespachoAnticipado mide cuánto tiempo se mantiene igual)
+        if not self.abierto:
+            return
+        self.parcial = texto
+        if self.al_parcial:
+            try:
+                self.al_parcial(texto)
+            except Exception as e:
+                print(f"Error al procesar un resultado parcial: {e}")
+
+    def finalizar(self):
+        self.abierto = False
+        return self.backend._finalizar_flujo(self.ident)
+
+    def cancelar(self):
+        if self.abierto:
+            self.abierto = False
+            self.backend._cancelar_flujo(self.ident)
+
+
+class VoskSTT(BackendSTT):
+    """
+    Reconocimiento local en CPU con Vosk. El modelo vive en un proceso aparte para que
+    la decodificación no compita por el GIL con el avatar y el control gestual.
+    Cada petición lleva un identificador y un hilo lector reparte las respuestas, así
+    pueden convivir un flujo incremental abierto y el reconocimiento de la frase anterior.
+    """
+    nombre = "vosk"
+    soporta_parciales = True
+
+    def __init__(self, ruta_modelo, timeout=10.0):
+        self.ruta_modelo = ruta_modelo
+        self.timeout = timeout
+        self.proceso = None
+        self.entrada = None
+        self.salida = None
+        self.listo = threading.Event()
+        self.lock = threading.Lock()
+        self.pendientes = {}
+        self.flujos = {}
+        self.siguiente_id = 0
+
+    def disponible(self):
+        return importlib.util.find_spec("vosk") is not None and os.path.isdir(self.ruta_modelo)
+
+    def iniciar(self):
+        """Arranca el proceso de trabajo; el modelo se carga en segundo plano."""
+        with self.lock:
+            if self.proceso is not None and self.proceso.is_alive():
+                return
+            contexto = multiprocessing.get_context("spawn")
+            self.entrada = contexto.Queue()
+            self.salida = contexto.Queue()
+            self.listo.clear()
+            self.proceso = contexto.Process(target=_trabajador_vosk, args=(self.ruta_modelo, self.entrada, self.salida), daemon=True)
+            self.proceso.start()
+            threading.Thread(target=self._leer_respuestas, args=(self.proceso, self.salida), daemon=True).start()
+            print(f"Motor Vosk iniciándose con el modelo {self.ruta_modelo}")
+
+    def _leer_respuestas(self, proceso, salida):
+        """Hilo lector: entrega cada respuesta del proceso a quien la espera."""
+        while proceso.is_alive() or not salida.empty():
+            try:
+                ident, estado, resultado = salida.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            if estado == "listo":
+                self.listo.set()
+            elif estado == "parcial":
+                flujo = self.flujos.get(ident)
+                if flujo is not None:
+                    flujo._recibir_parcial(resultado)
+            else:
+                respuesta = self.pendientes.get(ident)
+                if respuesta is not None:
+                    respuesta.put((estado, resultado))
+
+    def _nuevo_id(self):
+        with self.lock:
+            self.siguiente_id += 1
+            return self.siguiente_id
+
+    def _preparar(self):
+        if not self.disponible():
+            raise sr.RequestError("Vosk no está instalado o el modelo no existe")
+        self.iniciar()
+        limite = time.monotonic() + 60
+        while not self.listo.wait(0.5):
+            if not self.proceso.is_alive() or time.monotonic() > limite:
+                raise sr.RequestError("El modelo de Vosk no terminó de cargar")
+
+    def _enviar(self, ident, tipo, datos=None):
+        try:
+            self.entrada.put((ident, tipo, datos))
+        except Exception as e:
+            raise sr.RequestError(f"No se pudo enviar la petición a Vosk: {e}")
+
+    def _esperar_resultado(self, ident, tipo, datos=None):
+        respuesta = queue.Queue()
+        self.pendientes[ident] = respuesta
+        try:
+            self._enviar(ident, tipo, datos)
+            estado, resultado = respuesta.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sr.RequestError("El proceso de Vosk no respondió a tiempo")
+        finally:
+            self.pendientes.pop(ident, None)
+        if estado != "ok":
+            raise sr.RequestError(f"Error en Vosk: {resultado}")
+        if not resultado.strip():
+            raise sr.UnknownValueError()
+        return resultado
+
+    def reconocer(self, audio):
+        self._preparar()
+        return self._esperar_resultado(self._nuevo_id(), "frase", (audio.get_raw_data(convert_width=2), audio.sample_rate))
+
+    def iniciar_flujo(self, sample_rate, al_parcial=None):
+        self._preparar()
+        flujo = FlujoSTT(self, self._nuevo_id(), al_parcial)
+        self.flujos[flujo.ident] = flujo
+        self._enviar(flujo.ident, "inicio", sample_rate)
+        return flujo
+
+    def _finalizar_flujo(self, ident):
+        self.flujos.pop(ident, None)
+        return self._esperar_resultado(ident, "fin")
+
+    def _cancelar_flujo(self, ident):
+        self.flujos.pop(ident, None)
+        try:
+            self._enviar(ident, "cancelar")
+        except sr.RequestError:
+            pass
+
+    def cerrar(self):
+        with self.lock:
+            if self.proceso is not None and self.proceso.is_alive():
+                self.entrada.put(None)
+                self.proceso.join(timeout=2)
+                if self.proceso.is_alive():
+                    self.proceso.terminate()
+            self.proceso = None
+            self.flujos.clear()
+
+
+class SelectorSTT:
+    """
+    Elige el motor de reconocimiento según la configuración ("google", "vosk" o "auto").
+    En modo "auto" usa Google mientras la red responda y cae al motor local cuando no
+    hay conexión, la petición falla o tarda más de `latencia_maxima` segundos; tras un
+    fallo evita la nube durante `penalizacion` segundos y avisa a `al_fallar_nube`, que
+    puede volver a comprobar la conexión.
+    """
+
+    def __init__(self, backends, preferido="auto", respaldo="vosk", hay_internet=None, latencia_maxima=2.5, penalizacion=30.0,
+                 al_fallar_nube=None):
+        self.backends = backends
+        self.preferido = preferido
+        self.respaldo = respaldo
+        self.hay_internet = hay_internet or (lambda: True)
+        self.al_fallar_nube = al_fallar_nube
+        self.latencia_maxima = latencia_maxima
+        self.penalizacion = penalizacion
+        self.nube_penalizada_hasta = 0.0
+
+    def _orden(self):
+        if self.preferido != "auto":
+            return [self.preferido]
+        nube_ok = self.hay_internet() and time.monotonic() >= self.nube_penalizada_hasta
+        orden = ["google", self.respaldo] if nube_ok else [self.respaldo, "google"]
+        return [nombre for nombre in orden if nombre in self.backends and self.backends[nombre].disponible()]
+
+    def iniciar(self):
+        """Precarga el motor local si puede llegar a usarse."""
+        respaldo = self.backends.get(self.respaldo)
+        if respaldo and self.preferido in ("auto", self.respaldo) and respaldo.disponible():
+            respaldo.iniciar()
+
+    def iniciar_flujo(self, sample_rate, al_parcial=None):
+        """
+        Abre un flujo incremental con el primer motor utilizable que dé resultados parciales,
+        o devuelve None si ninguno los da. En modo "auto" el flujo local sirve para adelantar
+        comandos aunque la transcripción final acabe viniendo de la nube.
+        """
+        for nombre in self._orden():
+            backend = self.backends[nombre]
+            if not backend.soporta_parciales:
+                continue
+            try:
+                return backend.iniciar_flujo(sample_rate, al_parcial)
+            except sr.RequestError as e:
+                print(f"No se pudo abrir el reconocimiento incremental con {nombre}: {e}")
+        return None
+
+    def reconocer(self, audio, flujo=None):
+        """
+        Devuelve (texto, nombre_del_motor). Si se pasa el flujo incremental de la frase y su
+        motor es el elegido, el texto final se toma de ese flujo en lugar de reenviar el audio.
+        """
+        try:
+            return self._reconocer(audio, flujo)
+        finally:
+            if flujo is not None:
+                flujo.cancelar()
+
+    def _reconocer(self, audio, flujo):
+        orden = self._orden()
+        if not orden:
+            raise sr.RequestError("No hay ningún motor de reconocimiento disponible")
+        ultimo_error = None
+        for nombre in orden:
+            inicio = time.monotonic()
+            try:
+                if flujo is not None and flujo.abierto and flujo.motor == nombre:
+                    texto = flujo.finalizar()
+                else:
+                    texto = self.backends[nombre].reconocer(audio)
+            except sr.RequestError as e:
+                print(f"Fallo del motor {nombre}: {e}")
+                ultimo_error = e
+                if nombre == "google":
+                    self.nube_penalizada_hasta = time.monotonic() + self.penalizacion
+                    if self.al_fallar_nube:
+                        self.al_fallar_nube()
+                continue
+            if nombre == "google" and time.monotonic() - inicio > self.latencia_maxima:
+                print("La red está lenta; se usará el motor local durante un tiempo.")
+                self.nube_penalizada_hasta = time.monotonic() + self.penalizacion
+            return texto, nombre
+        raise ultimo_error
+
+    def cerrar(self):
+        for backend in self.backends.values():
+            backend.cerrar()
+
+
+def crear_selector_stt(config, recognizer, hay_internet=None, al_fallar_nube=None):
+    """Construye el selector de motores a partir de la configuración de la aplicación."""
+    return SelectorSTT(
+        {
+            "google": GoogleSTT(recognizer, idioma="es-ES"),
+            "vosk": VoskSTT(config.get("vosk_model_path", "modelos/vosk-model-small-es-0.42")),
+        },
+        preferido=config.get("stt_backend", "auto"),
+        hay_internet=hay_internet,
+        al_fallar_nube=al_fallar_nube
+    )
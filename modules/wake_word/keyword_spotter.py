@@ -0,0 +1,170 @@
+import glob
+import os
+import re
+import threading
+import time
+import numpy as np
+import librosa
+from scipy.spatial.distance import cdist
+import soundfile as sf
+import unidecode
+
+
+class DetectorAcustico:
+    """
+    Detector local del nombre del asistente sobre el audio, antes de cualquier reconocimiento.
+
+    Compara los MFCC de cada frase con los de unas pocas grabaciones del nombre (plantillas)
+    mediante DTW de subsecuencia, así que el nombre puede estar en cualquier parte de la frase.
+    El coste se normaliza por la longitud de la plantilla: por debajo de `umbral` la frase
+    contiene el nombre. Las plantillas se guardan como WAV en `carpeta/<nombre>/` y sus MFCC
+    se calculan una sola vez al cargar el nombre.
+
+    El umbral por defecto sale de benchmarks/bench_keyword_spotter.py: en el corpus sintético las
+    frases con el nombre cuestan menos de 0.1 y las demás más de 0.25. Con grabaciones propias
+    (--carpeta) se puede ajustar a una voz y un micrófono concretos.
+
+    Sin plantillas para el nombre actual el detector está inactivo y deja pasar todas las frases.
+    """
+
+    def __init__(self, carpeta="plantillas_nombre", sample_rate=16000, umbral=0.2, n_mfcc=13, detalle=False):
+        self.carpeta = carpeta
+        self.sample_rate = sample_rate
+        self.umbral = umbral
+        self.n_mfcc = n_mfcc
+        self.detalle = detalle
+        self.nombre = None
+        self.plantillas = []
+        self.lock = threading.Lock()
+        self.aceptadas = 0
+        self.rechazadas = 0
+        self.segundos_rechazados = 0.0
+        self.tiempo_total = 0.0
+
+    @property
+    def activo(self):
+        return bool(self.plantillas)
+
+    def _carpeta_nombre(self, nombre):
+        return os.path.join(self.carpeta, re.sub(r'\W+', '_', unidecode.unidecode(nombre.lower())).strip('_'))
+
+    def caracteristicas(self, muestras):
+        """MFCC sin el coeficiente de energía, todavía sin restar la media."""
+        y = np.asarray(muestras, dtype=np.float32) / 32768.0
+        return librosa.feature.mfcc(y=y, sr=self.sample_rate, n_mfcc=self.n_mfcc + 1,
+                                    n_fft=int(0.025 * self.sample_rate), hop_length=int(0.010 * self.sample_rate), n_mels=40)[1:]
+
+    @staticmethod
+    def restar_media(mfcc, ventana):
+        """
+        Resta a cada trama la media de los coeficientes en `ventana` tramas centradas en ella
+        (desplazadas en los bordes). Plantillas y frases pasan por lo mismo con la ventana del largo
+        de la plantilla: la plantilla queda con su media completa restada y, dentro de una frase, el
+        nombre con la de su entorno inmediato y no con la de todo lo que se dijo alrededor.
+        """
+        tramas = mfcc.shape[1]
+        acumulada = np.concatenate((np.zeros((mfcc.shape[0], 1), dtype=mfcc.dtype), np.cumsum(mfcc, axis=1)), axis=1)
+        inicio = np.clip(np.arange(tramas) - ventana // 2, 0, max(tramas - ventana, 0))
+        fin = np.minimum(inicio + ventana, tramas)
+        return mfcc - (acumulada[:, fin] - acumulada[:, inicio]) / (fin - inicio)
+
+    def plantilla(self, muestras):
+        mfcc = self.caracteristicas(muestras)
+        return self.restar_media(mfcc, mfcc.shape[1])
+
+    def establecer_nombre(self, nombre):
+        """Carga (y caracteriza) las plantillas grabadas para `nombre`."""
+        plantillas = []
+        for ruta in sorted(glob.glob(os.path.join(self._carpeta_nombre(nombre), "*.wav"))):
+            try:
+                muestras, sample_rate = sf.read(ruta, dtype='int16')
+                if sample_rate != self.sample_rate:
+                    print(f"Plantilla {ruta} a {sample_rate} Hz; se esperaba {self.sample_rate} Hz. Se ignora.")
+                    continue
+                plantillas.append(self.plantilla(muestras))
+            except Exception as e:
+                print(f"Error al cargar la plantilla {ruta}: {e}")
+        with self.lock:
+            self.nombre = nombre
+            self.plantillas = plantillas
+        if plantillas:
+            print(f"Detector acústico: {len(plantillas)} plantillas para '{nombre}'.")
+            # La primera DTW compila el código de librosa; mejor aquí que en la primera frase
+            self.puntuar(np.zeros(self.sample_rate, dtype=np.int16))
+        else:
+            print(f"Detector acústico inactivo: no hay grabaciones de '{nombre}' en {self._carpeta_nombre(nombre)}.")
+
+    def registrar_plantilla(self, muestras):
+        """Recorta el silencio de una grabación del nombre, la guarda como plantilla y la activa."""
+        muestras = np.asarray(muestras, dtype=np.int16)
+        _, (inicio, fin) = librosa.effects.trim(muestras.astype(np.float32) / 32768.0, top_db=30)
+        recorte = muestras[inicio:fin]
+        if len(recorte) < 0.2 * self.sample_rate:
+            print("La grabación del nombre es demasiado corta; no se guarda.")
+            return False
+        carpeta = self._carpeta_nombre(self.nombre)
+        os.makedirs(carpeta, exist_ok=True)
+        ruta = os.path.join(carpeta, f"{int(time.time() * 1000)}.wav")
+        sf.write(ruta, recorte, self.sample_rate, subtype='PCM_16')
+        with self.lock:
+            self.plantillas = self.plantillas + [self.plantilla(recorte)]
+        print(f"Plantilla del nombre guardada en {ruta}")
+        return True
+
+    def borrar_plantillas(self):
+        for ruta in glob.glob(os.path.join(self._carpeta_nombre(self.nombre), "*.wav")):
+            os.remove(ruta)
+        with self.lock:
+            self.plantillas = []
+
+    def puntuar(self, muestras):
+        """Coste normalizado de la mejor alineación de alguna plantilla dentro de la frase (menor es mejor)."""
+        with self.lock:
+            plantillas = self.plantillas
+        if not plantillas:
+            return 0.0
+        mfcc = self.caracteristicas(muestras)
+        normalizadas = {}
+        mejor = np.inf
+        for plantilla in plantillas:
+            largo = plantilla.shape[1]
+            if mfcc.shape[1] < largo // 2:
+                continue
+            if largo not in normalizadas:
+                normalizadas[largo] = self.restar_media(mfcc, largo)
+            frase = normalizadas[largo]
+            # Los tramos de silencio dan vectores nulos: distancia coseno máxima en lugar de NaN
+            coste = np.nan_to_num(cdist(plantilla.T, frase.T, metric='cosine'), nan=1.0)
+            acumulado = librosa.sequence.dtw(C=coste, subseq=True, backtrack=False)
+            mejor = min(mejor, acumulado[-1, :].min() / plantilla.shape[1])
+        return mejor
+
+    def contiene_nombre(self, muestras):
+        """True si la frase parece contener el nombre (o si el detector está inactivo)."""
+        if not self.activo:
+            return True
+        inicio = time.perf_counter()
+        coste = self.puntuar(muestras)
+        aceptada = coste <= self.umbral
+        with self.lock:
+            self.tiempo_total += time.perf_counter() - inicio
+            if aceptada:
+                self.aceptadas += 1
+            else:
+                self.rechazadas += 1
+                self.segundos_rechazados += len(muestras) / self.sample_rate
+        if self.detalle:
+            print(f"Detector acústico: coste {coste:.3f} (umbral {self.umbral}) -> {'aceptada' if aceptada else 'descartada'}")
+        return aceptada
+
+    def metricas(self):
+        with self.lock:
+            evaluadas = self.aceptadas + self.rechazadas
+            return {
+                "aceptadas": self.aceptadas,
+                "rechazadas": self.rechazadas,
+                # Parte de las frases que no llegó al reconocimiento de voz
+                "sin_stt": round(self.rechazadas / evaluadas, 3) if evaluadas else 0.0,
+                "segundos_sin_enviar": round(self.segundos_rechazados, 1),
+                "ms_medio": round(self.tiempo_total / evaluadas * 1000, 2) if evaluadas else 0.0,
+            }
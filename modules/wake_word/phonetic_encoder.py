@@ -0,0 +1,48 @@
+import re
+import Levenshtein as lv
+import unidecode
+
+# Plegado fonético del español. Las reglas con contexto van antes en la alternancia, así que
+# 'ch' no pierde la 'h', 'ce'/'ci' suenan 's' y 'que'/'qui', 'gue'/'gui' pierden la 'u'.
+PLEGADO = {
+    'ch': 'X',
+    'qu': 'k',
+    'gu': 'j',
+    'll': 'y',
+    'y': 'i',
+    'c': 'k',
+    'q': 'k',
+    'z': 's',
+    'x': 'ks',
+    'v': 'b',
+    'w': 'b',
+    'h': '',
+    'g': 'j',
+}
+PATRON_PLEGADO = re.compile(r'ch|qu(?=[ei])|gu(?=[ei])|ll|y(?![aeiou])|c(?=[ei])|[cqzxvwhg]')
+REPETIDAS = re.compile(r'(.)\1+')
+SIN_LETRAS = re.compile(r'[^a-z]')
+
+
+def _plegar(coincidencia):
+    grupo = coincidencia.group()
+    if grupo == 'c' and coincidencia.end() < len(coincidencia.string) and coincidencia.string[coincidencia.end()] in 'ei':
+        return 's'
+    return PLEGADO[grupo]
+
+
+def codificar_fonetico(texto):
+    """
+    Reduce un texto a una clave fonética del español: sin acentos ni espacios y con las
+    letras que suenan igual plegadas a una sola (k/c/qu, s/z/c suave, b/v, y/ll, j/g).
+    "Alkaris", "al caris" y "alcarís" dan la misma clave.
+    """
+    clave = SIN_LETRAS.sub('', unidecode.unidecode(texto.lower()))
+    return REPETIDAS.sub(r'\1', PATRON_PLEGADO.sub(_plegar, clave))
+
+
+def distancia_acotada(a, b, limite):
+    """Distancia de edición entre a y b, o limite + 1 si la supera (se corta antes de calcularla entera)."""
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+    return lv.distance(a, b, score_cutoff=limite)
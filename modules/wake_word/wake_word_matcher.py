@@ -0,0 +1,214 @@
+import re
+import threading
+from functools import lru_cache
+import unidecode
+from modules.wake_word.phonetic_encoder import codificar_fonetico, distancia_acotada
+
+TOKEN = re.compile(r'\S+')
+
+VARIACIONES_FONETICAS = {
+    'k': ['c', 'qu'],
+    'c': ['k', 'qu'],
+    'qu': ['k', 'c'],
+    'z': ['s'],
+    's': ['z'],
+    'b': ['v'],
+    'v': ['b'],
+    'y': ['i', 'll'],
+    'll': ['y', 'i'],
+    'j': ['g'],
+    'g': ['j'],
+    'r': ['rr'],
+    'rr': ['r']
+}
+
+
+def _sin_repetir(variaciones):
+    """Elimina duplicados y espacios extra conservando el orden (en O(n), con un dict)."""
+    return list(dict.fromkeys(' '.join(v.split()) for v in variaciones if v.strip()))
+
+
+def generar_variaciones_nombre(nombre):
+    """
+    Genera automáticamente variaciones fonéticas y de pronunciación para cualquier nombre del asistente.
+    Esto permite un reconocimiento más flexible independientemente del nombre configurado.
+    """
+    nombre_lower = nombre.lower()
+    variaciones = [nombre_lower]
+
+    # Remover acentos para variaciones
+    nombre_sin_acentos = unidecode.unidecode(nombre_lower)
+    if nombre_sin_acentos != nombre_lower:
+        variaciones.append(nombre_sin_acentos)
+
+    # Variaciones específicas para nombres comunes
+    if nombre_lower == "alkaris":
+        variaciones.extend(["al karis", "al caris", "alcaris", "al kari", "al cari", "alkari"])
+
+    # Separaciones comunes con espacios
+    if len(nombre_lower) > 3:
+        variaciones.append(f"{nombre_lower[:2]} {nombre_lower[2:]}")
+        variaciones.append(f"{nombre_lower[:3]} {nombre_lower[3:]}")
+        mitad = len(nombre_lower) // 2
+        variaciones.append(f"{nombre_lower[:mitad]} {nombre_lower[mitad:]}")
+
+    # Aplicar variaciones fonéticas
+    for variacion_base in _sin_repetir(variaciones):
+        for original, reemplazos in VARIACIONES_FONETICAS.items():
+            if original in variacion_base:
+                for reemplazo in reemplazos:
+                    variaciones.append(variacion_base.replace(original, reemplazo))
+
+    # Variaciones con errores comunes de reconocimiento: agregar/quitar vocal final
+    for variacion_base in _sin_repetir(variaciones):
+        if variacion_base.endswith(('a', 'e', 'i', 'o', 'u')):
+            variaciones.append(variacion_base[:-1])
+        else:
+            for vocal in ['a', 'e', 'i', 'o', 'u']:
+                variaciones.append(variacion_base + vocal)
+
+    # Variaciones con 'al' al inicio (muy común en reconocimiento de voz)
+    for variacion_base in _sin_repetir(variaciones):
+        if not variacion_base.startswith('al'):
+            variaciones.append(f"al {variacion_base}")
+            variaciones.append(f"al{variacion_base}")
+
+    return _sin_repetir(variaciones)
+
+
+def patron_trie(palabras):
+    """
+    Convierte una lista de cadenas en una sola expresión regular con forma de trie.
+    En cada posición solo puede avanzar una rama, así que la búsqueda es una pasada lineal
+    sobre el texto, y los cuantificadores voraces prefieren la variante más larga.
+    """
+    trie = {}
+    for palabra in palabras:
+        nodo = trie
+        for caracter in palabra:
+            nodo = nodo.setdefault(caracter, {})
+        nodo[''] = {}
+
+    def construir(nodo):
+        ramas = [re.escape(caracter) + construir(hijo) for caracter, hijo in sorted(nodo.items()) if caracter]
+        if not ramas:
+            return ''
+        cuerpo = ramas[0] if len(ramas) == 1 else '(?:' + '|'.join(ramas) + ')'
+        if '' in nodo:
+            return '(?:' + cuerpo + ')?'
+        return cuerpo
+
+    return construir(trie)
+
+
+@lru_cache(maxsize=4096)
+def clave_palabra(palabra):
+    """Clave fonética de una palabra; las transcripciones repiten mucho vocabulario."""
+    return codificar_fonetico(palabra)
+
+
+@lru_cache(maxsize=8)
+def compilar_nombre(nombre):
+    """Variaciones del nombre y su expresión regular compilada (se calculan una vez por nombre)."""
+    variaciones = generar_variaciones_nombre(nombre)
+    return variaciones, re.compile(patron_trie(variaciones))
+
+
+class DetectorNombre:
+    """
+    Busca el nombre del asistente en una transcripción.
+
+    Con modo "fonetico" (por defecto) el nombre se reduce a su clave fonética y se compara con
+    la clave de cada ventana de 1 a pocas palabras consecutivas de la transcripción usando una
+    distancia de edición acotada: `tolerancia` es la fracción de la clave que puede diferir
+    (0.2 -> una letra para "alkaris"). La ventana deja de crecer en cuanto su clave es más
+    larga que la del nombre más la tolerancia, así que la búsqueda es una sola pasada lineal
+    sobre las palabras, sea cual sea la longitud del nombre.
+
+    Con modo "variaciones" se usa la lista de variaciones de `generar_variaciones_nombre`,
+    compilada en un único autómata la primera vez que se usa.
+
+    Lo que depende del nombre se calcula una vez y solo se recalcula cuando cambia
+    (`establecer_nombre`, llamado al cambiar el nombre del asistente o al recargar la configuración).
+    """
+
+    MODOS = ("fonetico", "variaciones")
+
+    def __init__(self, nombre=None, modo="fonetico", tolerancia=0.2):
+        if modo not in self.MODOS:
+            print(f"Modo de detección del nombre desconocido: '{modo}'. Se usa 'fonetico'.")
+            modo = "fonetico"
+        self.modo = modo
+        self.tolerancia = tolerancia
+        self.nombre = None
+        self._compilado = None
+        self._clave = None
+        self.lock = threading.Lock()
+        if nombre:
+            self.establecer_nombre(nombre)
+
+    def establecer_nombre(self, nombre):
+        with self.lock:
+            if nombre != self.nombre:
+                self.nombre = nombre
+                self._compilado = None
+                self._clave = None
+
+    def _obtener(self):
+        with self.lock:
+            if self._compilado is None:
+                self._compilado = compilar_nombre(self.nombre)
+            return self._compilado
+
+    def _obtener_clave(self):
+        with self.lock:
+            if self._clave is None:
+                clave = codificar_fonetico(self.nombre)
+                self._clave = (clave, int(len(clave) * self.tolerancia))
+            return self._clave
+
+    @property
+    def variaciones(self):
+        return self._obtener()[0]
+
+    def buscar(self, texto):
+        """
+        Devuelve (inicio, fin, texto reconocido como nombre) de la aparición que empieza antes y,
+        entre las que empiezan en el mismo sitio, la más parecida y luego la más larga; o None
+        si el nombre no aparece.
+        """
+        if self.modo == "variaciones":
+            return self._buscar_variaciones(texto)
+        return self._buscar_fonetico(texto)
+
+    def _buscar_variaciones(self, texto):
+        coincidencia = self._obtener()[1].search(texto)
+        if coincidencia is None:
+            return None
+        return coincidencia.start(), coincidencia.end(), coincidencia.group()
+
+    def _buscar_fonetico(self, texto):
+        clave, limite = self._obtener_clave()
+        if not clave:
+            return None
+        # El reconocimiento suele pegar un "al" delante del nombre ("al jarvis" -> "aljarvis")
+        quitar_al = not clave.startswith('al')
+        palabras = [(m.start(), m.end(), clave_palabra(m.group())) for m in TOKEN.finditer(texto)]
+        for i, (inicio, _, _) in enumerate(palabras):
+            mejor = None
+            ventana = ''
+            for _, fin, clave_siguiente in palabras[i:]:
+                # La clave de la ventana es la de sus palabras seguidas ("al ca ris" -> "alkaris")
+                if ventana and clave_siguiente and ventana[-1] == clave_siguiente[0]:
+                    clave_siguiente = clave_siguiente[1:]
+                ventana += clave_siguiente
+                if len(ventana) > len(clave) + limite + (2 if quitar_al else 0):
+                    break
+                distancia = distancia_acotada(ventana, clave, limite)
+                if quitar_al and ventana.startswith('al'):
+                    distancia = min(distancia, distancia_acotada(ventana[2:], clave, limite))
+                if distancia <= limite and (mejor is None or distancia <= mejor[0]):
+                    mejor = (distancia, fin)
+            if mejor is not None:
+                return inicio, mejor[1], texto[inicio:mejor[1]]
+        return None
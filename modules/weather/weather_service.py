@@ -1,21 +1,9 @@
 import requests
-import re
 
 class WeatherService:
     def __init__(self, weathermap_api_key):
         self.weathermap_api_key = weathermap_api_key
 
-    def extraer_ciudad_aspecto(self, comando_pronunciado):
-        pattern = re.compile(r"(clima|tiempo|condiciones)\s+(para|en|de)?\s*([a-zA-Z\s]+)?\s*(sobre\s+)?([a-z\s]+)?", re.IGNORECASE)
-        match = pattern.search(comando_pronunciado)
-
-        if not match:
-            return None, None
-
-        ciudad = match.group(3).strip() if match.group(3) else None
-        aspecto = match.group(5).strip() if match.group(5) else "resumen"
-        return ciudad, aspecto
-
     def obtener_clima_de(self, ciudad, aspecto, responder_con_audio_callback):
         url = f"http://api.openweathermap.org/data/2.5/weather?q={ciudad}&appid={self.weathermap_api_key}&units=metric&lang=es"
         try:
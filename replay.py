@@ -0,0 +1,195 @@
+"""
+Modo de reproducción offline: pasa una carpeta de grabaciones WAV por el mismo camino
+de voz que `ejecutar` (segmentación + reducción de ruido -> reconocimiento -> nombre del
+asistente -> encontrar_comando_similar -> ejecución) sin micrófono, y mide cada etapa.
+
+Uso:
+    python replay.py carpeta_wav [--stub] [--motor auto|google|vosk] [--repeticiones 1]
+
+Con --stub los comandos no se ejecutan (solo se registran) y no hace falta Spotify, Gemini
+ni el avatar; sin él se construye la aplicación completa y los comandos se ejecutan de verdad.
+Al final se muestran los percentiles de latencia por etapa y los comandos por segundo.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import defaultdict
+import numpy as np
+import soundfile as sf
+import speech_recognition as sr
+
+from config.config_manager import ConfigManager
+from core.app_core import SpotifyVoiceControl
+from core.early_dispatch import DespachoAnticipado, Enunciado
+from core.intent_cache import CacheIntenciones
+from core.synonym_index import IndiceSinonimos
+from modules.audio.microphone_stream import FuenteGrabada
+from modules.audio.noise_floor_tracker import NoiseFloorTracker
+from modules.audio.resampler import remuestrear
+from modules.audio.voice_segmenter import SegmentadorVoz
+from modules.stt.stt_backends import crear_selector_stt
+from modules.wake_word.keyword_spotter import DetectorAcustico
+from modules.wake_word.wake_word_matcher import DetectorNombre
+from utils.audio_utils import a_int16
+
+ETAPAS = ("segmentacion", "reconocimiento", "nombre", "comando", "ejecucion", "total")
+
+
+class Cronometro:
+    """Acumula las duraciones (en ms) de cada etapa."""
+
+    def __init__(self):
+        self.tiempos = defaultdict(list)
+
+    def envolver(self, etapa, funcion):
+        def cronometrada(*args, **kwargs):
+            inicio = time.perf_counter()
+            resultado = funcion(*args, **kwargs)
+            # Las llamadas que lanzan excepción (p. ej. fin de la grabación) no cuentan
+            self.tiempos[etapa].append((time.perf_counter() - inicio) * 1000)
+            return resultado
+        return cronometrada
+
+    def informe(self):
+        print(f"\n{'etapa':>15} {'n':>5} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}  (ms)")
+        for etapa in ETAPAS:
+            tiempos = self.tiempos.get(etapa)
+            if not tiempos:
+                continue
+            p50, p90, p99 = np.percentile(tiempos, [50, 90, 99])
+            print(f"{etapa:>15} {len(tiempos):5d} {p50:9.2f} {p90:9.2f} {p99:9.2f} {max(tiempos):9.2f}")
+
+
+def crear_app_stub(config):
+    """
+    Instancia ligera de SpotifyVoiceControl con solo lo que usa el camino de voz.
+    Los métodos son los de la clase real; la ejecución de comandos se sustituye por un registro.
+    """
+    app = SpotifyVoiceControl.__new__(SpotifyVoiceControl)
+    app.detector_nombre = DetectorNombre(modo=config.get("deteccion_nombre", "fonetico"),
+                                         tolerancia=config.get("tolerancia_nombre", 0.2))
+    app.avatar_enabled = False
+    app.is_internet_available = True
+    app.recognizer = sr.Recognizer()
+    app.stt = crear_selector_stt(config, app.recognizer, hay_internet=lambda: app.is_internet_available)
+    app.detector_acustico = None
+    if config.get("detector_acustico", True):
+        app.detector_acustico = DetectorAcustico(carpeta=config.get("carpeta_plantillas_nombre", "plantillas_nombre"),
+                                                 sample_rate=config.get("sample_rate_voz", 16000),
+                                                 umbral=config.get("umbral_detector_acustico", 0.2),
+                                                 detalle=config.get("detalle_detector_acustico", False))
+    app.plantillas_pendientes = 0
+    app.asistente_nombre = config.get("asistente_nombre", "Alkaris")
+    app.indice_comandos = IndiceSinonimos(app.COMANDOS_CONOCIDOS)
+    app.agregar_alias_comandos(config.get("alias_comandos", {}))
+    app.cache_intenciones = CacheIntenciones(config.get("capacidad_cache_intenciones", 256),
+                                             generacion=app.generacion_interpretacion)
+    app.despacho_anticipado = DespachoAnticipado(app.interpretar_parcial, lambda peticion: None, [])
+    app.comandos_ejecutados = []
+    # No ensuciar comandos.txt con las frases de prueba
+    app.guardar_comando = lambda comando: None
+
+    def ejecutar_comando(peticion):
+        app.comandos_ejecutados.append(peticion[1])
+        return True
+    app.ejecutar_comando = ejecutar_comando
+    return app
+
+
+def cargar_wav(ruta, sample_rate_voz):
+    """Lee un WAV y lo pasa por el mismo front end que el micrófono: mono, int16, a `sample_rate_voz` Hz."""
+    datos, sample_rate = sf.read(ruta, dtype='int16', always_2d=True)
+    return a_int16(remuestrear(datos, sample_rate, sample_rate_voz)), sample_rate_voz
+
+
+def reproducir_archivo(app, ruta, config, cronometro, detalle=False):
+    """Procesa todas las frases de una grabación. Devuelve el número de frases y de comandos ejecutados."""
+    muestras, sample_rate = cargar_wav(ruta, config.get("sample_rate_voz", 16000))
+    rastreador = NoiseFloorTracker(control=config.get("energy_threshold", 5000))
+    fuente = FuenteGrabada(muestras, sample_rate)
+    segmentador = SegmentadorVoz(fuente, rastreador,
+                                 hangover=config.get("vad_hangover", 0.25),
+                                 pre_roll=config.get("pre_roll_ms", 500) / 1000,
+                                 reduccion_ruido=config.get("reduccion_ruido", True))
+    escuchar_frase = cronometro.envolver("segmentacion", segmentador.escuchar_frase)
+    frases = 0
+    comandos = 0
+    while True:
+        inicio = time.perf_counter()
+        try:
+            audio = escuchar_frase()
+        except sr.WaitTimeoutError:
+            # La grabación no tiene más frases
+            break
+        frases += 1
+        enunciado = Enunciado()
+        enunciado.audio = audio
+        if app.transcribir(enunciado) is not None:
+            peticion = app.interpretar(enunciado)
+            if peticion is not None:
+                app.ejecutar_comando(peticion)
+                comandos += 1
+                if detalle:
+                    print(f"  {os.path.basename(ruta)}: '{enunciado.texto}' -> {peticion[1]}")
+        cronometro.tiempos["total"].append((time.perf_counter() - inicio) * 1000)
+    return frases, comandos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reproduce grabaciones WAV por el camino de voz y mide su rendimiento.")
+    parser.add_argument("carpeta", help="Carpeta con archivos .wav (una o varias frases por archivo)")
+    parser.add_argument("--stub", action="store_true", help="No ejecutar los comandos, solo registrarlos")
+    parser.add_argument("--motor", choices=["auto", "google", "vosk"], help="Motor de reconocimiento (por defecto, el de la configuración)")
+    parser.add_argument("--repeticiones", type=int, default=1, help="Veces que se recorre la carpeta")
+    parser.add_argument("--detalle", action="store_true", help="Mostrar el comando reconocido de cada frase")
+    args = parser.parse_args()
+
+    archivos = sorted(glob.glob(os.path.join(args.carpeta, "*.wav")))
+    if not archivos:
+        print(f"No hay archivos .wav en {args.carpeta}")
+        sys.exit(1)
+
+    config = ConfigManager("spotify_voice_control_config.json").load_config()
+    if args.motor:
+        config["stt_backend"] = args.motor
+
+    app = crear_app_stub(config) if args.stub else SpotifyVoiceControl()
+    if args.motor:
+        app.stt.preferido = args.motor
+    app.stt.iniciar()
+
+    # Cronometrar las etapas sobre los métodos reales, que se llaman entre sí a través de self
+    cronometro = Cronometro()
+    app.transcribir = cronometro.envolver("reconocimiento", app.transcribir)
+    app.detectar_nombre = cronometro.envolver("nombre", app.detectar_nombre)
+    app.encontrar_comando_similar = cronometro.envolver("comando", app.encontrar_comando_similar)
+    app.ejecutar_comando = cronometro.envolver("ejecucion", app.ejecutar_comando)
+
+    frases = 0
+    comandos = 0
+    inicio = time.perf_counter()
+    try:
+        for _ in range(args.repeticiones):
+            for ruta in archivos:
+                f, c = reproducir_archivo(app, ruta, config, cronometro, args.detalle)
+                frases += f
+                comandos += c
+    finally:
+        duracion = time.perf_counter() - inicio
+        app.stt.cerrar()
+
+    cronometro.informe()
+    if app.detector_acustico is not None and app.detector_acustico.activo:
+        print(f"Detector acústico del nombre: {app.detector_acustico.metricas()}")
+    print(f"Caché de interpretación: {app.cache_intenciones.metricas()}")
+    print(f"\nArchivos: {len(archivos) * args.repeticiones}  frases: {frases}  comandos: {comandos}")
+    print(f"Tiempo total: {duracion:.2f} s  ->  {comandos / duracion if duracion else 0:.2f} comandos/s, "
+          f"{frases / duracion if duracion else 0:.2f} frases/s")
+    if not args.stub:
+        app.on_closing()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from core.early_dispatch import DespachoAnticipado, Enunciado
+
+
+def crear_despacho(estabilidad=0.05):
+    despachados = []
+
+    def interpretar(texto):
+        return (texto, texto, texto) if texto in ("siguiente", "pausa", "pausa video") else None
+
+    despacho = DespachoAnticipado(interpretar, despachados.append, {"siguiente", "pausa"},
+                                  es_ambiguo=lambda peticion: peticion[1] == "pausa", estabilidad=estabilidad)
+    return despacho, despachados
+
+
+def repetir(al_parcial, texto, segundos, bloque=0.01):
+    limite = time.monotonic() + segundos
+    while time.monotonic() < limite:
+        al_parcial(texto)
+        time.sleep(bloque)
+
+
+def test_parcial_estable_se_despacha_una_vez_antes_del_final():
+    despacho, despachados = crear_despacho()
+    enunciado = Enunciado()
+    repetir(lambda texto: despacho.parcial(enunciado, texto), "siguiente", 0.15)
+    assert despachados == [("siguiente", "siguiente", "siguiente")]
+    assert despacho.confirmar(enunciado, ("siguiente", "siguiente", "siguiente")) is None
+    assert despacho.metricas() == {"adelantados": 1, "confirmados": 1, "cancelados": 0}
+
+
+def test_parcial_que_cambia_no_se_despacha():
+    despacho, despachados = crear_despacho(estabilidad=0.1)
+    enunciado = Enunciado()
+    for texto in ("sig", "siguiente", "siguiente can", "siguiente cancion"):
+        repetir(lambda t: despacho.parcial(enunciado, t), texto, 0.03)
+    assert despachados == []
+
+
+def test_comando_ambiguo_espera_al_final():
+    despacho, despachados = crear_despacho()
+    enunciado = Enunciado()
+    repetir(lambda texto: despacho.parcial(enunciado, texto), "pausa", 0.15)
+    assert despachados == []
+
+
+def test_final_distinto_compensa_el_adelantado():
+    despacho, despachados = crear_despacho()
+    enunciado = Enunciado()
+    repetir(lambda texto: despacho.parcial(enunciado, texto), "siguiente", 0.15)
+    peticion = ("pausa video", "pausa video", "pausa video")
+    assert despacho.confirmar(enunciado, peticion) == peticion
+    assert despachados[-1] == ("anterior", "anterior", "anterior")
+
+
+def test_flujo_stt_entrega_los_parciales_repetidos():
+    pytest.importorskip("speech_recognition")
+    from modules.stt.stt_backends import BackendSTT, FlujoSTT
+
+    despacho, despachados = crear_despacho()
+    enunciado = Enunciado()
+    class Motor(BackendSTT):
+        def reconocer(self, audio):
+            return ""
+
+    flujo = FlujoSTT(Motor(), ident=1, al_parcial=lambda texto: despacho.parcial(enunciado, texto))
+    repetir(flujo._recibir_parcial, "siguiente", 0.15)
+    assert len(despachados) == 1
@@ -0,0 +1,77 @@
+import threading
+
+from core.intent_cache import CacheIntenciones
+
+
+def test_calcula_una_vez_por_clave():
+    cache = CacheIntenciones()
+    llamadas = []
+
+    def calcular():
+        llamadas.append(1)
+        return "valor"
+
+    assert cache.obtener("a", calcular) == "valor"
+    assert cache.obtener("a", calcular) == "valor"
+    assert llamadas == [1]
+    assert cache.metricas()["aciertos"] == 1
+    assert cache.metricas()["fallos"] == 1
+
+
+def test_expulsa_la_menos_usada():
+    cache = CacheIntenciones(capacidad=2)
+    cache.obtener("a", lambda: 1)
+    cache.obtener("b", lambda: 2)
+    cache.obtener("a", lambda: 1)
+    cache.obtener("c", lambda: 3)
+    assert list(cache.entradas) == ["a", "c"]
+
+
+def test_cambiar_la_generacion_vacia_la_cache():
+    version = [1]
+    cache = CacheIntenciones(generacion=lambda: version[0])
+    cache.obtener("a", lambda: "viejo")
+    version[0] = 2
+    assert cache.obtener("a", lambda: "nuevo") == "nuevo"
+    assert cache.metricas()["invalidaciones"] == 1
+
+
+def test_lo_calculado_durante_un_cambio_no_se_reutiliza():
+    version = [1]
+    cache = CacheIntenciones(generacion=lambda: version[0])
+
+    def calcular():
+        # El registro cambia mientras se resuelve la frase
+        version[0] = 2
+        return "viejo"
+
+    assert cache.obtener("a", calcular) == "viejo"
+    assert cache.obtener("a", lambda: "nuevo") == "nuevo"
+
+
+def test_invalidar():
+    cache = CacheIntenciones()
+    cache.obtener("a", lambda: 1)
+    cache.invalidar()
+    assert len(cache) == 0
+
+
+def test_entre_hilos():
+    cache = CacheIntenciones(capacidad=8)
+    errores = []
+
+    def trabajar(n):
+        try:
+            for i in range(500):
+                clave = (n + i) % 16
+                assert cache.obtener(clave, lambda: clave * 10) == clave * 10
+        except AssertionError as e:
+            errores.append(e)
+
+    hilos = [threading.Thread(target=trabajar, args=(n,)) for n in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert not errores
+    assert len(cache) <= 8
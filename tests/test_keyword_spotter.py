@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("librosa")
+pytest.importorskip("soundfile")
+
+from benchmarks.bench_keyword_spotter import NOMBRE, corpus_sintetico, preparar_detector
+from modules.wake_word.keyword_spotter import DetectorAcustico
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return corpus_sintetico(15, semilla=1)
+
+
+@pytest.fixture
+def detector(corpus, tmp_path):
+    plantillas, _, _ = corpus
+    return preparar_detector(plantillas, str(tmp_path))
+
+
+def test_acepta_las_frases_con_el_nombre(detector, corpus):
+    _, con_nombre, _ = corpus
+    assert all(detector.contiene_nombre(muestras) for muestras in con_nombre)
+
+
+def test_descarta_las_frases_sin_el_nombre(detector, corpus):
+    _, _, sin_nombre = corpus
+    descartadas = sum(not detector.contiene_nombre(muestras) for muestras in sin_nombre)
+    assert descartadas >= 0.9 * len(sin_nombre)
+    metricas = detector.metricas()
+    assert metricas["rechazadas"] == descartadas
+    assert metricas["sin_stt"] == pytest.approx(descartadas / len(sin_nombre), abs=0.001)
+
+
+def test_la_frase_y_la_plantilla_restan_la_misma_media():
+    rng = np.random.default_rng(0)
+    mfcc = rng.standard_normal((13, 80)) + 5.0
+    # Una frase que es solo el nombre queda normalizada igual que la plantilla
+    np.testing.assert_allclose(DetectorAcustico.restar_media(mfcc, 80), mfcc - mfcc.mean(axis=1, keepdims=True))
+    # Dentro de una frase más larga, en el centro del nombre la ventana abarca justo el nombre:
+    # resta su media y no la de todo lo que se dijo alrededor
+    frase = np.concatenate((rng.standard_normal((13, 100)) - 20.0, mfcc, rng.standard_normal((13, 100)) + 20.0), axis=1)
+    normalizada = DetectorAcustico.restar_media(frase, 80)
+    np.testing.assert_allclose(normalizada[:, 140], mfcc[:, 40] - mfcc.mean(axis=1))
+
+
+def test_sin_plantillas_deja_pasar_todo(tmp_path):
+    detector = DetectorAcustico(carpeta=str(tmp_path))
+    detector.establecer_nombre(NOMBRE)
+    assert not detector.activo
+    assert detector.contiene_nombre(np.zeros(16000, dtype=np.int16))
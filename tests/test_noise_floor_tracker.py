@@ -0,0 +1,44 @@
+import pytest
+
+from modules.audio.noise_floor_tracker import NoiseFloorTracker
+
+
+def silencio(rastreador, rms, segundos, bloque=0.03, voz=False):
+    for _ in range(int(segundos / bloque)):
+        rastreador.actualizar(rms, bloque, voz)
+
+
+def test_el_valor_por_defecto_equivale_al_ratio_de_adjust_for_ambient_noise():
+    rastreador = NoiseFloorTracker()
+    silencio(rastreador, 200, 5)
+    assert rastreador.piso_ruido() == pytest.approx(200, rel=0.01)
+    assert rastreador.umbral_actual() == pytest.approx(300, rel=0.01)
+
+
+def test_el_slider_no_lo_deshace_la_media():
+    rastreador = NoiseFloorTracker()
+    silencio(rastreador, 200, 5)
+    rastreador.establecer_control(10000)
+    silencio(rastreador, 200, 5)
+    assert rastreador.umbral_actual() == pytest.approx(600, rel=0.01)
+
+
+def test_el_umbral_sigue_al_ruido_con_el_mismo_ratio():
+    rastreador = NoiseFloorTracker(control=10000)
+    silencio(rastreador, 200, 5)
+    silencio(rastreador, 800, 30)
+    assert rastreador.umbral_actual() == pytest.approx(2400, rel=0.01)
+
+
+def test_la_voz_no_mueve_el_piso():
+    rastreador = NoiseFloorTracker()
+    silencio(rastreador, 200, 5)
+    silencio(rastreador, 5000, 2, voz=True)
+    assert rastreador.piso_ruido() == pytest.approx(200, rel=0.01)
+
+
+def test_limites_del_slider():
+    rastreador = NoiseFloorTracker(control=0)
+    assert rastreador.ratio == rastreador.ratio_minimo
+    silencio(rastreador, 0, 10)
+    assert rastreador.umbral_actual() == rastreador.umbral_minimo
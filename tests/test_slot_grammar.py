@@ -0,0 +1,63 @@
+import pytest
+
+from core.slot_grammar import GramaticaSlots, leer_duracion, leer_numero
+
+
+@pytest.mark.parametrize("frase, valor, consumidas", [
+    ("70", 70, 1),
+    ("setenta", 70, 1),
+    ("treinta y cinco", 35, 3),
+    ("ciento veinte", 120, 2),
+    ("dos mil quinientos", 2500, 3),
+    ("mil", 1000, 1),
+    ("setenta por ciento", 70, 1),
+])
+def test_leer_numero(frase, valor, consumidas):
+    assert leer_numero(frase.split(), 0) == (valor, consumidas)
+
+
+def test_un_solo_es_numero_con_articulos():
+    assert leer_numero(["un"], 0) == (None, 0)
+    assert leer_numero(["un"], 0, articulos=True) == (1, 1)
+    assert leer_numero(["volumen"], 0) == (None, 0)
+
+
+@pytest.mark.parametrize("frase, segundos", [
+    ("1:30", 90),
+    ("noventa", 90),
+    ("dos minutos", 120),
+    ("un minuto y medio", 90),
+    ("minuto dos", 120),
+    ("media hora", 1800),
+    ("una hora y diez minutos", 4200),
+    ("un minuto y treinta segundos", 90),
+])
+def test_leer_duracion(frase, segundos):
+    palabras = frase.split()
+    assert leer_duracion(palabras, palabras, 0) == (segundos, len(palabras))
+
+
+def test_un_sin_unidad_es_un_articulo():
+    palabras = ["un", "poco"]
+    assert leer_duracion(palabras, palabras, 0) == (None, 0)
+
+
+def test_gramatica_de_clima():
+    gramatica = GramaticaSlots({"ciudad": "ciudad", "aspecto": "aspecto"})
+    originales = "como esta el clima en San Jose hoy".split()
+    palabras = [palabra.lower() for palabra in originales]
+    assert gramatica.analizar(palabras, originales) == {"ciudad": "San Jose", "aspecto": "resumen"}
+    palabras = "viento en lima".split()
+    assert gramatica.analizar(palabras, palabras) == {"ciudad": "lima", "aspecto": "viento"}
+
+
+def test_gramatica_lee_desde_el_prefijo():
+    gramatica = GramaticaSlots({"volumen": "entero"})
+    palabras = "vlc volumen a 30".split()
+    assert gramatica.analizar(palabras, palabras, desde=2) == {"volumen": 30}
+    assert gramatica.analizar(["volumen"], ["volumen"]) == {"volumen": None}
+
+
+def test_tipo_desconocido():
+    with pytest.raises(ValueError):
+        GramaticaSlots({"x": "fecha"})
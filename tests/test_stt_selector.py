@@ -0,0 +1,37 @@
+import pytest
+
+sr = pytest.importorskip("speech_recognition")
+
+from modules.stt.stt_backends import BackendSTT, SelectorSTT
+
+
+class Motor(BackendSTT):
+    def __init__(self, nombre, texto=None):
+        self.nombre = nombre
+        self.texto = texto
+        self.llamadas = 0
+
+    def reconocer(self, audio):
+        self.llamadas += 1
+        if self.texto is None:
+            raise sr.RequestError("sin conexión")
+        return self.texto
+
+
+def test_el_backend_base_es_abstracto():
+    with pytest.raises(TypeError):
+        BackendSTT()
+    with pytest.raises(sr.RequestError):
+        Motor("google").iniciar_flujo(16000)
+
+
+def test_un_fallo_de_google_cae_a_vosk_y_vuelve_a_comprobar_la_red():
+    internet = [True]
+    google, vosk = Motor("google"), Motor("vosk", "siguiente")
+    selector = SelectorSTT({"google": google, "vosk": vosk}, hay_internet=lambda: internet[0],
+                           al_fallar_nube=lambda: internet.__setitem__(0, False))
+    assert selector.reconocer(None) == ("siguiente", "vosk")
+    assert internet == [False]
+    # Sin red ya ni se intenta la nube
+    assert selector.reconocer(None) == ("siguiente", "vosk")
+    assert google.llamadas == 1
@@ -0,0 +1,105 @@
+import random
+import re
+
+import pytest
+
+lv = pytest.importorskip("Levenshtein")
+unidecode = pytest.importorskip("unidecode")
+
+from core.command_handler import REGISTRO
+from core.synonym_index import IndiceSinonimos
+
+
+def lineal(tabla, comando_pronunciado):
+    """El recorrido de toda la tabla que hacía antes encontrar_comando_similar."""
+    comando_pronunciado = re.sub(r'\W+', '', comando_pronunciado.lower().strip())
+    mejor_coincidencia = None
+    mejor_puntuacion = 0
+    for comando, sinonimos in tabla.items():
+        for sinonimo in sinonimos:
+            sinonimo = re.sub(r'\W+', '', sinonimo.lower().strip())
+            puntuacion = lv.ratio(comando_pronunciado, sinonimo)
+            if puntuacion > mejor_puntuacion:
+                mejor_puntuacion = puntuacion
+                mejor_coincidencia = comando
+    return mejor_coincidencia if mejor_puntuacion > 0.8 else None
+
+
+def con_errores(texto, rng):
+    letras = list(texto)
+    for _ in range(rng.randint(1, 3)):
+        operacion = rng.choice(("cambiar", "quitar", "poner", "cambiar_dos"))
+        posicion = rng.randrange(len(letras))
+        if operacion == "cambiar":
+            letras[posicion] = rng.choice("abcdeilmnopqrstuz")
+        elif operacion == "quitar" and len(letras) > 2:
+            del letras[posicion]
+        elif operacion == "cambiar_dos" and posicion + 1 < len(letras):
+            letras[posicion], letras[posicion + 1] = letras[posicion + 1], letras[posicion]
+        else:
+            letras.insert(posicion, rng.choice("aeiosr"))
+    return "".join(letras)
+
+
+@pytest.fixture(scope="module")
+def tabla():
+    return REGISTRO.tabla_sinonimos()
+
+
+def test_frases_del_informe(tabla):
+    indice = IndiceSinonimos(tabla)
+    for frase in ("pasaqr", "pausar", "siguinte", "sube volumen", "qué hora es", "x"):
+        assert indice.buscar(frase)[0] == lineal(tabla, frase)
+    assert indice.buscar("pasaqr")[0] == "detener"
+
+
+def test_igual_que_el_recorrido_lineal(tabla):
+    rng = random.Random(7)
+    indice = IndiceSinonimos(tabla)
+    sinonimos = [sinonimo for lista in tabla.values() for sinonimo in lista]
+    for _ in range(5000):
+        frase = con_errores(rng.choice(sinonimos), rng)
+        assert indice.buscar(frase)[0] == lineal(tabla, frase), frase
+
+
+@pytest.mark.parametrize("umbral", [0.5, 0.7, 0.9])
+def test_cota_sin_perdidas_con_otros_umbrales(tabla, umbral):
+    rng = random.Random(umbral)
+    indice = IndiceSinonimos(tabla, umbral=umbral)
+    entradas = indice.entradas
+    for _ in range(500):
+        frase = con_errores(rng.choice(entradas), rng)
+        esperado = max((lv.ratio(frase, entrada) for entrada in entradas), default=0.0)
+        _, puntuacion = indice.buscar(frase)
+        if esperado > umbral:
+            assert puntuacion == esperado, frase
+
+
+def test_alias_añadido_se_encuentra(tabla):
+    indice = IndiceSinonimos(tabla)
+    version = indice.version
+    indice.agregar("detener", "echa el freno")
+    assert indice.version == version + 1
+    assert indice.buscar("echa el frenoo")[0] == "detener"
+
+
+def ambiguo_lineal(tabla, pronunciado, comando_elegido):
+    """El es_comando_ambiguo anterior, que normalizaba todos los sinónimos en cada llamada."""
+    pronunciado = re.sub(r'\W+', '', unidecode.unidecode(pronunciado.lower()))
+    for comando, sinonimos in tabla.items():
+        if comando == comando_elegido:
+            continue
+        for sinonimo in sinonimos:
+            sinonimo = re.sub(r'\W+', '', unidecode.unidecode(sinonimo.lower()))
+            if len(sinonimo) > len(pronunciado) and sinonimo.startswith(pronunciado):
+                return True
+    return False
+
+
+def test_prefijo_de_otro_comando_igual_que_el_recorrido_lineal(tabla):
+    indice = IndiceSinonimos(tabla)
+    assert indice.es_prefijo_de_otro("pausa", "pausa vlc")
+    frases = [(sinonimo, comando) for comando, sinonimos in tabla.items() for sinonimo in sinonimos]
+    frases += [(sinonimo[:len(sinonimo) // 2], comando) for sinonimo, comando in frases]
+    for frase, comando in frases:
+        assert indice.es_prefijo_de_otro(frase, comando) == ambiguo_lineal(tabla, frase, comando), frase
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+from core.task_executor import EjecutorTareas, TareaCancelada
+
+
+@pytest.fixture
+def ejecutor():
+    ejecutor = EjecutorTareas(trabajadores=1, reservados=1, capacidad=8)
+    yield ejecutor
+    ejecutor.detener()
+
+
+def bloquear_general(ejecutor):
+    """Ocupa el único trabajador general hasta que se libere el evento devuelto."""
+    liberar = threading.Event()
+    empezada = threading.Event()
+
+    def esperar():
+        empezada.set()
+        liberar.wait(5)
+
+    tarea = ejecutor.enviar(esperar, nombre="bloqueo", prioridad="lenta")
+    assert empezada.wait(2)
+    return tarea, liberar
+
+
+def test_control_no_espera_a_una_tarea_lenta(ejecutor):
+    _, liberar = bloquear_general(ejecutor)
+    control = ejecutor.enviar(lambda: "pausa", prioridad="control")
+    assert control.futuro.result(timeout=1) == "pausa"
+    liberar.set()
+
+
+def test_orden_por_prioridad_y_llegada(ejecutor):
+    _, liberar = bloquear_general(ejecutor)
+    orden = []
+    tareas = [ejecutor.enviar(orden.append, nombre, prioridad=prioridad)
+              for nombre, prioridad in (("lenta", "lenta"), ("normal 1", "normal"), ("normal 2", "normal"))]
+    liberar.set()
+    for tarea in tareas:
+        tarea.futuro.result(timeout=2)
+    assert orden == ["normal 1", "normal 2", "lenta"]
+
+
+def test_tarea_vencida_en_la_cola_no_se_ejecuta(ejecutor):
+    tarea_bloqueo, liberar = bloquear_general(ejecutor)
+    ejecutada = []
+    tarea = ejecutor.enviar(ejecutada.append, 1, prioridad="normal", plazo=0.05)
+    time.sleep(0.1)
+    liberar.set()
+    tarea_bloqueo.futuro.result(timeout=2)
+    time.sleep(0.1)
+    assert tarea.futuro.cancelled()
+    assert ejecutada == []
+    assert ejecutor.metricas()["vencidas"] == 1
+
+
+def test_el_plazo_no_corta_una_tarea_que_ya_empezo(ejecutor):
+    def larga():
+        time.sleep(0.15)
+        return ejecutor.token_actual().cancelado
+
+    tarea = ejecutor.enviar(larga, prioridad="normal", plazo=0.05)
+    assert tarea.futuro.result(timeout=2) is False
+
+
+def test_cancelar_varias_clases_respeta_los_controles(ejecutor):
+    en_curso = threading.Event()
+
+    def hablar():
+        en_curso.set()
+        token = ejecutor.token_actual()
+        while True:
+            token.comprobar()
+            time.sleep(0.01)
+
+    activa = ejecutor.enviar(hablar, prioridad="normal")
+    assert en_curso.wait(2)
+    pendiente = ejecutor.enviar(lambda: None, prioridad="lenta")
+    assert ejecutor.cancelar(("normal", "lenta"), motivo="cállate") == 2
+    with pytest.raises(TareaCancelada):
+        activa.futuro.result(timeout=2)
+    assert pendiente.futuro.cancelled()
+    assert ejecutor.enviar(lambda: "ok", prioridad="control").futuro.result(timeout=1) == "ok"
+
+
+def test_cola_llena_desplaza_la_menos_prioritaria():
+    ejecutor = EjecutorTareas(trabajadores=1, reservados=0, capacidad=2)
+    try:
+        _, liberar = bloquear_general(ejecutor)
+        lenta = ejecutor.enviar(lambda: None, prioridad="lenta")
+        ejecutor.enviar(lambda: None, prioridad="normal")
+        control = ejecutor.enviar(lambda: "control", prioridad="control")
+        assert lenta.futuro.cancelled()
+        assert ejecutor.enviar(lambda: None, prioridad="lenta") is None
+        liberar.set()
+        assert control.futuro.result(timeout=2) == "control"
+        assert ejecutor.metricas()["desplazadas"] == 1
+    finally:
+        ejecutor.detener()
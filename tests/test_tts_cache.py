@@ -0,0 +1,64 @@
+import os
+import threading
+import time
+
+from modules.audio.tts_cache import CacheVoz
+
+
+def test_la_clave_depende_de_texto_idioma_y_motor():
+    clave = CacheVoz.clave("Hola", "es", "gtts")
+    assert clave == CacheVoz.clave("Hola", "es", "gtts")
+    assert clave != CacheVoz.clave("hola", "es", "gtts")
+    assert clave != CacheVoz.clave("Hola", "en", "gtts")
+    assert clave != CacheVoz.clave("Hola", "es", "otro")
+
+
+def test_sintetiza_una_vez_y_despues_lee_del_disco(tmp_path):
+    cache = CacheVoz(str(tmp_path))
+    llamadas = []
+
+    def sintetizar():
+        llamadas.append(1)
+        return b"audio"
+
+    assert cache.obtener("Hola", "es", "gtts") is None
+    assert cache.obtener("Hola", "es", "gtts", sintetizar=sintetizar) == b"audio"
+    assert cache.obtener("Hola", "es", "gtts", sintetizar=sintetizar) == b"audio"
+    assert llamadas == [1]
+    assert cache.contiene("Hola", "es", "gtts")
+    assert not cache.contiene("Hola", "en", "gtts")
+    # Otra instancia sobre el mismo directorio, como tras reiniciar
+    assert CacheVoz(str(tmp_path)).obtener("Hola", "es", "gtts") == b"audio"
+
+
+def test_expulsa_las_menos_usadas(tmp_path):
+    cache = CacheVoz(str(tmp_path), capacidad_mb=250 / (1024 * 1024))
+    for texto in ("uno", "dos"):
+        cache.obtener(texto, "es", "gtts", sintetizar=lambda: b"x" * 100)
+    cache.obtener("uno", "es", "gtts")
+    cache.obtener("tres", "es", "gtts", sintetizar=lambda: b"x" * 100)
+    assert cache.contiene("uno", "es", "gtts")
+    assert not cache.contiene("dos", "es", "gtts")
+    assert cache.contiene("tres", "es", "gtts")
+    assert len(os.listdir(tmp_path)) == 2
+    assert cache.metricas()["expulsiones"] == 1
+
+
+def test_peticiones_simultaneas_sintetizan_una_vez(tmp_path):
+    cache = CacheVoz(str(tmp_path))
+    llamadas = []
+
+    def sintetizar():
+        llamadas.append(1)
+        time.sleep(0.05)
+        return b"audio"
+
+    resultados = []
+    hilos = [threading.Thread(target=lambda: resultados.append(cache.obtener("Hola", "es", "gtts", sintetizar=sintetizar)))
+             for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert resultados == [b"audio"] * 4
+    assert llamadas == [1]
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+sr = pytest.importorskip("speech_recognition")
+
+from modules.audio.noise_floor_tracker import NoiseFloorTracker
+from modules.audio.vad import DetectorActividadVoz
+from modules.audio.voice_segmenter import SegmentadorVoz
+
+SAMPLE_RATE = 16000
+BLOQUE = 480
+
+
+def ruido(segundos, amplitud=60, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return (rng.standard_normal(int(segundos * SAMPLE_RATE)) * amplitud).astype(np.int16)
+
+
+def vocal(segundos, amplitud=4000):
+    """Tono con armónicos a 150 Hz: energía alta, pocos cruces por cero y espectro nada plano."""
+    t = np.arange(int(segundos * SAMPLE_RATE)) / SAMPLE_RATE
+    senal = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6))
+    return (senal / np.max(np.abs(senal)) * amplitud).astype(np.int16)
+
+
+class Fuente:
+    """Lo que el segmentador usa del micrófono: sample_rate, bloques() y leer()."""
+
+    def __init__(self, muestras):
+        self.muestras = muestras
+        self.sample_rate = SAMPLE_RATE
+        self.posicion = 0
+
+    def bloques(self):
+        posicion = self.posicion
+        while posicion + BLOQUE <= len(self.muestras):
+            bloque = self.muestras[posicion:posicion + BLOQUE]
+            self.posicion = max(self.posicion, posicion + BLOQUE)
+            yield posicion, bloque
+            posicion += BLOQUE
+
+    def leer(self, desde, hasta):
+        return self.muestras[max(desde, 0):min(hasta, self.posicion)].copy()
+
+
+def test_clasifica_voz_silencio_y_ruido_fuerte():
+    vad = DetectorActividadVoz(SAMPLE_RATE)
+    assert vad.es_voz(vocal(0.03), 300)
+    assert not vad.es_voz(ruido(0.03), 300)
+    # Ruido blanco con la misma energía que la voz: el espectro plano lo descarta
+    assert not vad.es_voz(ruido(0.03, amplitud=4000), 300)
+
+
+def test_inicio_tras_duracion_inicio_y_fin_tras_hangover():
+    vad = DetectorActividadVoz(SAMPLE_RATE, hangover=0.25, duracion_inicio=0.06)
+    eventos = []
+    senal = np.concatenate((ruido(0.3), vocal(0.6), ruido(0.6)))
+    for posicion in range(0, len(senal) - BLOQUE + 1, BLOQUE):
+        evento, _ = vad.procesar(senal[posicion:posicion + BLOQUE], 300)
+        if evento:
+            eventos.append((evento, (posicion + BLOQUE) / SAMPLE_RATE))
+    assert [evento for evento, _ in eventos] == ["inicio", "fin"]
+    assert eventos[0][1] == pytest.approx(0.3 + 0.06, abs=0.031)
+    assert eventos[1][1] == pytest.approx(0.9 + 0.25, abs=0.031)
+
+
+@pytest.mark.parametrize("reduccion_ruido", [False, True])
+def test_entrega_la_frase_con_pre_roll(reduccion_ruido):
+    rastreador = NoiseFloorTracker(umbral_inicial=300)
+    fuente = Fuente(np.concatenate((ruido(1.0), vocal(1.0), ruido(1.0))))
+    segmentador = SegmentadorVoz(fuente, rastreador, hangover=0.25, pre_roll=0.2, reduccion_ruido=reduccion_ruido)
+    tramos = []
+    audio = segmentador.escuchar_frase(al_bloque=tramos.append)
+    duracion = len(audio.get_raw_data()) / 2 / SAMPLE_RATE
+    assert duracion == pytest.approx(0.2 + 1.0 + 0.25, abs=0.07)
+    assert sum(len(tramo) for tramo in tramos) == len(audio.get_raw_data()) // 2
+    # La frase no cuenta como ruido de fondo
+    assert rastreador.piso_ruido() < 100
+
+
+def test_sin_voz_no_entrega_nada():
+    rastreador = NoiseFloorTracker(umbral_inicial=300)
+    segmentador = SegmentadorVoz(Fuente(ruido(1.0)), rastreador, reduccion_ruido=False)
+    with pytest.raises(sr.WaitTimeoutError):
+        segmentador.escuchar_frase()
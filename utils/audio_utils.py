@@ -9,4 +9,31 @@ def normalizar_audio(audio, sr):
         audio_normalizado = audio / peak * 0.99
     else:
         audio_normalizado = audio
-    return audio_normalizado
\ No newline at end of file
+    return audio_normalizado
+
+def energia_rms(bloque):
+    """
+    RMS de un bloque de audio calculado en float32 para evitar desbordes con int16.
+    """
+    if len(bloque) == 0:
+        return 0.0
+    muestras = np.asarray(bloque, dtype=np.float32)
+    return float(np.sqrt(np.mean(muestras * muestras)))
+
+
+def a_int16(audio):
+    """
+    Redondea y recorta un array en la escala de int16 (como los devuelve noisereduce) a int16.
+    """
+    audio = np.asarray(audio)
+    if audio.dtype != np.int16:
+        audio = np.clip(np.rint(audio), -32768, 32767).astype(np.int16)
+    return audio
+
+
+def a_pcm16(audio):
+    """
+    Convierte un array de audio a bytes PCM de 16 bits (little-endian) sin pasar por disco.
+    Los arrays en coma flotante se interpretan en la escala de int16.
+    """
+    return a_int16(audio).astype('<i2', copy=False).tobytes()